@@ -1,18 +1,7 @@
 import hashlib
 import pymysql
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-DB_CONFIG = {
-    "host": os.getenv("DB_HOST", "localhost"),
-    "user": os.getenv("DB_USER", "your_mysql_user"),
-    "password": os.getenv("DB_PASSWORD", "your_mysql_password"),
-    "database": os.getenv("DB_NAME", "barcode_management"),
-    "port": int(os.getenv("DB_PORT", 3306)),
-    "autocommit": True
-}
+from backend.db_pool import get_pool
+from backend.workflow import get_workflow
 
 class Auth:
     @staticmethod
@@ -20,10 +9,16 @@ class Auth:
         """Returns a SHA-256 hashed password."""
         return hashlib.sha256(password.encode()).hexdigest()
 
+    @staticmethod
+    def allowed_roles():
+        """Admin plus one station role per production phase."""
+        return ["Admin", *get_workflow().phases]
+
     @staticmethod
     def authenticate_user(username, password):
         """Authenticates a user by checking the hashed password."""
-        db_conn = pymysql.connect(**DB_CONFIG, cursorclass=pymysql.cursors.DictCursor)
+        pool = get_pool()
+        db_conn = pool.acquire()
         cursor = db_conn.cursor()
 
         try:
@@ -41,12 +36,13 @@ class Auth:
 
         finally:
             cursor.close()
-            db_conn.close()
+            pool.release(db_conn)
 
     @staticmethod
     def register_user(username, password, role):
         """Registers a new user with a hashed password and validates inputs."""
-        db_conn = pymysql.connect(**DB_CONFIG, cursorclass=pymysql.cursors.DictCursor)
+        pool = get_pool()
+        db_conn = pool.acquire()
         cursor = db_conn.cursor()
 
         try:
@@ -56,9 +52,9 @@ class Auth:
                 return {"success": False, "message": "Username already exists!"}
 
             # Validate role
-            allowed_roles = ["Admin", "Cutting", "Sewing", "Packaging"]
+            allowed_roles = Auth.allowed_roles()
             if role not in allowed_roles:
-                return {"success": False, "message": "Invalid role. Choose from Admin, Cutting, Sewing, Packaging."}
+                return {"success": False, "message": f"Invalid role. Choose from {', '.join(allowed_roles)}."}
 
             # Insert new user
             hashed_password = Auth.hash_password(password)
@@ -72,12 +68,13 @@ class Auth:
 
         finally:
             cursor.close()
-            db_conn.close()
+            pool.release(db_conn)
 
     @staticmethod
     def get_users():
         """Fetches all users from the database excluding passwords."""
-        db_conn = pymysql.connect(**DB_CONFIG, cursorclass=pymysql.cursors.DictCursor)
+        pool = get_pool()
+        db_conn = pool.acquire()
         cursor = db_conn.cursor()
 
         try:
@@ -91,12 +88,13 @@ class Auth:
 
         finally:
             cursor.close()
-            db_conn.close()
+            pool.release(db_conn)
 
     @staticmethod
     def delete_user(user_id):
         """Deletes a user from the database."""
-        db_conn = pymysql.connect(**DB_CONFIG, cursorclass=pymysql.cursors.DictCursor)
+        pool = get_pool()
+        db_conn = pool.acquire()
         cursor = db_conn.cursor()
 
         try:
@@ -107,12 +105,13 @@ class Auth:
             return {"success": False, "message": f"Database Error: {e}"}
         finally:
             cursor.close()
-            db_conn.close()
+            pool.release(db_conn)
 
     @staticmethod
     def reset_user_password(user_id, new_password):
         """Resets the user's password."""
-        db_conn = pymysql.connect(**DB_CONFIG, cursorclass=pymysql.cursors.DictCursor)
+        pool = get_pool()
+        db_conn = pool.acquire()
         cursor = db_conn.cursor()
 
         try:
@@ -123,18 +122,19 @@ class Auth:
             return {"success": False, "message": f"Database Error: {e}"}
         finally:
             cursor.close()
-            db_conn.close()
+            pool.release(db_conn)
 
     @staticmethod
     def update_user_role(user_id, new_role):
         """Updates the user's role."""
-        db_conn = pymysql.connect(**DB_CONFIG, cursorclass=pymysql.cursors.DictCursor)
+        pool = get_pool()
+        db_conn = pool.acquire()
         cursor = db_conn.cursor()
 
         try:
-            allowed_roles = ["Admin", "Cutting", "Sewing", "Packaging"]
+            allowed_roles = Auth.allowed_roles()
             if new_role not in allowed_roles:
-                return {"success": False, "message": "Invalid role. Choose from Admin, Cutting, Sewing, Packaging."}
+                return {"success": False, "message": f"Invalid role. Choose from {', '.join(allowed_roles)}."}
 
             cursor.execute("UPDATE users SET role = %s WHERE user_id = %s", (new_role, user_id))
             db_conn.commit()
@@ -143,4 +143,4 @@ class Auth:
             return {"success": False, "message": f"Database Error: {e}"}
         finally:
             cursor.close()
-            db_conn.close()
+            pool.release(db_conn)
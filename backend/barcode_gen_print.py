@@ -1,9 +1,21 @@
 from zebra import Zebra
-from backend.models import Brand, Model, Size, Color
+from backend.reference_cache import brand_cache, model_cache, size_cache, color_cache
 import base36 
 import hashlib
+import os
+import re
+import socket
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+import numpy as np
 import pandas as pd 
 
+# **Precomputed base36 codes for the small-integer components (quantity <= 999, layers <= 99, serial <= 999)**
+BASE36_TABLE = np.array([base36.dumps(i) for i in range(1000)], dtype=object)
+
+MODEL_CODE_CACHE_SIZE = 4096
+
+@lru_cache(maxsize=MODEL_CODE_CACHE_SIZE, typed=True)
 def encode_model_name(model_name, length=2):
     hash_digest = hashlib.md5(str(model_name).encode()).hexdigest()
     hash_int = int(hash_digest, 16)
@@ -43,40 +55,323 @@ def generate_barcode_string(brand_id, model_name, size_id, color_id, quantity, l
     except Exception as e:
         raise
 
-def print_barcode_zebra(barcode_string, brand, model_name, size_value, color_name, quantity, printer_name):
-    z = Zebra(printer_name)
-
+BARCODE_MAX_LENGTH = 64  # batches.barcode is VARCHAR(64)
+BARCODE_PATTERN = re.compile(r"([0-9a-z]+)-([0-9A-Z]{1,2})-([0-9a-z]+)-([0-9a-z]+)-([0-9a-z]+)-([0-9a-z]+)-([0-9a-z]+)", re.IGNORECASE)
+BARCODE_NUMERIC_FIELDS = ["brand_id", "size_id", "color_id", "quantity", "layers", "serial"]
+
+def decode_barcode_string(barcode_string):
+    """Parses a barcode from ``generate_barcode_string`` back into its components.
+
+    Returns a dict with brand_id, model_code, size_id, color_id, quantity,
+    layers and serial. The model is only a two-character hash, so it comes
+    back as ``model_code``. Raises ValueError if the string could not have
+    been generated here: wrong shape, non-canonical base36, or values
+    outside the ranges bulk upload accepts.
+    """
+    barcode_string = str(barcode_string).strip()
+    if len(barcode_string) > BARCODE_MAX_LENGTH:
+        raise ValueError("Barcode is too long.")
+
+    match = BARCODE_PATTERN.fullmatch(barcode_string)
+    if not match:
+        raise ValueError("Barcode does not have the brand-model-size-color-quantity-layers-serial format.")
+
+    brand, model_code, size, color, quantity, layers, serial = match.groups()
+    decoded = {"model_code": model_code.upper()}
+    for field, code in zip(BARCODE_NUMERIC_FIELDS, (brand, size, color, quantity, layers, serial)):
+        value = base36.loads(code.lower())
+        if base36.dumps(value) != code.lower():
+            raise ValueError(f"Barcode {field.replace('_', ' ')} is not a valid code.")
+        decoded[field] = value
+
+    for field in ("brand_id", "size_id", "color_id"):
+        if decoded[field] < 1:
+            raise ValueError(f"Barcode {field.replace('_', ' ')} is not a valid id.")
+    for field, low, high, message in RANGE_CHECKS:
+        if not (low <= decoded[field] <= high):
+            raise ValueError(message)
+
+    return decoded
+
+def _base36_codes(values):
+    """base36-encodes a column of integers, using the lookup table for 0-999."""
+    ints = np.asarray(values, dtype=object).astype(np.int64)
+    codes = np.empty(len(ints), dtype=object)
+    in_table = (ints >= 0) & (ints < len(BASE36_TABLE))
+    codes[in_table] = BASE36_TABLE[ints[in_table]]
+    for i in np.flatnonzero(~in_table):
+        codes[i] = base36.dumps(int(ints[i]))
+    return codes
+
+def generate_barcode_strings(columns):
+    """Vector form of ``generate_barcode_string``.
+
+    ``columns`` maps brand_id, model_name, size_id, color_id, quantity,
+    layers and serial to equal-length arrays, lists or Series. Returns a list
+    of barcodes identical to calling the scalar function row by row. Model
+    codes come from the memoized ``encode_model_name``, so a sheet with a
+    handful of models hashes each one once.
+    """
+    numeric_keys = ["brand_id", "size_id", "color_id", "quantity", "layers", "serial"]
+    numeric = {key: list(columns[key]) for key in numeric_keys}
+    if any(value is None for key in numeric_keys for value in numeric[key]):
+        raise ValueError("One or more required values are None!")
+
+    codes = {key: _base36_codes(numeric[key]) for key in numeric_keys}
+    model_codes = [encode_model_name(model_name) for model_name in columns["model_name"]]
+
+    return [
+        f"{brand}-{model}-{size}-{color}-{quantity}-{layers}-{serial}"
+        for brand, model, size, color, quantity, layers, serial in zip(
+            codes["brand_id"], model_codes, codes["size_id"], codes["color_id"],
+            codes["quantity"], codes["layers"], codes["serial"],
+        )
+    ]
+
+# **Label layout, downloaded to printer RAM once per job as a stored format (^DF)**
+LABEL_FORMAT_NAME = "R:BATCHLBL.ZPL"
+LABEL_FORMAT = (
+    f"^XA^DF{LABEL_FORMAT_NAME}^FS"
+    "^FO50,50^BY2,2.5,50^BCN,80,Y,N,N^FN1^FS"
+    "^FO50,210^A0N,35,35^FN2^FS"
+    "^FO50,300^A0N,35,35^FN3^FS"
+    "^XZ\n"
+)
+
+PRINT_JOB_SIZE = int(os.getenv("ZEBRA_JOB_SIZE", 500))  # labels per spool job
+
+
+def _field_data(value):
+    """Returns a ^FD field with ZPL control characters hex-escaped via ^FH."""
+    text = str(value).replace("_", "_5F").replace("^", "_5E").replace("~", "_7E")
+    return f"^FH^FD{text}^FS"
+
+
+def label_record(barcode_string, brand, model_name, size_value, color_name, quantity):
+    """Builds the ^XF record that fills the stored label format for one batch."""
     text_info = f"Brand: {brand} | Model: {model_name}"
     text_info2 = f"Color: {color_name} | Qty: {quantity} | Size: {size_value}"
+    return (
+        f"^XA^XF{LABEL_FORMAT_NAME}^FS"
+        f"^FN1{_field_data(barcode_string)}^FN2{_field_data(text_info)}^FN3{_field_data(text_info2)}"
+        "^XZ\n"
+    )
+
+
+def build_print_jobs(labels, job_size=PRINT_JOB_SIZE):
+    """Groups labels into ZPL jobs of up to ``job_size`` labels.
+
+    ``labels`` yields dicts with barcode, brand, model, size, color and
+    quantity keys (the shape of ``process_bulk_barcodes`` rows). Every job
+    starts with the stored format, so a job still prints correctly after
+    the printer was power-cycled between jobs.
+    """
+    records = []
+    for label in labels:
+        records.append(label_record(label["barcode"], label["brand"], label["model"], label["size"], label["color"], label["quantity"]))
+        if len(records) == job_size:
+            yield LABEL_FORMAT + "".join(records), len(records)
+            records = []
+    if records:
+        yield LABEL_FORMAT + "".join(records), len(records)
+
+
+# **Printer transports**
+# A transport takes finished ZPL jobs for one printer: ``send(zpl)`` then
+# ``close()``. ``open_transport`` picks one from the printer name, so a
+# "tcp://host:9100" or "file://labels.zpl" entry works wherever a Zebra
+# queue name does.
+ZPL_ENCODING = "cp437"
+RAW_PORT = 9100
+RAW_TIMEOUT = float(os.getenv("ZEBRA_RAW_TIMEOUT", 10))
+
+
+class ZebraQueueTransport:
+    """Sends each job to an OS print queue through the ``zebra`` package."""
+
+    def __init__(self, queue_name):
+        self.zebra = Zebra(queue_name)
+
+    def send(self, zpl):
+        self.zebra.output(zpl)
+
+    def close(self):
+        pass
+
+
+class RawSocketTransport:
+    """Streams jobs over one TCP connection to a printer's raw port (9100)."""
+
+    def __init__(self, host, port=RAW_PORT, timeout=RAW_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.sock = None
+
+    def send(self, zpl):
+        if self.sock is None:
+            self.sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        try:
+            self.sock.sendall(zpl.encode(ZPL_ENCODING, errors="replace"))
+        except OSError:
+            # **Drop the broken connection so the next send (or retry) reconnects**
+            self.close()
+            raise
+
+    def close(self):
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            finally:
+                self.sock = None
+
+
+class FileTransport:
+    """Appends jobs to a file; with no path (the null sink) jobs are discarded."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.bytes_written = 0
+
+    def send(self, zpl):
+        data = zpl.encode(ZPL_ENCODING, errors="replace")
+        if self.path:
+            with open(self.path, "ab") as f:
+                f.write(data)
+        self.bytes_written += len(data)
+
+    def close(self):
+        pass
+
+
+def open_transport(printer_name):
+    """Returns the transport for a printer name: tcp://host[:port], file://path, null, or a Zebra queue."""
+    if printer_name.startswith("tcp://"):
+        host, _, port = printer_name[len("tcp://"):].partition(":")
+        return RawSocketTransport(host, int(port) if port else RAW_PORT)
+    if printer_name.startswith("file://"):
+        return FileTransport(printer_name[len("file://"):])
+    if printer_name == "null":
+        return FileTransport()
+    return ZebraQueueTransport(printer_name)
+
+
+def print_barcodes_zebra(labels, printer_name, job_size=PRINT_JOB_SIZE, transport=None):
+    """Prints many labels in a few jobs; returns the number of labels sent."""
+    own_transport = transport is None
+    transport = transport or open_transport(printer_name)
+    printed = 0
+    try:
+        for job, count in build_print_jobs(labels, job_size):
+            transport.send(job)
+            printed += count
+    finally:
+        if own_transport:
+            transport.close()
+    return printed
 
-    zpl_code = f"""
-            ^XA
-            ^FO50,50^BY2,2.5,50
-            ^BCN,80,Y,N,N
-            ^FD{barcode_string}^FS
-            ^FO50,210^A0N,35,35^FD{text_info}^FS  ;
-            ^FO50,300^A0N,35,35^FD{text_info2}^FS ;
-            ^XZ
-        """
 
-    z.output(zpl_code)
+def print_barcode_zebra(barcode_string, brand, model_name, size_value, color_name, quantity, printer_name):
+    label = {"barcode": barcode_string, "brand": brand, "model": model_name, "size": size_value, "color": color_name, "quantity": quantity}
+    print_barcodes_zebra([label], printer_name)
+
+# **Network printers reachable on the raw port, e.g. "tcp://10.0.0.15:9100,tcp://10.0.0.16"**
+NETWORK_PRINTERS = [name.strip() for name in os.getenv("ZEBRA_NETWORK_PRINTERS", "").split(",") if name.strip()]
 
 def get_available_printers():
     try:
         z = Zebra()
-        printers = z.getqueues()
+        printers = z.getqueues() + NETWORK_PRINTERS
         return printers
     except Exception:
-        return ["No Zebra printers found"]
+        return NETWORK_PRINTERS or ["No Zebra printers found"]
+
+REQUIRED_COLUMNS = ["brand", "model", "size", "color", "quantity", "layers", "serial"]
+
+INVALID_NUMERIC_MESSAGE = "Invalid numeric values in quantity, layers, or serial."
+
+RANGE_CHECKS = [
+    ("quantity", 1, 999, "Quantity must be between 1-999."),
+    ("layers", 1, 99, "Layers must be between 1-99."),
+    ("serial", 1, 999, "Serial must be between 1-999."),
+]
+
+# **Parallel validation (opt-in): below PARALLEL_MIN_ROWS process start-up and pickling cost more than they save**
+PARALLEL_ENABLED = os.getenv("BULK_PARALLEL", "0") == "1"
+PARALLEL_MIN_ROWS = int(os.getenv("BULK_PARALLEL_MIN_ROWS", 100_000))
+PARALLEL_SHARD_ROWS = int(os.getenv("BULK_PARALLEL_SHARD_ROWS", 25_000))
+PARALLEL_MAX_WORKERS = int(os.getenv("BULK_PARALLEL_MAX_WORKERS", os.cpu_count() or 1))
 
-def process_bulk_barcodes(df):
-    error_rows = []
-    processed_data = []
 
-    required_columns = ["brand", "model", "size", "color", "quantity", "layers", "serial"]
+def _row_view(df):
+    """Returns the required columns as ``iterrows()`` would see them.
 
+    A row of an all-numeric frame is upcast to one common dtype (ints become
+    floats next to a float column), so the columns are cast the same way to
+    keep string conversion identical to the old row-by-row code.
+    """
+    dtypes = list(df.dtypes)
+    if dtypes and all(pd.api.types.is_numeric_dtype(t) and not pd.api.types.is_bool_dtype(t) for t in dtypes):
+        try:
+            common = np.result_type(*dtypes)
+            return {col: df[col].astype(common) for col in REQUIRED_COLUMNS}
+        except TypeError:
+            pass
+    return {col: df[col] for col in REQUIRED_COLUMNS}
+
+
+def _int_column(series):
+    """Applies ``int()`` to a whole column.
+
+    Returns (values, invalid, unexpected): int64 values, a mask of entries
+    where ``int()`` raised ValueError, and an object array holding the
+    message of any other exception (None elsewhere). Numeric columns are
+    converted with NumPy; text columns call ``int()`` once per distinct value.
+    """
+    n = len(series)
+    invalid = np.zeros(n, dtype=bool)
+    unexpected = np.full(n, None, dtype=object)
+
+    if pd.api.types.is_integer_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+        return series.to_numpy(dtype=np.int64), invalid, unexpected
+
+    if pd.api.types.is_float_dtype(series.dtype):
+        raw = series.to_numpy(dtype=np.float64)
+        finite = np.isfinite(raw)
+        unexpected[~finite] = "cannot convert float infinity to integer"
+        # **Clip before casting so huge floats stay out of range instead of wrapping**
+        values = np.clip(np.trunc(np.where(finite, raw, 0)), -(2 ** 62), 2 ** 62).astype(np.int64)
+        return values, invalid, unexpected
+
+    converted = {}
+    for value in pd.unique(series):
+        try:
+            converted[value] = (min(max(int(value), -(2 ** 62)), 2 ** 62), False, None)
+        except ValueError:
+            converted[value] = (0, True, None)
+        except Exception as e:
+            converted[value] = (0, False, str(e))
+
+    results = [converted[value] for value in series]
+    values = np.fromiter((r[0] for r in results), dtype=np.int64, count=n)
+    invalid[:] = [r[1] for r in results]
+    unexpected[:] = [r[2] for r in results]
+    return values, invalid, unexpected
+
+
+def _canonical_model(value, dotted):
+    """Turns numeric-looking model names from Excel ("12345", "12345.0") into digits."""
+    return str(int(float(value))) if dotted else str(int(value))
+
+
+def prepare_bulk_frame(df):
+    """Checks the required columns, then drops incomplete and duplicate rows.
+
+    The returned frame carries an ``original_index`` column with each row's
+    index in ``df``, so errors can still be reported against the sheet.
+    """
     # **Ensure all required columns exist**
-    for col in required_columns:
+    for col in REQUIRED_COLUMNS:
         if col not in df.columns:
             raise ValueError(f"Missing required column: {col}")
 
@@ -84,80 +379,208 @@ def process_bulk_barcodes(df):
     df["original_index"] = df.index
 
     # **Drop any row with missing values in required fields**
-    df = df.dropna(subset=required_columns).reset_index(drop=True)
+    df = df.dropna(subset=REQUIRED_COLUMNS).reset_index(drop=True)
 
     # **Remove duplicate rows**
-    df = df.drop_duplicates(subset=required_columns, keep="first").reset_index(drop=True)
-
-    for _, row in df.iterrows(): 
-        try:
-            row_number = int(row["original_index"])
-            brand_name = str(row["brand"]).strip().lower()
-            size_value = str(row["size"]).strip().lower()
-            color_name = str(row["color"]).strip().lower()
-
-            # **Handle Model Name Correctly**
-            model_name = str(row["model"]).strip()
-            if pd.isna(model_name) or model_name == "":
-                error_rows.append((row_number, row, "Model name is missing."))
-                continue
-
-            model_name = str(model_name)
-            if model_name.isdigit(): 
-                model_name = str(int(model_name))
-            elif model_name.replace(".", "").isdigit():  
-                model_name = str(int(float(model_name)))
-
-            model_name = "".join(filter(str.isalnum, model_name))  
-            if len(model_name) < 7:
-                model_name = model_name.ljust(7, "0")
-
-            # **Ensure Quantity, Layers, and Serial are Valid**
+    return df.drop_duplicates(subset=REQUIRED_COLUMNS, keep="first").reset_index(drop=True)
+
+
+def validate_bulk_frame(df):
+    """Validates a prepared frame column by column.
+
+    Returns ``(valid, errors)``: a DataFrame of normalized valid rows
+    (``position`` is the row's position in ``df``) and a list of
+    ``(position, message)`` for rejected rows in row order. Rows are
+    independent, so any contiguous slice of a prepared frame can be
+    validated on its own.
+    """
+    n = len(df)
+    columns = _row_view(df)
+    error = np.full(n, None, dtype=object)
+
+    def reject(mask, message):
+        """Records ``message`` for rows in ``mask`` that have no earlier error."""
+        mask = np.asarray(mask, dtype=bool) & np.equal(error, None)
+        if isinstance(message, np.ndarray):
+            error[mask] = message[mask]
+        else:
+            error[mask] = message
+
+    brand = columns["brand"].astype(str).str.strip().str.lower()
+    size = columns["size"].astype(str).str.strip().str.lower()
+    color = columns["color"].astype(str).str.strip().str.lower()
+
+    # **Handle Model Name Correctly**
+    model = columns["model"].astype(str).str.strip()
+    reject(model == "", "Model name is missing.")
+
+    digit = model.str.isdigit().to_numpy(dtype=bool)
+    dotted = ~digit & model.str.replace(".", "", regex=False).str.isdigit().to_numpy(dtype=bool)
+    numeric_model = digit | dotted
+    if numeric_model.any():
+        canonical = {}
+        for value, is_dotted in set(zip(model[numeric_model], dotted[numeric_model])):
             try:
-                quantity = int(row["quantity"])
-                layers = int(row["layers"])
-                serial = int(row["serial"])
-            except ValueError:
-                error_rows.append((row_number, row, "Invalid numeric values in quantity, layers, or serial."))
-                continue 
-
-            # **Validation Checks**
-            row_errors = []
-            if len(model_name) < 7 or not model_name.isalnum():
-                row_errors.append("Model name must be at least 7 alphanumeric characters.")
-            if not (1 <= quantity <= 999):
-                row_errors.append("Quantity must be between 1-999.")
-            if not (1 <= layers <= 99):
-                row_errors.append("Layers must be between 1-99.")
-            if not (1<= serial <= 999):
-                row_errors.append("Serial must be between 1-999.")
-
-            if row_errors:
-                error_rows.append((row_number, row, ", ".join(row_errors)))
-                continue  
-
-            # **Fetch or Insert IDs**
-            brand_id = Brand.get_brands().get(brand_name, Brand.add_brand(brand_name))
-            model_id = Model.get_models().get(model_name, Model.add_model(model_name))
-            size_id = Size.get_sizes().get(size_value, Size.add_size(size_value))
-            color_id = Color.get_colors().get(color_name, Color.add_color(color_name))
-            
-            # **Generate Barcode**
-            barcode_string = generate_barcode_string(brand_id, model_name, size_id, color_id, quantity, layers, serial)
-
-            # **Append Processed Row**
-            processed_data.append({
-                "barcode": barcode_string,
-                "brand": brand_name,
-                "model": model_name,
-                "size": size_value,
-                "color": color_name,
-                "quantity": quantity,
-                "layers": layers,
-                "serial": serial,
-            })
+                canonical[(value, is_dotted)] = (_canonical_model(value, is_dotted), None)
+            except Exception as e:
+                canonical[(value, is_dotted)] = (None, f"Unexpected error: {e}")
+        converted = [canonical[key] for key in zip(model[numeric_model], dotted[numeric_model])]
+        failures = np.full(n, None, dtype=object)
+        failures[numeric_model] = [message for _, message in converted]
+        reject(np.not_equal(failures, None), failures)
+        model_values = model.to_numpy(dtype=object)
+        model_values[numeric_model] = [value if value is not None else "" for value, _ in converted]
+        model = pd.Series(model_values, index=model.index, dtype=object)
+
+    model = model.str.replace(r"[\W_]", "", regex=True).str.ljust(7, "0")
+
+    # **Ensure Quantity, Layers, and Serial are Valid**
+    numbers = {}
+    numeric_error = np.full(n, None, dtype=object)
+    for col in reversed(["quantity", "layers", "serial"]):
+        values, invalid, unexpected = _int_column(columns[col])
+        numbers[col] = values
+        messages = np.where(invalid, INVALID_NUMERIC_MESSAGE, np.where(np.equal(unexpected, None), None, "Unexpected error: " + unexpected.astype(str)))
+        numeric_error = np.where(np.equal(messages, None), numeric_error, messages)
+    reject(np.not_equal(numeric_error, None), numeric_error)
+
+    # **Validation Checks**
+    checks = [((model.str.len() < 7) | ~model.str.isalnum()).to_numpy(dtype=bool)]
+    labels = ["Model name must be at least 7 alphanumeric characters."]
+    for col, low, high, message in RANGE_CHECKS:
+        checks.append(~((numbers[col] >= low) & (numbers[col] <= high)))
+        labels.append(message)
+    failed = np.column_stack(checks) & np.equal(error, None)[:, None]
+    for pos in np.flatnonzero(failed.any(axis=1)):
+        error[pos] = ", ".join(label for label, bad in zip(labels, failed[pos]) if bad)
+
+    ok = np.equal(error, None)
+    valid = pd.DataFrame({
+        "position": np.flatnonzero(ok),
+        "brand": brand[ok].to_numpy(),
+        "model": model[ok].to_numpy(),
+        "size": size[ok].to_numpy(),
+        "color": color[ok].to_numpy(),
+        "quantity": numbers["quantity"][ok],
+        "layers": numbers["layers"][ok],
+        "serial": numbers["serial"][ok],
+    })
+    errors = [(int(pos), error[pos]) for pos in np.flatnonzero(~ok)]
+    return valid, errors
+
+
+def _validate_shard(shard):
+    """Process-pool entry point: validates one slice and shifts positions back to the full frame."""
+    start, frame = shard
+    valid, errors = validate_bulk_frame(frame)
+    valid["position"] += start
+    return valid, [(position + start, message) for position, message in errors]
+
+
+def parallel_workers(row_count, max_workers=None):
+    """Returns how many processes to validate ``row_count`` rows with (1 means inline).
+
+    Each worker gets at least PARALLEL_SHARD_ROWS rows and nothing is
+    sharded below PARALLEL_MIN_ROWS, where the serial path is faster.
+    """
+    max_workers = max_workers or PARALLEL_MAX_WORKERS
+    if row_count < PARALLEL_MIN_ROWS:
+        return 1
+    return max(1, min(max_workers, row_count // PARALLEL_SHARD_ROWS))
+
+
+def normalize_bulk_rows(df, workers=1):
+    """Validates and normalizes an upload column by column.
+
+    Returns ``(frame, valid, errors)``: the de-duplicated frame, a DataFrame
+    of normalized valid rows (``position`` points back into ``frame``) and a
+    list of ``(position, message)`` for rejected rows in row order. With
+    ``workers`` > 1 the frame is split into contiguous shards validated in a
+    process pool; shards are merged in order, so the result is identical.
+    """
+    frame = prepare_bulk_frame(df)
+    if workers <= 1 or len(frame) < 2:
+        valid, errors = validate_bulk_frame(frame)
+        return frame, valid, errors
+
+    bounds = np.linspace(0, len(frame), workers + 1).astype(int)
+    shards = [(int(start), frame.iloc[start:end].reset_index(drop=True)) for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+    with ProcessPoolExecutor(max_workers=len(shards)) as pool:
+        results = list(pool.map(_validate_shard, shards))
+
+    valid = pd.concat([shard_valid for shard_valid, _ in results], ignore_index=True)
+    errors = [error for _, shard_errors in results for error in shard_errors]
+    return frame, valid, errors
+
+
+def _error_row(frame, position, message):
+    """Builds an error tuple whose row Series matches what ``iterrows()`` yields."""
+    values = frame.iloc[position:position + 1].to_numpy()[0]
+    row = pd.Series(values, index=frame.columns, name=position)
+    return (int(row["original_index"]), row, message)
+
+
+def process_bulk_barcodes(df, parallel=PARALLEL_ENABLED, max_workers=None):
+    """Validates an upload, resolves dimension ids and generates barcodes.
+
+    With ``parallel`` the validation stage may run in a process pool (see
+    ``parallel_workers``); ids are always resolved here in the parent.
+    """
+    workers = parallel_workers(len(df), max_workers) if parallel else 1
+    frame, valid, errors = normalize_bulk_rows(df, workers)
+    return encode_bulk_rows(frame, valid, errors)
+
+
+def encode_bulk_rows(frame, valid, errors):
+    """Resolves ids for validated rows and builds ``(processed_data, error_rows)``.
+
+    ``error_rows`` is in row order, with rows whose ids could not be
+    resolved reported at their own position, as the row-by-row code did.
+    """
+    processed_data = []
 
-        except Exception as e:
-            error_rows.append((row_number, row, f"Unexpected error: {e}"))
+    # **Fetch or Insert IDs once per column for the whole sheet**
+    brand_ids = brand_cache.ensure_many(valid["brand"])
+    model_ids = model_cache.ensure_many(valid["model"])
+    size_ids = size_cache.ensure_many(valid["size"])
+    color_ids = color_cache.ensure_many(valid["color"])
+
+    # **Rows whose ids could not be resolved fail like generate_barcode_string would**
+    ids = {
+        "brand_id": [brand_ids[name] for name in valid["brand"]],
+        "size_id": [size_ids[name] for name in valid["size"]],
+        "color_id": [color_ids[name] for name in valid["color"]],
+    }
+    resolved = np.ones(len(valid), dtype=bool)
+    for values in ids.values():
+        resolved &= np.not_equal(np.asarray(values, dtype=object), None)
+
+    unresolved = [(int(position), "Unexpected error: One or more required values are None!") for position in valid["position"][~resolved]]
+    error_rows = [_error_row(frame, position, message) for position, message in sorted(list(errors) + unresolved, key=lambda error: error[0])]
+
+    ready = valid[resolved]
+    # **Generate Barcodes**
+    barcodes = generate_barcode_strings({
+        "brand_id": np.asarray(ids["brand_id"], dtype=object)[resolved],
+        "model_name": ready["model"],
+        "size_id": np.asarray(ids["size_id"], dtype=object)[resolved],
+        "color_id": np.asarray(ids["color_id"], dtype=object)[resolved],
+        "quantity": ready["quantity"],
+        "layers": ready["layers"],
+        "serial": ready["serial"],
+    })
+
+    columns = [ready[col].tolist() for col in ["brand", "model", "size", "color", "quantity", "layers", "serial"]]
+    for barcode_string, brand, model, size, color, quantity, layers, serial in zip(barcodes, *columns):
+        processed_data.append({
+            "barcode": barcode_string,
+            "brand": brand,
+            "model": model,
+            "size": size,
+            "color": color,
+            "quantity": quantity,
+            "layers": layers,
+            "serial": serial,
+        })
 
     return processed_data, error_rows
@@ -1,10 +1,162 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+import pymysql
 from backend.models import Batch
+from backend.scan_journal import get_scan_journal
+from backend.scan_audit import scan_audit, scan_event, is_transient
+from backend.barcode_gen_print import decode_barcode_string, encode_model_name
+from backend.reference_cache import brand_cache, model_cache, size_cache, color_cache
+
+SCAN_CACHE_SIZE = int(os.getenv("SCAN_CACHE_SIZE", 2048))
+SCAN_CACHE_FRESH_SECONDS = float(os.getenv("SCAN_CACHE_FRESH_SECONDS", 2.0))
+SCAN_BATCH_WINDOW = float(os.getenv("SCAN_BATCH_WINDOW", 0.1))  # seconds
+SCAN_BATCH_MAX = int(os.getenv("SCAN_BATCH_MAX", 50))
+SCAN_DEFER_AFTER = float(os.getenv("SCAN_DEFER_AFTER", 2.0))  # seconds before a slow commit is answered "queued"
+SCAN_REPLAY_INTERVAL = float(os.getenv("SCAN_REPLAY_INTERVAL", 1.0))
+SCAN_REPLAY_MAX_INTERVAL = float(os.getenv("SCAN_REPLAY_MAX_INTERVAL", 30.0))
+SCAN_PRUNE_INTERVAL = 3600
+
+
+class BatchCache:
+    """Bounded LRU of barcode -> batch row for the scanner hot path.
+
+    An entry checked within the last ``fresh_for`` seconds is served from
+    memory. An older entry is revalidated with a one-row ``updated_at``
+    lookup on the barcode's unique index and reloaded through the full join
+    only if the row changed, so edits made elsewhere (admin screens, other
+    stations) are picked up. Transitions applied here write the refreshed
+    row straight into the cache.
+    """
+
+    def __init__(self, loader=Batch.get_batch_by_barcode, version_loader=Batch.get_batch_version,
+                 max_size=SCAN_CACHE_SIZE, fresh_for=SCAN_CACHE_FRESH_SECONDS):
+        self.loader = loader
+        self.version_loader = version_loader
+        self.max_size = max_size
+        self.fresh_for = fresh_for
+
+        self._entries = OrderedDict()  # barcode -> [batch, checked_at]
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "validations": 0, "stale": 0, "evictions": 0}
+
+    def _record(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def snapshot(self):
+        """Returns the hit/miss counters plus the current size and hit ratio."""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["size"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def get(self, barcode):
+        """Returns the batch row for ``barcode`` (None if it does not exist)."""
+        with self._lock:
+            entry = self._entries.get(barcode)
+            if entry is not None:
+                self._entries.move_to_end(barcode)
+                batch, checked_at = entry
+
+        if entry is not None:
+            if time.monotonic() - checked_at <= self.fresh_for:
+                self._record("hits")
+                return batch
+
+            self._record("validations")
+            version = self.version_loader(barcode)
+            if version and version["batch_id"] == batch["batch_id"] and version["updated_at"] == batch.get("updated_at"):
+                with self._lock:
+                    entry[1] = time.monotonic()
+                self._record("hits")
+                return batch
+            self._record("stale")
+
+        self._record("misses")
+        batch = self.loader(barcode)
+        if batch:
+            self.put(batch)
+        else:
+            self.discard(barcode)
+        return batch
+
+    def put(self, batch):
+        """Stores a row just read from the database (write-through after a transition)."""
+        with self._lock:
+            self._entries[batch["barcode"]] = [batch, time.monotonic()]
+            self._entries.move_to_end(batch["barcode"])
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def discard(self, barcode):
+        with self._lock:
+            self._entries.pop(barcode, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+batch_cache = BatchCache()
+
+
+def resolve_scanned_barcode(scanned_code):
+    """Decodes a scan and fills in display names from the reference caches.
+
+    Returns a preview shaped like a ``Batch.get_batch_by_barcode`` row, built
+    without querying batches (phase and status stay None, as only the
+    database knows them). The model name is filled in when exactly one
+    cached model has the scanned model code. When the reference caches
+    cannot be loaded the encoded ids are shown instead of names. Raises
+    ValueError for scans that are not one of our barcodes.
+    """
+    scanned_code = scanned_code.strip()
+    decoded = decode_barcode_string(scanned_code)
+
+    try:
+        models = [name for name in model_cache.names() if encode_model_name(name) == decoded["model_code"]]
+        brand_name = brand_cache.get_name(decoded["brand_id"])
+        size_value = size_cache.get_name(decoded["size_id"])
+        color_name = color_cache.get_name(decoded["color_id"])
+    except pymysql.MySQLError as e:
+        # **Reference data never loaded and MySQL is down: show the ids the barcode carries**
+        print(f"Reference data unavailable for '{scanned_code}': {e}")
+        models = []
+        brand_name, size_value, color_name = decoded["brand_id"], decoded["size_id"], decoded["color_id"]
+
+    return {
+        "batch_id": None,
+        "barcode": scanned_code,
+        "brand_name": brand_name,
+        "model_name": models[0] if len(models) == 1 else decoded["model_code"],
+        "size_value": size_value,
+        "color_name": color_name,
+        "quantity": decoded["quantity"],
+        "layers": decoded["layers"],
+        "serial": "{:03d}".format(decoded["serial"]),
+        "phase_name": None,
+        "status": None,
+    }
+
 
 def process_scanned_barcode(scanned_code):
     scanned_code = scanned_code.strip()
     print(f"Processing scanned barcode: '{scanned_code}'") 
+
+    # **Garbage scans are rejected here, without a database round trip**
+    try:
+        decode_barcode_string(scanned_code)
+    except ValueError as e:
+        print(f"Rejected scan '{scanned_code}': {e}")
+        return None
     
-    batch = Batch.get_batch_by_barcode(scanned_code)
+    batch = batch_cache.get(scanned_code)
 
     if batch:
         print(f"Batch Found: {batch}") 
@@ -12,3 +164,320 @@ def process_scanned_barcode(scanned_code):
     else:
         print(f"Barcode '{scanned_code}' was not found in the database!") 
         return None  
+
+
+def _record_transition(scanned_code, result):
+    # **Write-through: the row was read inside the transaction; a conflict means it is already stale**
+    if result["batch"] and result["result"] in ("applied", "illegal"):
+        batch_cache.put(result["batch"])
+    else:
+        batch_cache.discard(scanned_code)
+
+    if result["result"] not in ("applied", "queued"):
+        print(f"Transition rejected ({result['result']}): {result['message']}")
+    return result
+
+
+def _reject_invalid(scanned_code):
+    """Returns an "invalid" result for a scan that is not one of our barcodes, else None."""
+    try:
+        decode_barcode_string(scanned_code)
+    except ValueError as e:
+        print(f"Rejected scan '{scanned_code}': {e}")
+        return {"result": "invalid", "message": f"Invalid barcode '{scanned_code}': {e}", "batch": None}
+    return None
+
+
+def transition_scanned_barcode(scanned_code, mode, station_phase):
+    """Applies an IN/OUT scan in one transaction and returns the transition result dict."""
+    scanned_code = scanned_code.strip()
+    print(f"Applying {mode} scan for '{scanned_code}' at {station_phase}")
+
+    invalid = _reject_invalid(scanned_code)
+    if invalid:
+        return invalid
+
+    result = Batch.transition_by_barcode(scanned_code, mode, station_phase)
+    return _record_transition(scanned_code, result)
+
+
+class TransitionBatcher:
+    """Journals IN/OUT scans locally and replays them into MySQL in set-based batches.
+
+    ``submit`` appends the scan to the local ScanJournal and returns a
+    Future of its result. A single replayer thread drains the journal
+    oldest-first through ``Batch.transition_many``, passing each entry's
+    scan key so an entry applied twice (say, the station died between the
+    MySQL commit and the journal update) has no second effect. If the
+    latest scan arrived within ``window`` seconds of the previous one (a
+    burst, e.g. a cart scanned at shift change) the replayer waits up to
+    ``window`` for more, up to ``max_batch`` scans; a lone scan is
+    committed straight away, so it sees no added latency.
+
+    When MySQL is unreachable, or a commit takes longer than
+    ``defer_after`` seconds, waiting scans are answered "queued" and stay
+    in the journal; while offline, new scans are answered "queued" at once
+    and the replayer retries with backoff. Only lost connections, pool
+    timeouts and lock errors count as an outage; any other error resolves
+    the batch's entries as "error" so later scans are not held behind them.
+    A result that arrives after its Future was answered is "late", and a
+    late result other than "applied" is a replay conflict. ``subscribe``
+    callbacks receive a status dict with the journal ``backlog``, whether
+    MySQL is ``online`` and the ``late`` problem results (entry fields plus
+    ``result``/``message``).
+
+    Every answered scan is handed to ``audit`` (a ScanAuditWriter) as a
+    scan_events row, tagged with the ``operator`` logged in when it was
+    scanned; replays of already-recorded keys are not audited twice.
+    """
+
+    def __init__(self, apply=Batch.transition_many, journal=None, window=SCAN_BATCH_WINDOW, max_batch=SCAN_BATCH_MAX,
+                 defer_after=SCAN_DEFER_AFTER, retry_interval=SCAN_REPLAY_INTERVAL, max_retry_interval=SCAN_REPLAY_MAX_INTERVAL,
+                 audit=scan_audit):
+        self.apply = apply
+        self.audit = audit
+        self.operator = None  # username stored with each scan; set by the scanner frame
+        self._journal = journal
+        self.window = window
+        self.max_batch = max_batch
+        self.defer_after = defer_after
+        self.retry_interval = retry_interval
+        self.max_retry_interval = max_retry_interval
+
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._waiting = {}  # scan_key -> (entry, Future) not answered yet
+        self._last_arrival = 0.0
+        self._burst = False
+        self._online = True
+        self._last_prune = 0.0
+        self._worker = None
+        self._subscribers = []
+        self.stats = {"scans": 0, "commits": 0, "largest_batch": 0, "queued": 0, "late": 0, "offline_errors": 0}
+
+    @property
+    def journal(self):
+        if self._journal is None:
+            self._journal = get_scan_journal()
+        return self._journal
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats)
+
+    def start(self):
+        """Starts the replayer, which first drains anything an earlier run left in the journal."""
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="scan-replayer", daemon=True)
+                self._worker.start()
+
+    def submit(self, scanned_code, mode, station_phase):
+        entry = self.journal.append(scanned_code, mode, station_phase, self.operator)
+        future = Future()
+        now = time.monotonic()
+        with self._lock:
+            self._burst = now - self._last_arrival < self.window
+            self._last_arrival = now
+            online = self._online
+            if online:
+                self._waiting[entry["scan_key"]] = (entry, future)
+            else:
+                self.stats["queued"] += 1
+
+        if not online:
+            future.set_result(_record_transition(scanned_code, _queued_result(entry)))
+        self.start()
+        self._wake.set()
+        self._publish()
+        return future
+
+    def subscribe(self, callback, dispatch=None):
+        """Calls ``callback(status)`` whenever the backlog changes; returns an unsubscribe function.
+
+        Pass ``dispatch=widget.after`` to have the callback run on the Tk
+        thread. The current status is sent right away.
+        """
+        entry = (callback, dispatch)
+        with self._lock:
+            self._subscribers.append(entry)
+        self.start()
+        self._publish(subscribers=[entry])
+
+        def unsubscribe():
+            with self._lock:
+                if entry in self._subscribers:
+                    self._subscribers.remove(entry)
+
+        return unsubscribe
+
+    def _publish(self, late=(), subscribers=None):
+        with self._lock:
+            subscribers = list(self._subscribers) if subscribers is None else subscribers
+            online = self._online
+        if not subscribers:
+            return
+        status = {"backlog": self.journal.backlog(), "online": online, "late": list(late)}
+        for callback, dispatch in subscribers:
+            try:
+                if dispatch is not None:
+                    dispatch(0, callback, status)
+                else:
+                    callback(status)
+            except Exception as e:
+                print(f"Scan journal subscriber failed: {e}")
+
+    def _run(self):
+        delay = self.retry_interval
+        while True:
+            self._wake.clear()
+            if self._drain():
+                delay = self.retry_interval
+                self._prune()
+                self._wake.wait()
+            else:
+                time.sleep(delay)
+                delay = min(delay * 2, self.max_retry_interval)
+
+    def _linger(self):
+        """After a scan that arrived in a burst, waits up to ``window`` for more to join its batch."""
+        deadline = time.monotonic() + self.window
+        while True:
+            with self._lock:
+                if not self._burst or len(self._waiting) >= self.max_batch:
+                    return
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            self._wake.clear()
+            self._wake.wait(remaining)
+
+    def _drain(self):
+        """Applies journal entries oldest-first until none are left; returns False if MySQL is unreachable."""
+        while True:
+            self._linger()
+            entries = self.journal.pending(self.max_batch)
+            if not entries:
+                return True
+
+            keys = [entry["scan_key"] for entry in entries]
+            timer = threading.Timer(self.defer_after, self._defer, (keys,))
+            timer.daemon = True
+            timer.start()
+            try:
+                results = self.apply([(e["barcode"], e["mode"], e["station_phase"]) for e in entries], keys=keys)
+            except Exception as e:
+                if isinstance(e, pymysql.MySQLError) and is_transient(e):
+                    self._go_offline(e)
+                    return False
+                # **Not an outage: retrying would wedge every later scan behind these entries**
+                results = [{"result": "error", "message": f"{entry['mode']} scan of '{entry['barcode']}' failed: {e}", "batch": None}
+                           for entry in entries]
+            finally:
+                timer.cancel()
+
+            self.journal.resolve([(key, result["result"], result["message"]) for key, result in zip(keys, results)])
+            self._deliver(entries, results)
+
+    def _deliver(self, entries, results):
+        with self._lock:
+            if not self._online:
+                print("Database is back; replaying journaled scans")
+            self._online = True
+            waiting = [self._waiting.pop(entry["scan_key"], None) for entry in entries]
+            self.stats["scans"] += len(entries)
+            self.stats["commits"] += 1
+            self.stats["largest_batch"] = max(self.stats["largest_batch"], len(entries))
+            self.stats["late"] += waiting.count(None)
+
+        late = []
+        for entry, result, pending in zip(entries, results, waiting):
+            if self.audit is not None and not result.get("duplicate"):
+                try:
+                    self.audit.record(scan_event(entry, result))
+                except Exception as e:
+                    # **The audit trail must never hold up or break scan delivery**
+                    print(f"Scan audit event for '{entry['barcode']}' failed: {e}")
+            result = _record_transition(entry["barcode"], result)
+            if pending is not None:
+                pending[1].set_result(result)
+            elif result["result"] != "applied":
+                late.append(dict(entry, result=result["result"], message=result["message"]))
+        self._publish(late)
+
+    def _answer_queued(self, answered):
+        for entry, future in answered:
+            future.set_result(_record_transition(entry["barcode"], _queued_result(entry)))
+        if answered:
+            self._publish()
+
+    def _defer(self, keys):
+        """Answers scans whose commit is taking too long as "queued"; their results come later."""
+        with self._lock:
+            answered = [self._waiting.pop(key) for key in keys if key in self._waiting]
+            self.stats["queued"] += len(answered)
+        self._answer_queued(answered)
+
+    def _go_offline(self, error):
+        with self._lock:
+            if self._online:
+                print(f"Database unavailable, journaling scans locally: {error}")
+            self._online = False
+            answered = list(self._waiting.values())
+            self._waiting.clear()
+            self.stats["queued"] += len(answered)
+            self.stats["offline_errors"] += 1
+        self._answer_queued(answered)
+        if not answered:
+            self._publish()
+
+    def _prune(self):
+        if time.monotonic() - self._last_prune < SCAN_PRUNE_INTERVAL:
+            return
+        self._last_prune = time.monotonic()
+        try:
+            self.journal.prune()
+        except Exception as e:
+            print(f"Scan journal prune failed: {e}")
+
+
+def _queued_result(entry):
+    return {
+        "result": "queued",
+        "message": f"Database unavailable; {entry['mode']} scan of {entry['barcode']} was saved and will be applied when it is back.",
+        "batch": None,
+    }
+
+
+transition_batcher = TransitionBatcher()
+
+
+def process_scan(request, report=None):
+    """Scan-pipeline entry point: a VIEW lookup or an IN/OUT transition for one ScanRequest.
+
+    VIEW reports the locally decoded preview through ``report`` before the
+    database lookup. Returns a dict with ``result``, ``message`` and ``batch``
+    like ``transition_scanned_barcode`` (VIEW results are "found",
+    "not_found", "invalid", or "offline" with the preview when MySQL cannot
+    be reached), or for IN/OUT a Future of that dict from the journaling
+    transition batcher.
+    """
+    if request.mode != "VIEW":
+        # **IN/OUT scans are journaled first; the pipeline delivers the Future's result when it is answered**
+        return _reject_invalid(request.code) or transition_batcher.submit(request.code, request.mode, request.station_phase)
+
+    try:
+        preview = resolve_scanned_barcode(request.code)
+    except ValueError as e:
+        return {"result": "invalid", "message": f"'{request.code}' is not a valid batch barcode.\n{e}", "batch": None}
+    if report:
+        report(preview)
+
+    try:
+        batch = process_scanned_barcode(request.code)
+    except pymysql.MySQLError as e:
+        print(f"Lookup of '{request.code}' failed: {e}")
+        return {"result": "offline", "message": "Database unavailable; showing what the barcode itself encodes.", "batch": preview}
+    if batch:
+        return {"result": "found", "message": "", "batch": batch}
+    return {"result": "not_found", "message": f"Barcode '{request.code}' was not found in the database!", "batch": None}
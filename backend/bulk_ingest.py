@@ -0,0 +1,149 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from openpyxl import load_workbook
+from backend.barcode_gen_print import (
+    REQUIRED_COLUMNS, PARALLEL_ENABLED, PARALLEL_MAX_WORKERS, PARALLEL_MIN_ROWS, PARALLEL_SHARD_ROWS, normalize_bulk_rows,
+    encode_bulk_rows,
+)
+
+DEFAULT_CHUNK_SIZE = 5000
+
+
+def _excel_value(value):
+    """Matches pandas' openpyxl reader, which turns whole-number floats into ints."""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def iter_excel_chunks(file_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yields DataFrames of ``chunk_size`` rows from the first sheet of an .xlsx file.
+
+    The workbook is opened in openpyxl read-only mode, so rows are streamed
+    from the file instead of loading the whole sheet. Each chunk's index is
+    the row's position in the sheet, as ``pd.read_excel`` would number it.
+    """
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(name) if name is not None else f"Unnamed: {i}" for i, name in enumerate(header)]
+        width = len(columns)
+
+        buffer = []
+        offset = 0
+        for row in rows:
+            values = [_excel_value(v) for v in row[:width]]
+            buffer.append(values + [None] * (width - len(values)))
+            if len(buffer) == chunk_size:
+                yield pd.DataFrame(buffer, columns=columns, index=range(offset, offset + len(buffer)))
+                offset += len(buffer)
+                buffer = []
+
+        # **Trailing blank rows are not part of the sheet for read_excel either**
+        while buffer and all(v is None for v in buffer[-1]):
+            buffer.pop()
+        if buffer:
+            yield pd.DataFrame(buffer, columns=columns, index=range(offset, offset + len(buffer)))
+    finally:
+        workbook.close()
+
+
+def iter_upload_chunks(file_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yields fixed-size DataFrame chunks from an .xlsx, .csv or legacy .xls upload."""
+    extension = os.path.splitext(file_path)[1].lower()
+
+    if extension == ".csv":
+        # **read_csv keeps a running index across chunks**
+        yield from pd.read_csv(file_path, chunksize=chunk_size)
+    elif extension == ".xls":
+        # **openpyxl cannot stream the old binary format; fall back to a full read**
+        df = pd.read_excel(file_path)
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size]
+    else:
+        yield from iter_excel_chunks(file_path, chunk_size)
+
+
+def _drop_seen_rows(chunk, seen):
+    """Drops rows that duplicate a row from an earlier chunk, remembering new ones."""
+    complete = chunk.dropna(subset=REQUIRED_COLUMNS)
+    keep = []
+    for index, key in zip(complete.index, zip(*(complete[col] for col in REQUIRED_COLUMNS))):
+        if key not in seen:
+            seen.add(key)
+            keep.append(index)
+    return chunk.loc[keep].copy()
+
+
+def process_bulk_file(file_path, chunk_size=DEFAULT_CHUNK_SIZE, progress=None, parallel=PARALLEL_ENABLED, max_workers=None):
+    """Streams an upload through validation and barcode generation one chunk at a time.
+
+    Returns ``(processed_data, error_rows, rows_read)``. ``progress`` is
+    called with ``(rows_read, processed_count, error_count)`` after every
+    chunk. Duplicate rows are dropped across chunk boundaries, as they would
+    be when processing the whole sheet at once.
+
+    With ``parallel`` the policy of ``parallel_workers`` applies: once
+    PARALLEL_MIN_ROWS rows have been read, the remaining chunks are grouped
+    into shards of PARALLEL_SHARD_ROWS rows and validated in a process pool
+    while reading goes on. Ids are still resolved here, and shards are
+    finished in file order, so the output does not depend on which worker
+    finishes first.
+    """
+    processed_data = []
+    error_rows = []
+    rows_read = 0
+    seen = set()
+
+    max_workers = max_workers or PARALLEL_MAX_WORKERS
+    pool = None
+    pending = deque()
+    shard = []
+
+    def finish(normalized):
+        processed, errors = encode_bulk_rows(*normalized)
+        processed_data.extend(processed)
+        error_rows.extend(errors)
+        if progress:
+            progress(rows_read, len(processed_data), len(error_rows))
+
+    try:
+        for chunk in iter_upload_chunks(file_path, chunk_size):
+            rows_read += len(chunk)
+            missing = [col for col in REQUIRED_COLUMNS if col not in chunk.columns]
+            if missing:
+                raise ValueError(f"Missing required column: {missing[0]}")
+
+            chunk = _drop_seen_rows(chunk, seen)
+            if pool is None and parallel and max_workers > 1 and rows_read >= PARALLEL_MIN_ROWS:
+                pool = ProcessPoolExecutor(max_workers=max_workers)
+
+            if pool is None:
+                finish(normalize_bulk_rows(chunk))
+                continue
+
+            # **One task per PARALLEL_SHARD_ROWS rows: smaller tasks cost more in pickling than they save**
+            shard.append(chunk)
+            if sum(len(part) for part in shard) < PARALLEL_SHARD_ROWS:
+                continue
+            pending.append(pool.submit(normalize_bulk_rows, pd.concat(shard)))
+            shard = []
+
+            # **Keep a couple of shards per worker in flight; more would only hold memory**
+            while len(pending) > 2 * max_workers:
+                finish(pending.popleft().result())
+
+        if shard:
+            pending.append(pool.submit(normalize_bulk_rows, pd.concat(shard)))
+        while pending:
+            finish(pending.popleft().result())
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    return processed_data, error_rows, rows_read
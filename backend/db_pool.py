@@ -0,0 +1,187 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import pymysql
+from pymysql.constants.SERVER_STATUS import SERVER_STATUS_IN_TRANS
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DB_CONFIG = {
+    "host": os.getenv("DB_HOST", "localhost"),
+    "user": os.getenv("DB_USER", "your_mysql_user"),
+    "password": os.getenv("DB_PASSWORD", "your_mysql_password"),
+    "database": os.getenv("DB_NAME", "barcode_management"),
+    "port": int(os.getenv("DB_PORT", 3306)),
+    "autocommit": False
+}
+
+POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN", 1))
+POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX", 10))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 10))
+POOL_PING_INTERVAL = float(os.getenv("DB_POOL_PING_INTERVAL", 30))
+
+# MySQL client errors meaning the socket itself is gone (server gone away / lost connection)
+CONNECTION_LOST_CODES = {2003, 2006, 2013, 2055}
+
+
+class PoolTimeoutError(pymysql.MySQLError):
+    """Raised when no connection becomes available within the checkout timeout."""
+
+
+class ConnectionPool:
+    """Thread-safe pool of pymysql connections shared by models and auth."""
+
+    def __init__(self, config=None, min_size=POOL_MIN_SIZE, max_size=POOL_MAX_SIZE,
+                 timeout=POOL_TIMEOUT, ping_interval=POOL_PING_INTERVAL, connect=pymysql.connect):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Pool sizes must satisfy 0 <= min_size <= max_size and max_size >= 1.")
+
+        self.config = dict(config or DB_CONFIG)
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.ping_interval = ping_interval
+        self._connect = connect
+
+        self._idle = []  # [(connection, last_used_monotonic)]
+        self._size = 0
+        self._lock = threading.Condition()
+        self._closed = False
+
+        self.stats = {"created": 0, "checkouts": 0, "reconnects": 0, "discarded": 0}
+
+        for _ in range(min_size):
+            self._idle.append((self._new_connection(), time.monotonic()))
+            self._size += 1
+
+    def _new_connection(self):
+        conn = self._connect(**self.config, cursorclass=pymysql.cursors.DictCursor)
+        self._count("created")
+        return conn
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _is_alive(self, conn, last_used):
+        """Pings connections that sat idle longer than the ping interval."""
+        if time.monotonic() - last_used < self.ping_interval:
+            return True
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def acquire(self):
+        """Checks out a live connection, opening or reconnecting one if needed."""
+        deadline = time.monotonic() + self.timeout
+
+        with self._lock:
+            while True:
+                if self._closed:
+                    raise pymysql.MySQLError("Connection pool is closed.")
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    conn, last_used = None, None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeoutError(f"No database connection available after {self.timeout}s.")
+                self._lock.wait(remaining)
+
+            self.stats["checkouts"] += 1
+
+        # **Connect / ping outside the lock so other threads are not blocked**
+        try:
+            if conn is None:
+                return self._new_connection()
+            if not self._is_alive(conn, last_used):
+                self._close_quietly(conn)
+                self._count("reconnects")
+                return self._new_connection()
+            return conn
+        except Exception:
+            with self._lock:
+                self._size -= 1
+                self._lock.notify()
+            raise
+
+    def release(self, conn, discard=False):
+        """Returns a connection to the pool, ending any open transaction first."""
+        if not discard and getattr(conn, "server_status", SERVER_STATUS_IN_TRANS) & SERVER_STATUS_IN_TRANS:
+            try:
+                conn.rollback()
+            except Exception:
+                discard = True
+
+        with self._lock:
+            if discard or self._closed:
+                self._size -= 1
+                self.stats["discarded"] += int(discard)
+                self._close_quietly(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._lock.notify()
+
+    @contextmanager
+    def connection(self):
+        """Context manager yielding a pooled connection.
+
+        The connection is discarded instead of reused when the block raises a
+        connection-level error, so a broken socket never goes back to the pool.
+        """
+        conn = self.acquire()
+        discard = False
+        try:
+            yield conn
+        except pymysql.MySQLError as e:
+            discard = is_connection_error(e)
+            raise
+        finally:
+            self.release(conn, discard=discard)
+
+    def close(self):
+        """Closes all idle connections and refuses further checkouts."""
+        with self._lock:
+            self._closed = True
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._size -= 1
+                self._close_quietly(conn)
+            self._lock.notify_all()
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+def is_connection_error(error):
+    """Returns True when a MySQL error means the connection is no longer usable."""
+    if isinstance(error, pymysql.err.InterfaceError):
+        return True
+    code = error.args[0] if error.args and isinstance(error.args[0], int) else None
+    return code in CONNECTION_LOST_CODES
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Returns the process-wide connection pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool()
+    return _pool
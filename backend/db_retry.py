@@ -0,0 +1,87 @@
+import os
+import random
+import threading
+import time
+
+import pymysql
+
+# **MySQL errors worth retrying: the transaction lost a lock conflict, not a bug**
+ER_LOCK_DEADLOCK = 1213
+ER_LOCK_WAIT_TIMEOUT = 1205
+RETRYABLE_ERRORS = {ER_LOCK_DEADLOCK: "deadlock", ER_LOCK_WAIT_TIMEOUT: "lock_wait_timeout"}
+
+RETRY_MAX_ATTEMPTS = int(os.getenv("DB_RETRY_MAX_ATTEMPTS", 5))
+RETRY_BASE_DELAY = float(os.getenv("DB_RETRY_BASE_DELAY", 0.02))
+RETRY_MAX_DELAY = float(os.getenv("DB_RETRY_MAX_DELAY", 0.5))
+RETRY_DEADLINE = float(os.getenv("DB_RETRY_DEADLINE", 3.0))
+
+
+def classify_error(error):
+    """Returns "deadlock", "lock_wait_timeout" or None for a MySQL error."""
+    code = error.args[0] if error.args and isinstance(error.args[0], int) else None
+    return RETRYABLE_ERRORS.get(code)
+
+
+class RetryPolicy:
+    """Retries a unit of work on deadlocks and lock-wait timeouts.
+
+    Delays grow exponentially from ``base_delay`` up to ``max_delay`` with
+    full jitter, so stations that collided do not retry in lockstep. Retrying
+    stops after ``max_attempts`` or once the next sleep would pass
+    ``deadline`` seconds since the first attempt; the last error is re-raised.
+    The caller is responsible for rolling back before the error propagates.
+    Retries are counted in ``stats`` rather than reported one by one.
+    """
+
+    def __init__(self, max_attempts=RETRY_MAX_ATTEMPTS, base_delay=RETRY_BASE_DELAY,
+                 max_delay=RETRY_MAX_DELAY, deadline=RETRY_DEADLINE):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+
+        self._lock = threading.Lock()
+        self.stats = {"attempts": 0, "retries": 0, "deadlock": 0, "lock_wait_timeout": 0, "gave_up": 0, "wait_seconds": 0.0}
+
+    def _record(self, **increments):
+        with self._lock:
+            for key, value in increments.items():
+                self.stats[key] += value
+
+    def snapshot(self):
+        """Returns a copy of the retry counters."""
+        with self._lock:
+            return dict(self.stats)
+
+    def backoff(self, retry_number):
+        cap = min(self.max_delay, self.base_delay * (2 ** retry_number))
+        return random.uniform(0, cap)
+
+    def run(self, attempt):
+        """Calls ``attempt()`` until it succeeds or the error is not worth retrying."""
+        started = time.monotonic()
+        retry_number = 0
+
+        while True:
+            self._record(attempts=1)
+            try:
+                return attempt()
+            except pymysql.MySQLError as e:
+                kind = classify_error(e)
+                if kind is None:
+                    raise
+
+                self._record(**{kind: 1})
+                delay = self.backoff(retry_number)
+                out_of_attempts = retry_number + 1 >= self.max_attempts
+                out_of_time = time.monotonic() + delay - started > self.deadline
+                if out_of_attempts or out_of_time:
+                    self._record(gave_up=1)
+                    raise
+
+                time.sleep(delay)
+                self._record(retries=1, wait_seconds=delay)
+                retry_number += 1
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
@@ -0,0 +1,387 @@
+"""Versioned schema migrations and query-plan check.
+
+Usage (from the repository root):
+
+    python -m backend.migrations migrate   # apply pending migrations
+    python -m backend.migrations status    # list applied / pending versions
+    python -m backend.migrations partitions  # add the coming months' scan_events partitions
+    python -m backend.migrations check     # EXPLAIN every models.py query, fail on full scans
+
+Migrating is an admin step. landing_page.py only checks ``pending_migrations``
+at startup and refuses to open until the schema is up to date.
+"""
+import os
+import sys
+from datetime import date
+from backend.models import Database, BATCH_SELECT, BATCH_FILTER_CONDITIONS, BATCH_SORT_COLUMNS
+
+SCAN_EVENT_PARTITION_MONTHS = int(os.getenv("SCAN_EVENT_PARTITION_MONTHS", 3))
+MIGRATION_LOCK_TIMEOUT = int(os.getenv("MIGRATION_LOCK_TIMEOUT", 60))
+
+# **Migrations**
+# Each migration is (version, description, steps). A step is either a SQL
+# string or a callable taking the Database. Steps must be idempotent so a
+# database created before migrations existed can be brought up to date.
+
+
+def add_index(db, table, name, columns, unique=False):
+    """Creates an index unless an index with the same name already exists."""
+    exists = db.fetch_one(
+        "SELECT 1 AS found FROM information_schema.statistics "
+        "WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s LIMIT 1",
+        (table, name),
+    )
+    if exists:
+        return
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    db.execute(f"CREATE {kind} {name} ON {table} ({', '.join(columns)})")
+
+
+def add_column(db, table, name, definition):
+    """Adds a column unless the table already has one with that name."""
+    exists = db.fetch_one(
+        "SELECT 1 AS found FROM information_schema.columns "
+        "WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s LIMIT 1",
+        (table, name),
+    )
+    if exists:
+        return
+    db.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+
+
+def ensure_scan_event_partitions(db, months_ahead=SCAN_EVENT_PARTITION_MONTHS):
+    """Splits monthly partitions for this month and ``months_ahead`` more off scan_events' p_future.
+
+    scan_events is partitioned by RANGE on scanned_at, one partition per
+    month (p202610 holds October 2026) plus the catch-all p_future. Run it
+    from a monthly job (``python -m backend.migrations partitions``); old
+    months can then be archived or dropped with ALTER TABLE ... DROP
+    PARTITION instead of a huge DELETE. Returns the partitions added.
+    """
+    existing = {row["name"] for row in db.fetch_all(
+        "SELECT partition_name AS name FROM information_schema.partitions "
+        "WHERE table_schema = DATABASE() AND table_name = 'scan_events'"
+    )}
+    latest = max((name for name in existing if name and name[1:].isdigit()), default=None)
+
+    year, month = date.today().year, date.today().month
+    added = []
+    for _ in range(months_ahead + 1):
+        name = f"p{year:04d}{month:02d}"
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        # **Ranges must stay ascending: only months after the newest existing partition**
+        if latest is None or name > latest:
+            added.append((name, f"{year:04d}-{month:02d}-01"))
+
+    if added:
+        parts = ", ".join(f"PARTITION {name} VALUES LESS THAN ('{bound}')" for name, bound in added)
+        db.execute(f"ALTER TABLE scan_events REORGANIZE PARTITION p_future INTO ({parts}, PARTITION p_future VALUES LESS THAN (MAXVALUE))")
+    return [name for name, _ in added]
+
+
+MIGRATIONS = [
+    (1, "Create base schema", [
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            user_id INT AUTO_INCREMENT PRIMARY KEY,
+            username VARCHAR(100) NOT NULL,
+            password CHAR(64) NOT NULL,
+            role VARCHAR(20) NOT NULL
+        ) ENGINE=InnoDB
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS brands (
+            brand_id INT AUTO_INCREMENT PRIMARY KEY,
+            brand_name VARCHAR(100) NOT NULL
+        ) ENGINE=InnoDB
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS models (
+            model_id INT AUTO_INCREMENT PRIMARY KEY,
+            model_name VARCHAR(100) NOT NULL
+        ) ENGINE=InnoDB
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS sizes (
+            size_id INT AUTO_INCREMENT PRIMARY KEY,
+            size_value VARCHAR(50) NOT NULL
+        ) ENGINE=InnoDB
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS colors (
+            color_id INT AUTO_INCREMENT PRIMARY KEY,
+            color_name VARCHAR(100) NOT NULL
+        ) ENGINE=InnoDB
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS production_phases (
+            phase_id INT AUTO_INCREMENT PRIMARY KEY,
+            phase_name VARCHAR(50) NOT NULL
+        ) ENGINE=InnoDB
+        """,
+        """
+        INSERT IGNORE INTO production_phases (phase_id, phase_name)
+        VALUES (1, 'Cutting'), (2, 'Sewing'), (3, 'Packaging')
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS batches (
+            batch_id INT AUTO_INCREMENT PRIMARY KEY,
+            barcode VARCHAR(64) NOT NULL,
+            brand_id INT,
+            model_id INT,
+            size_id INT,
+            color_id INT,
+            quantity INT NOT NULL,
+            layers INT NOT NULL,
+            serial VARCHAR(10) NOT NULL,
+            current_phase INT,
+            status VARCHAR(20) NOT NULL DEFAULT 'Pending',
+            FOREIGN KEY (brand_id) REFERENCES brands (brand_id),
+            FOREIGN KEY (model_id) REFERENCES models (model_id),
+            FOREIGN KEY (size_id) REFERENCES sizes (size_id),
+            FOREIGN KEY (color_id) REFERENCES colors (color_id),
+            FOREIGN KEY (current_phase) REFERENCES production_phases (phase_id)
+        ) ENGINE=InnoDB
+        """,
+    ]),
+    (2, "Unique keys on lookup names and usernames", [
+        lambda db: add_index(db, "brands", "uq_brands_brand_name", ["brand_name"], unique=True),
+        lambda db: add_index(db, "models", "uq_models_model_name", ["model_name"], unique=True),
+        lambda db: add_index(db, "sizes", "uq_sizes_size_value", ["size_value"], unique=True),
+        lambda db: add_index(db, "colors", "uq_colors_color_name", ["color_name"], unique=True),
+        lambda db: add_index(db, "production_phases", "uq_phases_phase_name", ["phase_name"], unique=True),
+        lambda db: add_index(db, "users", "uq_users_username", ["username"], unique=True),
+    ]),
+    (3, "Batch barcode, phase and status indexes", [
+        lambda db: add_index(db, "batches", "uq_batches_barcode", ["barcode"], unique=True),
+        lambda db: add_index(db, "batches", "idx_batches_phase_status", ["current_phase", "status"]),
+        lambda db: add_index(db, "batches", "idx_batches_status", ["status"]),
+    ]),
+    (4, "Batch row change timestamp for scan cache validation", [
+        lambda db: add_column(db, "batches", "updated_at", "TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)"),
+    ]),
+    (5, "Idempotency keys for replayed scans", [
+        """
+        CREATE TABLE IF NOT EXISTS scan_keys (
+            scan_key CHAR(32) NOT NULL PRIMARY KEY,
+            batch_id INT,
+            result VARCHAR(20) NOT NULL,
+            recorded_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB
+        """,
+    ]),
+    (6, "Production line order for phases", [
+        lambda db: add_column(db, "production_phases", "sort_order", "INT NOT NULL DEFAULT 0"),
+        "UPDATE production_phases SET sort_order = phase_id WHERE sort_order = 0",
+    ]),
+    # **Audit trail: no foreign keys and scanned_at in the primary key, so the table can be partitioned by month**
+    (7, "Scan event audit table", [
+        """
+        CREATE TABLE IF NOT EXISTS scan_events (
+            event_id BIGINT NOT NULL AUTO_INCREMENT,
+            scanned_at DATETIME(6) NOT NULL,
+            batch_id INT,
+            barcode VARCHAR(64) NOT NULL,
+            station VARCHAR(64) NOT NULL,
+            username VARCHAR(100),
+            mode VARCHAR(8) NOT NULL,
+            station_phase INT,
+            from_phase INT,
+            from_status VARCHAR(20),
+            to_phase INT,
+            to_status VARCHAR(20),
+            result VARCHAR(20) NOT NULL,
+            latency_ms INT,
+            scan_key CHAR(32),
+            PRIMARY KEY (event_id, scanned_at),
+            INDEX idx_scan_events_batch (batch_id, scanned_at),
+            INDEX idx_scan_events_phase (to_phase, scanned_at)
+        ) ENGINE=InnoDB
+        PARTITION BY RANGE COLUMNS (scanned_at) (PARTITION p_future VALUES LESS THAN (MAXVALUE))
+        """,
+        ensure_scan_event_partitions,
+    ]),
+    (8, "Batch serial index for the serial filter and sort", [
+        lambda db: add_index(db, "batches", "idx_batches_serial", ["serial"]),
+    ]),
+]
+
+
+def ensure_migrations_table(db):
+    db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            description VARCHAR(255) NOT NULL,
+            applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB
+        """
+    )
+
+
+def applied_versions(db):
+    ensure_migrations_table(db)
+    return {row["version"] for row in db.fetch_all("SELECT version FROM schema_migrations")}
+
+
+def pending_migrations():
+    """Returns the ``(version, description)`` of every migration not yet applied, without changing anything.
+
+    Only reads, so stations without CREATE/ALTER rights can check the
+    schema; a database that has never been migrated reports all of them.
+    """
+    with Database() as db:
+        exists = db.fetch_one(
+            "SELECT 1 AS found FROM information_schema.tables "
+            "WHERE table_schema = DATABASE() AND table_name = 'schema_migrations' LIMIT 1"
+        )
+        done = {row["version"] for row in db.fetch_all("SELECT version FROM schema_migrations")} if exists else set()
+    return [(version, description) for version, description, _ in MIGRATIONS if version not in done]
+
+
+def migrate():
+    """Applies every pending migration in version order; returns the versions applied.
+
+    Runs under a named lock, so stations starting at the same time apply
+    each migration once.
+    """
+    applied = []
+    with Database() as db:
+        locked = db.fetch_one("SELECT GET_LOCK('schema_migrations', %s) AS locked", (MIGRATION_LOCK_TIMEOUT,))
+        if not locked or not locked["locked"]:
+            raise RuntimeError("Timed out waiting for another process to finish migrating the database.")
+        try:
+            done = applied_versions(db)
+            for version, description, steps in MIGRATIONS:
+                if version in done:
+                    continue
+                print(f"Applying migration {version}: {description}")
+                for step in steps:
+                    if callable(step):
+                        step(db)
+                    else:
+                        db.execute(step)
+                db.execute("INSERT INTO schema_migrations (version, description) VALUES (%s, %s)", (version, description))
+                db.commit()
+                applied.append(version)
+        finally:
+            db.fetch_one("SELECT RELEASE_LOCK('schema_migrations') AS released")
+    return applied
+
+
+def status():
+    with Database() as db:
+        done = applied_versions(db)
+    for version, description, _ in MIGRATIONS:
+        print(f"[{'x' if version in done else ' '}] {version:03d} {description}")
+
+
+# **Query-plan check**
+# Every query issued by backend/models.py and backend/auth.py with representative
+# parameters; each must be answered through an index. Unbounded whole-table
+# reads (Batch.get_batches, ProductionPhase.get_phases/get_phase_order, the
+# Brand/Model/Size/Color get_* loaders behind the reference caches, Auth.get_users)
+# are left out on purpose: no index can serve them, and a full scan is the plan.
+# Sorted pages are checked under a phase filter, as the manage-data frames load them.
+CHECKED_QUERIES = [
+    ("Batch.create_batch existence probe", "SELECT batch_id FROM batches WHERE barcode = %s", ("X",)),
+    ("Batch.create_batches existence probe", "SELECT barcode FROM batches WHERE barcode IN (%s, %s)", ("X", "Y")),
+    ("Batch.get_batch_by_barcode", f"{BATCH_SELECT} WHERE b.barcode = %s", ("X",)),
+    ("Batch.search_batches by phase/status",
+     f"{BATCH_SELECT} WHERE {BATCH_FILTER_CONDITIONS['phase']} AND {BATCH_FILTER_CONDITIONS['status']} LIMIT 200",
+     ("Sewing%", "Pending")),
+    ("Batch.search_batches by barcode prefix", f"{BATCH_SELECT} WHERE {BATCH_FILTER_CONDITIONS['barcode']} LIMIT 200", ("BC1%",)),
+    ("Batch.search_batches by model prefix", f"{BATCH_SELECT} WHERE {BATCH_FILTER_CONDITIONS['model']} LIMIT 200", ("123%",)),
+    ("Batch.search_batches by serial prefix", f"{BATCH_SELECT} WHERE {BATCH_FILTER_CONDITIONS['serial']} LIMIT 200", ("00%",)),
+    *[(f"Batch.search_batches in a phase sorted by {key}",
+       f"{BATCH_SELECT} WHERE {BATCH_FILTER_CONDITIONS['phase']} ORDER BY {column} ASC, b.batch_id ASC LIMIT 100",
+       ("Sewing%",)) for key, column in BATCH_SORT_COLUMNS.items()],
+    ("Batch.search_batches count by brand",
+     f"SELECT COUNT(*) AS total FROM batches b WHERE {BATCH_FILTER_CONDITIONS['brand']}", ("x%",)),
+    ("Batch.transition_by_barcode update",
+     "UPDATE batches SET current_phase = %s, status = %s "
+     "WHERE batch_id = %s AND current_phase = %s AND status = %s", (2, "Pending", 1, 1, "In Progress")),
+    ("Batch.transition_many read", f"{BATCH_SELECT} WHERE b.barcode IN (%s, %s)", ("X", "Y")),
+    ("Batch.transition_many update",
+     "UPDATE batches SET current_phase = CASE batch_id WHEN %s THEN %s WHEN %s THEN %s END, "
+     "status = CASE batch_id WHEN %s THEN %s WHEN %s THEN %s END "
+     "WHERE (batch_id, current_phase, status) IN ((%s, %s, %s), (%s, %s, %s))",
+     (1, 2, 2, 2, 1, "Pending", 2, "Pending", 1, 1, "In Progress", 2, 1, "In Progress")),
+    ("Batch.transition_many scan key lookup", "SELECT scan_key, result FROM scan_keys WHERE scan_key IN (%s, %s)", ("x", "y")),
+    ("Batch.transition_by_barcode refresh", f"{BATCH_SELECT} WHERE b.batch_id = %s", (1,)),
+    ("Batch.get_batch_version", "SELECT batch_id, updated_at FROM batches WHERE barcode = %s", ("X",)),
+    ("Batch.update_batch_status", "UPDATE batches SET status = %s WHERE batch_id = %s", ("Pending", 1)),
+    ("Batch.update_batch_phase", "UPDATE batches SET current_phase = %s WHERE batch_id = %s", (1, 1)),
+    ("Batch.delete_batch", "DELETE FROM batches WHERE batch_id = %s", (1,)),
+    ("Brand.add_brand lookup", "SELECT brand_id FROM brands WHERE brand_name = %s", ("x",)),
+    ("Brand.ensure_many lookup", "SELECT brand_id, brand_name FROM brands WHERE brand_name IN (%s, %s)", ("x", "y")),
+    ("Model.add_model lookup", "SELECT model_id FROM models WHERE model_name = %s", ("x",)),
+    ("Model.ensure_many lookup", "SELECT model_id, model_name FROM models WHERE model_name IN (%s, %s)", ("x", "y")),
+    ("Size.add_size lookup", "SELECT size_id FROM sizes WHERE size_value = %s", ("x",)),
+    ("Size.ensure_many lookup", "SELECT size_id, size_value FROM sizes WHERE size_value IN (%s, %s)", ("x", "y")),
+    ("Color.add_color lookup", "SELECT color_id FROM colors WHERE color_name = %s", ("x",)),
+    ("Color.ensure_many lookup", "SELECT color_id, color_name FROM colors WHERE color_name IN (%s, %s)", ("x", "y")),
+    ("Auth.authenticate_user", "SELECT user_id, username, password, role FROM users WHERE username = %s", ("x",)),
+    ("Auth.update_user_role", "UPDATE users SET role = %s WHERE user_id = %s", ("Admin", 1)),
+]
+
+
+def find_full_scans(plan):
+    """Returns the tables in an EXPLAIN result that are read without an index.
+
+    A table counts as a full scan when the access type is ALL or index (a
+    walk of a whole index) or MySQL chose no key, whatever possible_keys
+    lists: a candidate index the optimizer does not use still means reading
+    every row. Plan rows without a table (e.g. "no matching row in const
+    table") read nothing and are skipped.
+    """
+    scans = []
+    for row in plan:
+        if not row.get("table"):
+            continue
+        access = (row.get("type") or "").upper()
+        if access in ("ALL", "INDEX") or row.get("key") is None:
+            scans.append(row.get("table"))
+    return scans
+
+
+def check():
+    """EXPLAINs every registered query; returns False if any full scan is found."""
+    ok = True
+    with Database() as db:
+        for name, query, params in CHECKED_QUERIES:
+            plan = db.fetch_all(f"EXPLAIN {query}", params)
+            scans = find_full_scans(plan)
+            if not scans:
+                print(f"OK    {name}")
+            else:
+                print(f"FAIL  {name}: full scan on {', '.join(map(str, scans))}")
+                ok = False
+    return ok
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    command = argv[0] if argv else "migrate"
+
+    if command == "migrate":
+        applied = migrate()
+        print(f"Applied {len(applied)} migration(s).")
+        return 0
+    if command == "status":
+        status()
+        return 0
+    if command == "partitions":
+        with Database() as db:
+            added = ensure_scan_event_partitions(db)
+        print(f"Added {len(added)} scan_events partition(s){': ' + ', '.join(added) if added else '.'}")
+        return 0
+    if command == "check":
+        return 0 if check() else 1
+
+    print(__doc__)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,52 +1,181 @@
 import pymysql
-import os
-import time
-from dotenv import load_dotenv
-
-load_dotenv()
-
-DB_CONFIG = {
-    "host": os.getenv("DB_HOST", "localhost"),
-    "user": os.getenv("DB_USER", "your_mysql_user"),
-    "password": os.getenv("DB_PASSWORD", "your_mysql_password"),
-    "database": os.getenv("DB_NAME", "barcode_management"),
-    "port": int(os.getenv("DB_PORT", 3306)),
-    "autocommit": False 
-}
+from pymysql.constants.SERVER_STATUS import SERVER_STATUS_IN_TRANS
+from backend.db_pool import get_pool, is_connection_error
+from backend.db_retry import DEFAULT_RETRY_POLICY, classify_error
+from backend.workflow import STATUS_COMPLETED, get_workflow
 
 class Database:
-    def __init__(self):
-        self.conn = pymysql.connect(**DB_CONFIG, cursorclass=pymysql.cursors.DictCursor)
+    def __init__(self, retry_policy=None):
+        self.retry_policy = retry_policy or DEFAULT_RETRY_POLICY
+        self.pool = get_pool()
+        self.conn = self.pool.acquire()
         self.cursor = self.conn.cursor()
+        self._broken = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if isinstance(exc, pymysql.MySQLError) and is_connection_error(exc):
+            self._broken = True
+        self.close()
 
     def execute_query(self, query, params=()):
-        """Executes a query with retries to handle concurrency safely."""
-        for _ in range(5):
+        """Executes and commits one statement, retrying deadlocks and lock-wait timeouts."""
+        def attempt():
             try:
                 self.cursor.execute(query, params)
                 self.conn.commit()
-                return
             except pymysql.MySQLError as e:
-                if "lock" in str(e).lower():
-                    time.sleep(1)  
+                if is_connection_error(e):
+                    self._broken = True
                 else:
                     self.conn.rollback()
-                    raise e
-        raise pymysql.MySQLError("Database operation failed after multiple retries.")
+                raise
+
+        self.retry_policy.run(attempt)
+
+    def execute(self, query, params=()):
+        """Executes a statement inside the current transaction without committing."""
+        try:
+            return self.cursor.execute(query, params)
+        except pymysql.MySQLError as e:
+            if is_connection_error(e):
+                self._broken = True
+            raise
+
+    def commit(self):
+        self.conn.commit()
+
+    def rollback(self):
+        self.conn.rollback()
+
+    def rollback_quietly(self):
+        """Rolls back, marking the connection broken instead of raising if that fails."""
+        try:
+            self.conn.rollback()
+        except pymysql.MySQLError:
+            self._broken = True
+
+    def _execute_read(self, query, params):
+        """Runs a read, reconnecting once on a fresh pooled connection if the socket dropped.
+
+        Reads inside an open transaction are not retried, since a new
+        connection would silently lose the statements already executed.
+        """
+        in_transaction = self.conn.server_status & SERVER_STATUS_IN_TRANS
+        try:
+            self.cursor.execute(query, params)
+        except pymysql.MySQLError as e:
+            if not is_connection_error(e) or in_transaction:
+                if is_connection_error(e):
+                    self._broken = True
+                raise
+            self.pool.release(self.conn, discard=True)
+            self.conn = None
+            self.conn = self.pool.acquire()
+            self.cursor = self.conn.cursor()
+            self.cursor.execute(query, params)
 
     def fetch_all(self, query, params=()):
-        self.cursor.execute(query, params)
+        self._execute_read(query, params)
         return self.cursor.fetchall()
 
     def fetch_one(self, query, params=()):
-        self.cursor.execute(query, params)
+        self._execute_read(query, params)
         return self.cursor.fetchone()
 
     def close(self):
-        self.cursor.close()
-        self.conn.close()
+        """Returns the connection to the shared pool instead of closing it."""
+        if self.conn is None:
+            return
+        try:
+            self.cursor.close()
+        finally:
+            self.pool.release(self.conn, discard=self._broken)
+            self.conn = None
+
+def run_in_transaction(work, retry_policy=None):
+    """Runs ``work(db)`` as one transaction and returns its result.
+
+    The unit is committed when ``work`` returns and rolled back when it
+    raises. Deadlocks and lock-wait timeouts replay the whole unit on a fresh
+    pooled connection under the retry policy, so ``work`` must not have side
+    effects outside the database.
+    """
+    policy = retry_policy or DEFAULT_RETRY_POLICY
+
+    def attempt():
+        with Database(policy) as db:
+            try:
+                result = work(db)
+                db.commit()
+                return result
+            except pymysql.MySQLError:
+                db.rollback_quietly()
+                raise
+
+    return policy.run(attempt)
+
+BATCH_COLUMNS = ("barcode", "brand_id", "model_id", "size_id", "color_id", "quantity", "layers", "serial", "current_phase", "status")
+
+BATCH_FROM = """
+    FROM batches b
+    LEFT JOIN brands br ON b.brand_id = br.brand_id
+    LEFT JOIN models m ON b.model_id = m.model_id
+    LEFT JOIN sizes s ON b.size_id = s.size_id
+    LEFT JOIN colors c ON b.color_id = c.color_id
+    LEFT JOIN production_phases p ON b.current_phase = p.phase_id
+"""
+
+BATCH_SELECT = """
+    SELECT 
+        b.batch_id, 
+        b.barcode, 
+        br.brand_name, 
+        m.model_name, 
+        s.size_value, 
+        c.color_name, 
+        b.quantity, 
+        b.layers, 
+        b.serial, 
+        p.phase_name, 
+        b.status,
+        b.current_phase,
+        b.updated_at
+""" + BATCH_FROM
+
+# **Filter keys used by the manage-data frames mapped to their display columns**
+BATCH_FILTER_COLUMNS = {
+    "barcode": "b.barcode",
+    "brand": "br.brand_name",
+    "model": "m.model_name",
+    "size": "s.size_value",
+    "color": "c.color_name",
+    "serial": "b.serial",
+    "phase": "p.phase_name",
+    "status": "b.status",
+}
+
+# **How each filter matches: by prefix, lookup names through their unique name index**
+BATCH_FILTER_CONDITIONS = {
+    "barcode": "b.barcode LIKE %s",
+    "brand": "b.brand_id IN (SELECT brand_id FROM brands WHERE brand_name LIKE %s)",
+    "model": "b.model_id IN (SELECT model_id FROM models WHERE model_name LIKE %s)",
+    "size": "b.size_id IN (SELECT size_id FROM sizes WHERE size_value LIKE %s)",
+    "color": "b.color_id IN (SELECT color_id FROM colors WHERE color_name LIKE %s)",
+    "serial": "b.serial LIKE %s",
+    "phase": "b.current_phase IN (SELECT phase_id FROM production_phases WHERE phase_name LIKE %s)",
+    "status": "b.status = %s",
+}
+BATCH_PREFIX_FILTERS = ("barcode", "brand", "model", "size", "color", "serial", "phase")
+
+BATCH_SORT_COLUMNS = dict(BATCH_FILTER_COLUMNS, quantity="b.quantity", layers="b.layers", batch_id="b.batch_id")
 
 class Batch:
+    INSERT_CHUNK_SIZE = 500
+    PROBE_CHUNK_SIZE = 1000
+
     @staticmethod
     def create_batch(barcode, brand_id, model_id, size_id, color_id, quantity, layers, serial, current_phase, status):
         db = Database()
@@ -63,33 +192,386 @@ class Batch:
         finally:
             db.close()
 
+    @staticmethod
+    def create_batches(rows):
+        """Inserts many batches in one transaction and returns {barcode: outcome}.
+
+        ``rows`` are dicts keyed by ``BATCH_COLUMNS``; a barcode repeated in
+        ``rows`` is only considered once. Outcomes are "inserted", "duplicate"
+        (already in the table) or "failed". Existing barcodes are found with
+        one ``IN (...)`` probe and the rest go in as chunked multi-row
+        ``INSERT IGNORE`` statements. The unique key on ``batches.barcode``
+        turns a concurrent insert of the same barcode into an ignored row;
+        when a chunk inserts fewer rows than expected it is rolled back to its
+        savepoint and replayed row by row so every barcode gets an exact
+        outcome. A deadlock replays the whole unit under the retry policy.
+        """
+        pending = []
+        seen = set()
+        for row in rows:
+            if row["barcode"] not in seen:
+                seen.add(row["barcode"])
+                pending.append(row)
+
+        if not pending:
+            return {}
+
+        column_list = ", ".join(BATCH_COLUMNS)
+        row_placeholder = "(" + ", ".join(["%s"] * len(BATCH_COLUMNS)) + ")"
+        single_insert = f"INSERT IGNORE INTO batches ({column_list}) VALUES {row_placeholder}"
+
+        def must_abort(error):
+            return is_connection_error(error) or classify_error(error) is not None
+
+        def work(db):
+            outcomes = {row["barcode"]: None for row in pending}
+            for existing in Batch._existing_barcodes(db, list(outcomes)):
+                outcomes[existing] = "duplicate"
+
+            to_insert = [row for row in pending if outcomes[row["barcode"]] is None]
+
+            for start in range(0, len(to_insert), Batch.INSERT_CHUNK_SIZE):
+                chunk = to_insert[start:start + Batch.INSERT_CHUNK_SIZE]
+                params = [row[col] for row in chunk for col in BATCH_COLUMNS]
+                query = f"INSERT IGNORE INTO batches ({column_list}) VALUES " + ", ".join([row_placeholder] * len(chunk))
+
+                db.execute("SAVEPOINT batch_chunk")
+                try:
+                    inserted = db.execute(query, params)
+                except pymysql.MySQLError as e:
+                    if must_abort(e):
+                        raise
+                    inserted = -1
+
+                if inserted == len(chunk):
+                    for row in chunk:
+                        outcomes[row["barcode"]] = "inserted"
+                    continue
+
+                # **Lost a race or hit a bad row: replay this chunk one row at a time**
+                db.execute("ROLLBACK TO SAVEPOINT batch_chunk")
+                for row in chunk:
+                    try:
+                        inserted = db.execute(single_insert, [row[col] for col in BATCH_COLUMNS])
+                    except pymysql.MySQLError as e:
+                        if must_abort(e):
+                            raise
+                        print(f"Failed to insert barcode '{row['barcode']}': {e}")
+                        outcomes[row["barcode"]] = "failed"
+                        continue
+                    if inserted:
+                        outcomes[row["barcode"]] = "inserted"
+                    elif Batch._existing_barcodes(db, [row["barcode"]]):
+                        outcomes[row["barcode"]] = "duplicate"
+                    else:
+                        outcomes[row["barcode"]] = "failed"
+
+            return outcomes
+
+        try:
+            return run_in_transaction(work)
+        except pymysql.MySQLError as e:
+            print(f"Database Error: {e}")
+            return {row["barcode"]: "failed" for row in pending}
+
+    @staticmethod
+    def _existing_barcodes(db, barcodes):
+        """Returns the subset of ``barcodes`` already present in the batches table."""
+        existing = set()
+        for start in range(0, len(barcodes), Batch.PROBE_CHUNK_SIZE):
+            chunk = barcodes[start:start + Batch.PROBE_CHUNK_SIZE]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            rows = db.fetch_all(f"SELECT barcode FROM batches WHERE barcode IN ({placeholders})", chunk)
+            existing.update(row["barcode"] for row in rows)
+        return existing
+
     @staticmethod
     def get_batches():
         db = Database()
-        query = """
-            SELECT 
-                b.batch_id, 
-                b.barcode, 
-                br.brand_name, 
-                m.model_name, 
-                s.size_value, 
-                c.color_name, 
-                b.quantity, 
-                b.layers, 
-                b.serial, 
-                p.phase_name, 
-                b.status
-            FROM batches b
-            LEFT JOIN brands br ON b.brand_id = br.brand_id
-            LEFT JOIN models m ON b.model_id = m.model_id
-            LEFT JOIN sizes s ON b.size_id = s.size_id
-            LEFT JOIN colors c ON b.color_id = c.color_id
-            LEFT JOIN production_phases p ON b.current_phase = p.phase_id
-        """
-        batches = db.fetch_all(query)
+        batches = db.fetch_all(BATCH_SELECT)
         db.close()
         return batches
 
+    @staticmethod
+    def search_batches(filters=None, sort=None, limit=100, offset=0, total=None):
+        """Returns (rows, total) for one page of batches matching ``filters``.
+
+        ``filters`` maps keys of ``BATCH_FILTER_CONDITIONS`` to values; empty
+        values are ignored. Status matches exactly, every other key by prefix
+        (so model "123" finds "1230000"), case-insensitively per the column
+        collation. Matching, ordering and paging all happen in SQL, so only
+        ``limit`` rows leave the server. ``sort`` is a ``(key, "asc"|"desc")``
+        pair over ``BATCH_SORT_COLUMNS``. ``total`` is the number of matching
+        rows for the pager; pass the previous total when only the page
+        changes to skip the COUNT.
+        """
+        where, params = Batch._build_filters(filters or {})
+
+        order_by = "b.batch_id ASC"
+        if sort:
+            key, direction = sort
+            if key not in BATCH_SORT_COLUMNS:
+                raise ValueError(f"Cannot sort batches by '{key}'.")
+            direction = "DESC" if str(direction).lower() == "desc" else "ASC"
+            order_by = f"{BATCH_SORT_COLUMNS[key]} {direction}, b.batch_id {direction}"
+
+        db = Database()
+        try:
+            if total is None:
+                # **The count needs no joins: every filter is a condition on batches itself**
+                total = db.fetch_one(f"SELECT COUNT(*) AS total FROM batches b {where}", params)["total"]
+            rows = db.fetch_all(f"{BATCH_SELECT} {where} ORDER BY {order_by} LIMIT %s OFFSET %s", params + [int(limit), int(offset)])
+            return rows, total
+        finally:
+            db.close()
+
+    @staticmethod
+    def iter_batches(filters=None, chunk_size=1000, as_tuples=False):
+        """Lazily yields batches matching ``filters`` using an unbuffered server-side cursor.
+
+        Rows are streamed ``chunk_size`` at a time in batch_id order, so memory
+        stays flat however large the table is. With ``as_tuples`` rows are
+        plain tuples in ``BATCH_SELECT`` column order instead of dicts. The
+        connection is held until the iterator is exhausted or closed; a
+        partially consumed stream is dropped rather than drained.
+        """
+        where, params = Batch._build_filters(filters or {})
+        cursor_class = pymysql.cursors.SSCursor if as_tuples else pymysql.cursors.SSDictCursor
+
+        pool = get_pool()
+        conn = pool.acquire()
+        exhausted = False
+        try:
+            cursor = conn.cursor(cursor_class)
+            cursor.execute(f"{BATCH_SELECT} {where} ORDER BY b.batch_id", params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield from rows
+            cursor.close()
+            exhausted = True
+        finally:
+            pool.release(conn, discard=not exhausted)
+
+    @staticmethod
+    def _build_filters(filters):
+        clauses = []
+        params = []
+        for key, value in filters.items():
+            if key not in BATCH_FILTER_CONDITIONS:
+                raise ValueError(f"Cannot filter batches by '{key}'.")
+            value = str(value).strip() if value is not None else ""
+            if not value:
+                continue
+            if key in BATCH_PREFIX_FILTERS:
+                escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                value = f"{escaped}%"
+            clauses.append(BATCH_FILTER_CONDITIONS[key])
+            params.append(value)
+        where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+        return where, params
+
+    @staticmethod
+    def _check_transition(mode, station_phase):
+        mode = mode.upper()
+        if mode not in ("IN", "OUT"):
+            raise ValueError(f"Unsupported scanner mode '{mode}'.")
+        if station_phase not in get_workflow():
+            raise ValueError(f"Unknown production phase '{station_phase}'.")
+        return mode
+
+    @staticmethod
+    def _plan_transition(batch, barcode, mode, station_phase):
+        """Decides what an IN/OUT scan does to ``batch`` without touching the database.
+
+        Returns ``(result, target)``: ``result`` is a finished result dict when
+        the scan changes nothing (not found, illegal, already there), else
+        None; ``target`` is the ``(phase_name, status)`` to write, or None.
+        """
+        if not batch:
+            return {"result": "not_found", "message": f"Barcode '{barcode}' was not found in the database!", "batch": None}, None
+
+        if batch["phase_name"] != station_phase or batch["status"] == STATUS_COMPLETED:
+            return {
+                "result": "illegal",
+                "message": f"Item {barcode} is {batch['status']} in {batch['phase_name']}; it cannot be scanned {mode} at {station_phase}.",
+                "batch": batch,
+            }, None
+
+        new_phase, new_status = get_workflow().transition(station_phase, mode)
+
+        if (new_phase, new_status) == (batch["phase_name"], batch["status"]):
+            return {"result": "applied", "message": f"Item {barcode} is already {new_status} in {new_phase}.", "batch": batch}, None
+        return None, (new_phase, new_status)
+
+    @staticmethod
+    def _transition_message(barcode, mode, new_phase, new_status):
+        if new_status == STATUS_COMPLETED:
+            return f"Item {barcode} has completed production."
+        if mode == "IN":
+            return f"Item {barcode} started in {new_phase}."
+        return f"Item {barcode} moved to {new_phase}."
+
+    @staticmethod
+    def transition_by_barcode(barcode, mode, station_phase):
+        """Applies an IN/OUT scan at ``station_phase`` as one conditional update.
+
+        IN starts the batch at the station (status In Progress); OUT moves it
+        to the next phase as Pending, or marks it Completed at the last phase.
+        Both require the batch to currently sit at ``station_phase`` and not
+        be completed. The UPDATE is guarded by the phase and status that were
+        read, so a concurrent scan of the same batch is reported instead of
+        overwritten. Deadlocks and lock-wait timeouts retry the whole unit.
+
+        Returns a dict with ``result`` ("applied", "not_found", "illegal" or
+        "conflict"), a ``message`` and the refreshed ``batch`` row (None when
+        not found).
+        """
+        mode = Batch._check_transition(mode, station_phase)
+        barcode = barcode.strip()
+
+        def work(db):
+            batch = db.fetch_one(f"{BATCH_SELECT} WHERE b.barcode = %s", (barcode,))
+            result, target = Batch._plan_transition(batch, barcode, mode, station_phase)
+            if result:
+                return result
+
+            new_phase, new_status = target
+            updated = db.execute(
+                """
+                UPDATE batches
+                SET current_phase = %s, status = %s
+                WHERE batch_id = %s AND current_phase = %s AND status = %s
+                """,
+                (get_workflow().phase_id(new_phase), new_status, batch["batch_id"], batch["current_phase"], batch["status"]),
+            )
+            if updated != 1:
+                return {"result": "conflict", "message": f"Item {barcode} was changed by another scan; please scan again.", "batch": batch}
+
+            batch = db.fetch_one(f"{BATCH_SELECT} WHERE b.batch_id = %s", (batch["batch_id"],))
+            return {"result": "applied", "message": Batch._transition_message(barcode, mode, new_phase, new_status), "batch": batch}
+
+        return run_in_transaction(work)
+
+    @staticmethod
+    def transition_many(scans, keys=None):
+        """Applies a burst of IN/OUT scans in one transaction with set-based statements.
+
+        ``scans`` is a list of ``(barcode, mode, station_phase)`` in scan
+        order; returns one result dict per scan, as ``transition_by_barcode``
+        would. All rows are read with one IN query, the scans are replayed in
+        order against that snapshot (so IN then OUT of the same bundle works),
+        and every changed batch is written by a single UPDATE guarded by the
+        phase and status that were read. Batches the UPDATE did not change
+        were touched by someone else in between and report "conflict".
+        A scan with a bad mode or phase gets an "error" result of its own.
+
+        ``keys`` optionally gives each scan an idempotency key. Outcomes of
+        keyed scans are recorded in ``scan_keys`` in the same transaction,
+        and a key seen before is answered with its recorded result (marked
+        ``duplicate``) instead of being applied again, so replaying a
+        journal twice is harmless. Results of scans that found their batch
+        also carry ``from_phase``/``from_status``, the state the scan saw.
+        """
+        keys = keys or [None] * len(scans)
+        results = [None] * len(scans)
+        planned = []
+        for i, (barcode, mode, station_phase) in enumerate(scans):
+            try:
+                planned.append((i, barcode.strip(), Batch._check_transition(mode, station_phase), station_phase))
+            except ValueError as e:
+                results[i] = {"result": "error", "message": str(e), "batch": None}
+        if not planned:
+            return results
+
+        def work(db):
+            barcodes = list(dict.fromkeys(barcode for _, barcode, _, _ in planned))
+            placeholders = ", ".join(["%s"] * len(barcodes))
+            read = {row["barcode"]: row for row in db.fetch_all(f"{BATCH_SELECT} WHERE b.barcode IN ({placeholders})", barcodes)}
+            workflow = get_workflow()
+
+            scan_keys = [keys[i] for i, _, _, _ in planned if keys[i]]
+            recorded = {}
+            if scan_keys:
+                recorded = {row["scan_key"]: row["result"] for row in db.fetch_all(
+                    f"SELECT scan_key, result FROM scan_keys WHERE scan_key IN ({', '.join(['%s'] * len(scan_keys))})", scan_keys)}
+
+            # **Replay the scans in order against the snapshot**
+            state = {barcode: dict(row) for barcode, row in read.items()}
+            outcomes = {}
+            changed = {}
+            before = {}
+            for i, barcode, mode, station_phase in planned:
+                batch = state.get(barcode)
+                if keys[i] in recorded:
+                    outcomes[i] = {"result": recorded[keys[i]], "message": f"{mode} scan of {barcode} was already recorded.",
+                                   "batch": batch and dict(batch), "duplicate": True}
+                    continue
+                if batch:
+                    before[i] = (batch["current_phase"], batch["status"])
+                result, target = Batch._plan_transition(batch and dict(batch), barcode, mode, station_phase)
+                if result:
+                    outcomes[i] = result
+                    continue
+                new_phase, new_status = target
+                batch.update(phase_name=new_phase, status=new_status, current_phase=workflow.phase_id(new_phase))
+                changed[barcode] = batch
+                outcomes[i] = {"result": "applied", "message": Batch._transition_message(barcode, mode, new_phase, new_status), "batch": dict(batch)}
+
+            if changed:
+                originals = [read[barcode] for barcode in changed]
+                phase_case = " ".join(["WHEN %s THEN %s"] * len(changed))
+                status_case = " ".join(["WHEN %s THEN %s"] * len(changed))
+                guard = ", ".join(["(%s, %s, %s)"] * len(changed))
+                params = []
+                for barcode, batch in changed.items():
+                    params += [batch["batch_id"], batch["current_phase"]]
+                for barcode, batch in changed.items():
+                    params += [batch["batch_id"], batch["status"]]
+                for row in originals:
+                    params += [row["batch_id"], row["current_phase"], row["status"]]
+                db.execute(
+                    f"""
+                    UPDATE batches
+                    SET current_phase = CASE batch_id {phase_case} END,
+                        status = CASE batch_id {status_case} END
+                    WHERE (batch_id, current_phase, status) IN ({guard})
+                    """,
+                    params,
+                )
+
+                ids = [batch["batch_id"] for batch in changed.values()]
+                refreshed = {row["batch_id"]: row for row in db.fetch_all(
+                    f"{BATCH_SELECT} WHERE b.batch_id IN ({', '.join(['%s'] * len(ids))})", ids)}
+
+                for i, barcode, _, _ in planned:
+                    if barcode not in changed or outcomes[i]["result"] != "applied" or keys[i] in recorded:
+                        continue
+                    target = changed[barcode]
+                    row = refreshed.get(target["batch_id"])
+                    if row and (row["phase_name"], row["status"]) == (target["phase_name"], target["status"]):
+                        if outcomes[i]["batch"] == target:
+                            outcomes[i]["batch"] = row
+                    else:
+                        outcomes[i] = {"result": "conflict", "message": f"Item {barcode} was changed by another scan; please scan again.", "batch": row or read[barcode]}
+
+            for i, (from_phase, from_status) in before.items():
+                outcomes[i].update(from_phase=from_phase, from_status=from_status)
+
+            new_keys = [(keys[i], outcomes[i]["batch"] and outcomes[i]["batch"]["batch_id"], outcomes[i]["result"])
+                        for i, _, _, _ in planned if keys[i] and keys[i] not in recorded]
+            if new_keys:
+                db.execute(
+                    f"INSERT INTO scan_keys (scan_key, batch_id, result) VALUES {', '.join(['(%s, %s, %s)'] * len(new_keys))}",
+                    [value for row in new_keys for value in row],
+                )
+            return outcomes
+
+        for i, result in run_in_transaction(work).items():
+            results[i] = result
+        return results
+
     @staticmethod
     def update_batch_status(batch_id, status):
         db = Database()
@@ -115,39 +597,81 @@ class Batch:
         finally:
             db.close()
 
+    @staticmethod
+    def get_batch_version(barcode):
+        """Returns ``{"batch_id", "updated_at"}`` for a barcode from the unique index, or None."""
+        db = Database()
+        try:
+            return db.fetch_one("SELECT batch_id, updated_at FROM batches WHERE barcode = %s", (barcode.strip(),))
+        finally:
+            db.close()
+
     @staticmethod
     def get_batch_by_barcode(barcode):
         """Fetches a batch and its related details using a barcode."""
         db = Database()
         try:
             barcode = barcode.strip()
-            query = """
-                SELECT 
-                    b.batch_id, 
-                    b.barcode, 
-                    br.brand_name, 
-                    m.model_name, 
-                    s.size_value, 
-                    c.color_name, 
-                    b.quantity, 
-                    b.layers, 
-                    b.serial, 
-                    p.phase_name, 
-                    b.status
-                FROM batches b
-                LEFT JOIN brands br ON b.brand_id = br.brand_id
-                LEFT JOIN models m ON b.model_id = m.model_id
-                LEFT JOIN sizes s ON b.size_id = s.size_id
-                LEFT JOIN colors c ON b.color_id = c.color_id
-                LEFT JOIN production_phases p ON b.current_phase = p.phase_id
-                WHERE b.barcode = %s;
-            """
+            query = f"{BATCH_SELECT} WHERE b.barcode = %s"
             batch = db.fetch_one(query, (barcode,))
             return batch 
         
         finally:
             db.close()
 
+def ensure_dimension_values(table, id_column, name_column, values, chunk_size=500):
+    """Bulk get-or-create for a lookup table; returns {value: id} for every value.
+
+    Existing ids are resolved with ``IN (...)`` queries, unseen values are
+    inserted with one multi-row ``INSERT IGNORE`` per chunk and resolved the
+    same way, all in one transaction. Names are matched case-insensitively,
+    like the table's collation, so "Red" resolves to an existing "red".
+    """
+    values = list(dict.fromkeys(v for v in values if v is not None))
+    if not values:
+        return {}
+
+    def lookup(db, names):
+        found = {}
+        for start in range(0, len(names), chunk_size):
+            chunk = names[start:start + chunk_size]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            rows = db.fetch_all(f"SELECT {id_column}, {name_column} FROM {table} WHERE {name_column} IN ({placeholders})", chunk)
+            found.update({str(row[name_column]).lower(): row[id_column] for row in rows})
+        return found
+
+    def work(db):
+        ids = lookup(db, values)
+        missing = [v for v in values if str(v).lower() not in ids]
+
+        for start in range(0, len(missing), chunk_size):
+            chunk = missing[start:start + chunk_size]
+            db.execute(f"INSERT IGNORE INTO {table} ({name_column}) VALUES " + ", ".join(["(%s)"] * len(chunk)), chunk)
+
+        if missing:
+            ids.update(lookup(db, missing))
+        return ids
+
+    ids = run_in_transaction(work)
+    return {v: ids.get(str(v).lower()) for v in values}
+
+class ScanEvent:
+    COLUMNS = ("scanned_at", "batch_id", "barcode", "station", "username", "mode", "station_phase",
+               "from_phase", "from_status", "to_phase", "to_status", "result", "latency_ms", "scan_key")
+
+    @staticmethod
+    def insert_many(events):
+        """Appends audit events (dicts keyed by COLUMNS) to scan_events with one multi-row INSERT."""
+        if not events:
+            return
+        row = f"({', '.join(['%s'] * len(ScanEvent.COLUMNS))})"
+        params = [event.get(column) for event in events for column in ScanEvent.COLUMNS]
+
+        def work(db):
+            db.execute(f"INSERT INTO scan_events ({', '.join(ScanEvent.COLUMNS)}) VALUES {', '.join([row] * len(events))}", params)
+
+        run_in_transaction(work)
+
 class ProductionPhase:
     @staticmethod
     def get_phases():
@@ -156,6 +680,15 @@ class ProductionPhase:
         db.close()
         return {p["phase_name"]: p["phase_id"] for p in phases}
 
+    @staticmethod
+    def get_phase_order():
+        """Returns the phases as ``{"phase_id", "phase_name"}`` rows in production line order."""
+        db = Database()
+        try:
+            return db.fetch_all("SELECT phase_id, phase_name FROM production_phases ORDER BY sort_order, phase_id")
+        finally:
+            db.close()
+
 class Brand:
     @staticmethod
     def add_brand(brand_name):
@@ -167,6 +700,11 @@ class Brand:
         finally:
             db.close()
 
+    @staticmethod
+    def ensure_many(brand_names):
+        """Returns {name: brand_id}, inserting any unseen names in one statement."""
+        return ensure_dimension_values("brands", "brand_id", "brand_name", brand_names)
+
     @staticmethod
     def get_brands():
         db = Database()
@@ -185,6 +723,11 @@ class Model:
         finally:
             db.close()
 
+    @staticmethod
+    def ensure_many(model_names):
+        """Returns {name: model_id}, inserting any unseen names in one statement."""
+        return ensure_dimension_values("models", "model_id", "model_name", model_names)
+
     @staticmethod
     def get_models():
         db = Database()
@@ -203,6 +746,11 @@ class Size:
         finally:
             db.close()
 
+    @staticmethod
+    def ensure_many(size_values):
+        """Returns {name: size_id}, inserting any unseen names in one statement."""
+        return ensure_dimension_values("sizes", "size_id", "size_value", size_values)
+
     @staticmethod
     def get_sizes():
         db = Database()
@@ -221,6 +769,11 @@ class Color:
         finally:
             db.close()
 
+    @staticmethod
+    def ensure_many(color_names):
+        """Returns {name: color_id}, inserting any unseen names in one statement."""
+        return ensure_dimension_values("colors", "color_id", "color_name", color_names)
+
     @staticmethod
     def get_colors():
         db = Database()
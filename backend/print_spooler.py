@@ -0,0 +1,273 @@
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+
+from backend.barcode_gen_print import build_print_jobs, open_transport
+
+PRINT_QUEUE_SIZE = int(os.getenv("PRINT_QUEUE_SIZE", 8))
+PRINT_CHUNK_SIZE = int(os.getenv("PRINT_CHUNK_SIZE", 50))  # labels per spool job
+PRINT_MAX_LABELS_PER_SECOND = float(os.getenv("PRINT_MAX_LABELS_PER_SECOND", 20))
+PRINT_MAX_ATTEMPTS = int(os.getenv("PRINT_MAX_ATTEMPTS", 3))
+PRINT_RETRY_DELAY = float(os.getenv("PRINT_RETRY_DELAY", 1.0))
+PRINT_SPOOL_DIR = os.getenv("PRINT_SPOOL_DIR", os.path.join(os.path.expanduser("~"), ".barcode_print_spool"))
+
+QUEUED = "queued"
+PRINTING = "printing"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class PrintRecord:
+    """Append-only file of barcodes already printed for one job.
+
+    The file is named after a hash of the printer and the ordered barcode
+    list, so submitting the same labels to the same printer again finds the
+    record of the earlier run. It is deleted once the job completes.
+    """
+
+    def __init__(self, directory, printer_name, labels):
+        key = hashlib.sha1(json.dumps([printer_name] + [label["barcode"] for label in labels]).encode()).hexdigest()
+        self.path = os.path.join(directory, f"{key}.log")
+
+    def printed(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return {line.strip() for line in f if line.strip()}
+        except FileNotFoundError:
+            return set()
+
+    def add(self, barcodes):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(f"{barcode}\n" for barcode in barcodes))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def discard(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class PrintJob:
+    """One submitted print run; read its fields from the progress/done callbacks."""
+
+    def __init__(self, labels, printer_name, record, on_progress=None, on_done=None, dispatch=None):
+        self.labels = labels
+        self.printer_name = printer_name
+        self.record = record
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.dispatch = dispatch
+
+        self.total = len(labels)
+        self.printed = 0
+        self.skipped = 0
+        self.failed_barcode = None
+        self.error = None
+        self.state = QUEUED
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        """Stops the job after the label chunk currently being sent."""
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    @property
+    def done(self):
+        return self.state in (COMPLETED, FAILED, CANCELLED)
+
+    def _notify(self, callback):
+        if callback is None:
+            return
+        try:
+            if self.dispatch is not None:
+                # **e.g. widget.after(0, callback, job): runs the callback on the Tk thread**
+                self.dispatch(0, callback, self)
+            else:
+                callback(self)
+        except Exception as e:
+            print(f"Print job callback failed: {e}")
+
+
+class PrintSpooler:
+    """Prints label jobs one at a time on a background thread.
+
+    Jobs wait in a bounded queue; ``submit`` raises ``queue.Full`` when it is
+    full. Each job is sent in chunks of ``chunk_size`` labels, paced to at
+    most ``max_rate`` labels per second so the printer buffer is not flooded.
+    A chunk that fails is retried, then resent label by label (each label
+    retried too) so a single bad label is pinned down; the job stops at the
+    first label that still fails. Printed barcodes are appended to a
+    ``PrintRecord`` after every chunk, and resubmitting the same labels
+    skips them, so a failed or cancelled run resumes where it stopped.
+    """
+
+    def __init__(self, send=None, queue_size=PRINT_QUEUE_SIZE, chunk_size=PRINT_CHUNK_SIZE,
+                 max_rate=PRINT_MAX_LABELS_PER_SECOND, max_attempts=PRINT_MAX_ATTEMPTS,
+                 retry_delay=PRINT_RETRY_DELAY, spool_dir=PRINT_SPOOL_DIR):
+        self.send = send
+        self.chunk_size = chunk_size
+        self.max_rate = max_rate
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.spool_dir = spool_dir
+
+        self._jobs = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._worker = None
+        self._transports = {}
+
+    def _send(self, printer_name, zpl):
+        """Sends through ``send`` if one was given, else a transport kept open per printer."""
+        if self.send is not None:
+            self.send(printer_name, zpl)
+            return
+        transport = self._transports.get(printer_name)
+        if transport is None:
+            transport = self._transports[printer_name] = open_transport(printer_name)
+        try:
+            transport.send(zpl)
+        except Exception:
+            self._transports.pop(printer_name, None)
+            transport.close()
+            raise
+
+    def record_for(self, labels, printer_name):
+        return PrintRecord(self.spool_dir, printer_name, labels)
+
+    def already_printed(self, labels, printer_name):
+        """Returns how many of ``labels`` an earlier, unfinished run already printed."""
+        printed = self.record_for(labels, printer_name).printed()
+        return sum(1 for label in labels if label["barcode"] in printed)
+
+    def forget(self, labels, printer_name):
+        """Drops the record of an earlier run, so the next submit prints everything."""
+        self.record_for(labels, printer_name).discard()
+
+    def submit(self, labels, printer_name, on_progress=None, on_done=None, dispatch=None):
+        """Queues a print job and returns it; callbacks receive the PrintJob."""
+        labels = list(labels)
+        job = PrintJob(labels, printer_name, self.record_for(labels, printer_name), on_progress, on_done, dispatch)
+        self._jobs.put_nowait(job)
+        self._ensure_worker()
+        return job
+
+    def pending(self):
+        return self._jobs.qsize()
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="print-spooler", daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            try:
+                self._print_job(job)
+            except Exception as e:
+                job.state, job.error = FAILED, str(e)
+            finally:
+                self._jobs.task_done()
+                if self._jobs.empty():
+                    self._close_transports()
+            job._notify(job.on_done)
+
+    def _print_job(self, job):
+        if job.cancelled:
+            job.state = CANCELLED
+            return
+
+        job.state = PRINTING
+        done = job.record.printed()
+        remaining = [label for label in job.labels if label["barcode"] not in done]
+        job.skipped = job.total - len(remaining)
+        job.printed = job.skipped
+        job._notify(job.on_progress)
+
+        for start in range(0, len(remaining), self.chunk_size):
+            if job.cancelled:
+                job.state = CANCELLED
+                return
+
+            chunk = remaining[start:start + self.chunk_size]
+            started = time.monotonic()
+            sent = self._send_chunk(job, chunk)
+            if sent:
+                job.record.add(label["barcode"] for label in sent)
+                job.printed += len(sent)
+                job._notify(job.on_progress)
+            if len(sent) < len(chunk):
+                job.state = FAILED
+                return
+
+            # **Pacing: never feed the printer faster than max_rate labels per second**
+            if self.max_rate:
+                time.sleep(max(0.0, len(chunk) / self.max_rate - (time.monotonic() - started)))
+
+        job.state = COMPLETED
+        job.record.discard()
+
+    def _close_transports(self):
+        """Closes idle printer connections once the queue has drained."""
+        for transport in self._transports.values():
+            try:
+                transport.close()
+            except Exception:
+                pass
+        self._transports.clear()
+
+    def _send_chunk(self, job, chunk):
+        """Sends a chunk; returns the labels that were sent (a prefix of ``chunk``)."""
+        try:
+            self._send_with_retry(job, chunk)
+            return chunk
+        except Exception as e:
+            if len(chunk) == 1:
+                job.failed_barcode, job.error = chunk[0]["barcode"], str(e)
+                return []
+
+        sent = []
+        for label in chunk:
+            try:
+                self._send_with_retry(job, [label])
+            except Exception as e:
+                job.failed_barcode, job.error = label["barcode"], str(e)
+                break
+            sent.append(label)
+        return sent
+
+    def _send_with_retry(self, job, labels):
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                for zpl, _ in build_print_jobs(labels, len(labels)):
+                    self._send(job.printer_name, zpl)
+                return
+            except Exception as e:
+                if attempt == self.max_attempts or job.cancelled:
+                    raise
+                print(f"Print to {job.printer_name} failed ({e}); retry {attempt} of {self.max_attempts - 1}")
+                time.sleep(self.retry_delay * attempt)
+
+
+_spooler = None
+_spooler_lock = threading.Lock()
+
+
+def get_spooler():
+    """Returns the process-wide print spooler, creating it on first use."""
+    global _spooler
+    with _spooler_lock:
+        if _spooler is None:
+            _spooler = PrintSpooler()
+        return _spooler
@@ -0,0 +1,103 @@
+import os
+import threading
+import time
+
+from backend.barcode_gen_print import get_available_printers
+
+PRINTER_TTL = float(os.getenv("PRINTER_TTL", 300))  # seconds
+NO_PRINTERS = "No Zebra printers found"
+
+
+class PrinterRegistry:
+    """Cached list of printer queues, discovered on a background thread.
+
+    ``printers()`` always answers from the cache (empty until the first
+    discovery finishes) and starts a refresh in the background once the
+    list is older than ``ttl``. Frames ``subscribe`` to be told whenever a
+    discovery completes, so nothing on the Tk thread waits on enumeration.
+    """
+
+    def __init__(self, discover=get_available_printers, ttl=PRINTER_TTL):
+        self.discover = discover
+        self.ttl = ttl
+
+        self._printers = []
+        self._loaded_at = None
+        self._refreshing = False
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._loaded_at is not None
+
+    def _is_stale(self):
+        return self._loaded_at is None or (self.ttl is not None and time.monotonic() - self._loaded_at > self.ttl)
+
+    def printers(self):
+        """Returns the cached queue names, refreshing in the background if stale."""
+        if self._is_stale():
+            self.refresh()
+        with self._lock:
+            return list(self._printers)
+
+    def refresh(self, force=False):
+        """Starts a background discovery unless one is running (or the cache is fresh and not ``force``)."""
+        with self._lock:
+            if self._refreshing or not (force or self._is_stale()):
+                return
+            self._refreshing = True
+        threading.Thread(target=self._discover, name="printer-discovery", daemon=True).start()
+
+    def _discover(self):
+        try:
+            found = [name for name in self.discover() if name != NO_PRINTERS]
+        except Exception as e:
+            print(f"Printer discovery failed: {e}")
+            found = None
+
+        with self._lock:
+            if found is not None:
+                self._printers = found
+            self._loaded_at = time.monotonic()
+            self._refreshing = False
+            printers = list(self._printers)
+            subscribers = list(self._subscribers)
+
+        for callback, dispatch in subscribers:
+            self._notify(callback, dispatch, printers)
+
+    @staticmethod
+    def _notify(callback, dispatch, printers):
+        try:
+            if dispatch is not None:
+                dispatch(0, callback, printers)
+            else:
+                callback(printers)
+        except Exception as e:
+            print(f"Printer subscriber failed: {e}")
+
+    def subscribe(self, callback, dispatch=None):
+        """Calls ``callback(printers)`` after every discovery; returns an unsubscribe function.
+
+        Pass ``dispatch=widget.after`` to have the callback run on the Tk
+        thread. If a list is already cached the callback gets it right away.
+        """
+        entry = (callback, dispatch)
+        with self._lock:
+            self._subscribers.append(entry)
+            printers = list(self._printers) if self._loaded_at is not None else None
+
+        if printers is not None:
+            self._notify(callback, dispatch, printers)
+        self.refresh()
+
+        def unsubscribe():
+            with self._lock:
+                if entry in self._subscribers:
+                    self._subscribers.remove(entry)
+
+        return unsubscribe
+
+
+printer_registry = PrinterRegistry()
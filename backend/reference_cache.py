@@ -0,0 +1,135 @@
+import threading
+import time
+import pymysql
+from backend.models import Brand, Model, Size, Color
+
+DEFAULT_TTL = 300  # seconds
+REFRESH_RETRY_SECONDS = 10  # while the database is down, how long stale contents are served before retrying
+
+
+class DimensionCache:
+    """In-memory name<->id index over one lookup table (brands, models, sizes, ...).
+
+    The table is loaded once and served from memory until the TTL expires or
+    ``invalidate()`` bumps the version. New names are written through to the
+    database and added to both indexes, so callers never need a reload after
+    an insert.
+
+    If a reload fails because MySQL is unreachable, a cache that was loaded
+    before keeps serving its old contents and retries after
+    ``REFRESH_RETRY_SECONDS``; a cache that never loaded raises.
+    """
+
+    def __init__(self, loader, adder=None, bulk_adder=None, ttl=DEFAULT_TTL):
+        self.loader = loader
+        self.adder = adder
+        self.bulk_adder = bulk_adder
+        self.ttl = ttl
+
+        self.version = 0
+        self._name_to_id = {}
+        self._id_to_name = {}
+        self._loaded_at = None
+        self._loaded_version = -1
+        self._retry_at = None
+        self._lock = threading.RLock()
+
+    def _is_stale(self):
+        if self._retry_at is not None and time.monotonic() < self._retry_at:
+            return False
+        if self._loaded_version != self.version or self._loaded_at is None:
+            return True
+        return self.ttl is not None and time.monotonic() - self._loaded_at > self.ttl
+
+    def _ensure_loaded(self):
+        with self._lock:
+            if self._is_stale():
+                try:
+                    self.refresh()
+                except pymysql.MySQLError as e:
+                    if self._loaded_at is None:
+                        raise
+                    print(f"Reference data reload failed, serving cached values: {e}")
+                    self._retry_at = time.monotonic() + REFRESH_RETRY_SECONDS
+
+    def refresh(self):
+        """Reloads the whole table from the database."""
+        with self._lock:
+            mapping = self.loader()
+            self._name_to_id = dict(mapping)
+            self._id_to_name = {v: k for k, v in mapping.items()}
+            self._loaded_at = time.monotonic()
+            self._loaded_version = self.version
+            self._retry_at = None
+
+    def invalidate(self):
+        """Marks the cache stale; the next lookup reloads from the database."""
+        with self._lock:
+            self.version += 1
+
+    def remember(self, name, value_id):
+        """Adds a known name/id pair to both indexes without touching the database."""
+        if value_id is None:
+            return
+        with self._lock:
+            self._name_to_id[name] = value_id
+            self._id_to_name[value_id] = name
+
+    def get_id(self, name, default=None):
+        self._ensure_loaded()
+        return self._name_to_id.get(name, default)
+
+    def get_name(self, value_id, default=None):
+        self._ensure_loaded()
+        return self._id_to_name.get(value_id, default)
+
+    def get_or_add(self, name):
+        """Returns the id for ``name``, inserting it (write-through) if it is new."""
+        value_id = self.get_id(name)
+        if value_id is not None or self.adder is None:
+            return value_id
+
+        with self._lock:
+            value_id = self._name_to_id.get(name)
+            if value_id is None:
+                value_id = self.adder(name)
+                self.remember(name, value_id)
+            return value_id
+
+    def ensure_many(self, names):
+        """Returns {name: id} for all ``names``, bulk-inserting the unseen ones in one call."""
+        names = list(dict.fromkeys(names))
+        self._ensure_loaded()
+
+        with self._lock:
+            missing = [name for name in names if name not in self._name_to_id]
+            if missing and self.bulk_adder is not None:
+                for name, value_id in self.bulk_adder(missing).items():
+                    self.remember(name, value_id)
+            elif missing and self.adder is not None:
+                for name in missing:
+                    self.remember(name, self.adder(name))
+            return {name: self._name_to_id.get(name) for name in names}
+
+    def names(self):
+        self._ensure_loaded()
+        return list(self._name_to_id.keys())
+
+    def as_dict(self):
+        """Returns a copy of the name -> id mapping, like the ``get_*`` model methods."""
+        self._ensure_loaded()
+        return dict(self._name_to_id)
+
+
+brand_cache = DimensionCache(Brand.get_brands, Brand.add_brand, Brand.ensure_many)
+model_cache = DimensionCache(Model.get_models, Model.add_model, Model.ensure_many)
+size_cache = DimensionCache(Size.get_sizes, Size.add_size, Size.ensure_many)
+color_cache = DimensionCache(Color.get_colors, Color.add_color, Color.ensure_many)
+
+ALL_CACHES = (brand_cache, model_cache, size_cache, color_cache)
+
+
+def invalidate_all():
+    """Invalidates every reference-data cache (e.g. after an admin edits lookup tables)."""
+    for cache in ALL_CACHES:
+        cache.invalidate()
@@ -0,0 +1,27 @@
+import csv
+from backend.models import Batch
+
+EXPORT_COLUMNS = [
+    ("Barcode", "barcode"),
+    ("Brand", "brand_name"),
+    ("Model", "model_name"),
+    ("Size", "size_value"),
+    ("Color", "color_name"),
+    ("Quantity", "quantity"),
+    ("Layers", "layers"),
+    ("Serial", "serial"),
+    ("Phase", "phase_name"),
+    ("Status", "status"),
+]
+
+
+def export_batches_csv(file_path, filters=None, chunk_size=1000):
+    """Streams batches matching ``filters`` into a CSV file and returns the row count."""
+    count = 0
+    with open(file_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow([header for header, _ in EXPORT_COLUMNS])
+        for batch in Batch.iter_batches(filters, chunk_size=chunk_size):
+            writer.writerow([batch[key] for _, key in EXPORT_COLUMNS])
+            count += 1
+    return count
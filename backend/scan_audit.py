@@ -0,0 +1,160 @@
+import os
+import queue
+import socket
+import threading
+import time
+from datetime import datetime
+
+import pymysql
+from backend.db_pool import PoolTimeoutError, is_connection_error
+from backend.db_retry import classify_error
+from backend.models import ScanEvent
+from backend.workflow import get_workflow
+
+SCAN_AUDIT_BUFFER = int(os.getenv("SCAN_AUDIT_BUFFER", 10000))  # events held in memory at most
+SCAN_AUDIT_FLUSH_ROWS = int(os.getenv("SCAN_AUDIT_FLUSH_ROWS", 500))
+SCAN_AUDIT_FLUSH_SECONDS = float(os.getenv("SCAN_AUDIT_FLUSH_SECONDS", 1.0))
+SCAN_AUDIT_RETRY_MAX = float(os.getenv("SCAN_AUDIT_RETRY_MAX", 30.0))
+SCAN_STATION = os.getenv("SCAN_STATION", socket.gethostname())
+
+
+class ScanAuditWriter:
+    """Writes scan events to scan_events from a bounded in-memory buffer.
+
+    ``record`` only puts the event on a queue of at most ``buffer_size``
+    entries and returns; it never waits on MySQL. A background thread takes
+    up to ``flush_rows`` events, waiting at most ``flush_seconds`` for a
+    batch to fill, and writes them with one multi-row INSERT. If MySQL is
+    unreachable (or the write hits a lock error) the batch is retried with
+    backoff while new events wait in the buffer; once the buffer is full
+    further events are dropped and counted in ``stats["dropped"]``, so an
+    outage can never grow memory or slow the scanner. A batch MySQL rejects
+    for any other reason is logged and dropped.
+    """
+
+    def __init__(self, insert=ScanEvent.insert_many, buffer_size=SCAN_AUDIT_BUFFER, flush_rows=SCAN_AUDIT_FLUSH_ROWS,
+                 flush_seconds=SCAN_AUDIT_FLUSH_SECONDS, retry_max=SCAN_AUDIT_RETRY_MAX):
+        self.insert = insert
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.retry_max = retry_max
+
+        self._events = queue.Queue(maxsize=buffer_size)
+        self._lock = threading.Lock()
+        self._worker = None
+        self.stats = {"recorded": 0, "written": 0, "flushes": 0, "dropped": 0, "failures": 0}
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self.stats)
+        stats["buffered"] = self._events.qsize()
+        return stats
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self.stats[key] += amount
+
+    def record(self, event):
+        """Queues one event (a dict keyed like ScanEvent.COLUMNS); returns False if it was dropped."""
+        try:
+            self._events.put_nowait(event)
+        except queue.Full:
+            self._count("dropped")
+            return False
+        self._count("recorded")
+
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="scan-audit", daemon=True)
+                self._worker.start()
+        return True
+
+    def _collect(self):
+        batch = [self._events.get()]
+        deadline = time.monotonic() + self.flush_seconds
+        while len(batch) < self.flush_rows:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._events.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                self._write(batch)
+            finally:
+                for _ in batch:
+                    self._events.task_done()
+
+    def _write(self, batch):
+        delay = self.flush_seconds
+        while True:
+            try:
+                self.insert(batch)
+            except pymysql.MySQLError as e:
+                if not is_transient(e):
+                    # **A batch MySQL rejects outright is dropped rather than retried forever**
+                    self._count("dropped", len(batch))
+                    print(f"Scan audit dropped {len(batch)} events rejected by MySQL: {e}")
+                    return
+                self._count("failures")
+                print(f"Scan audit write of {len(batch)} events failed, retrying in {delay:.1f}s: {e}")
+                time.sleep(delay)
+                delay = min(delay * 2, self.retry_max)
+                continue
+            except Exception as e:
+                self._count("dropped", len(batch))
+                print(f"Scan audit dropped {len(batch)} events: {e}")
+                return
+            self._count("written", len(batch))
+            self._count("flushes")
+            return
+
+    def flush(self, timeout=None):
+        """Waits until every recorded event is written or dropped; returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._events.unfinished_tasks:
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+
+def is_transient(error):
+    """Returns True for MySQL errors worth retrying: a lost connection, pool exhaustion or a lock error."""
+    return isinstance(error, PoolTimeoutError) or is_connection_error(error) or classify_error(error) is not None
+
+
+def scan_event(entry, result, station=SCAN_STATION):
+    """Builds the audit event for a journaled scan (see ScanJournal) and its transition result.
+
+    ``to_phase``/``to_status`` hold the state the scan left the batch in, so
+    they are NULL when it was not applied (illegal, conflict, not found).
+    """
+    batch = result.get("batch") or {}
+    applied = result["result"] == "applied"
+    resolved_at = time.time()
+    return {
+        "scanned_at": datetime.fromtimestamp(entry["scanned_at"]),
+        "batch_id": batch.get("batch_id"),
+        "barcode": entry["barcode"],
+        "station": station,
+        "username": entry.get("operator"),
+        "mode": entry["mode"],
+        "station_phase": get_workflow().phase_id(entry["station_phase"]),
+        "from_phase": result.get("from_phase"),
+        "from_status": result.get("from_status"),
+        "to_phase": batch.get("current_phase") if applied else None,
+        "to_status": batch.get("status") if applied else None,
+        "result": result["result"],
+        "latency_ms": int((resolved_at - entry["scanned_at"]) * 1000),
+        "scan_key": entry.get("scan_key"),
+    }
+
+
+scan_audit = ScanAuditWriter()
@@ -0,0 +1,131 @@
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+SCAN_JOURNAL_PATH = os.getenv("SCAN_JOURNAL_PATH", os.path.join(os.path.expanduser("~"), ".barcode_scan_journal.sqlite3"))
+SCAN_JOURNAL_KEEP_SECONDS = float(os.getenv("SCAN_JOURNAL_KEEP_SECONDS", 7 * 24 * 3600))
+
+
+class ScanJournal:
+    """Local append-only journal of IN/OUT scans, written before MySQL sees them.
+
+    Scans are kept in a SQLite file in WAL mode, one durable commit per
+    scan, so a station keeps every movement through database outages and
+    restarts. Each entry gets a random ``scan_key`` that the replayer passes
+    to MySQL as an idempotency key. An entry stays pending (``result`` NULL)
+    until MySQL has answered for it; resolved entries are kept for
+    ``keep_seconds`` so late conflicts can still be reviewed, then pruned.
+    """
+
+    def __init__(self, path=SCAN_JOURNAL_PATH, keep_seconds=SCAN_JOURNAL_KEEP_SECONDS):
+        self.path = path
+        self.keep_seconds = keep_seconds
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS scans (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                scan_key TEXT NOT NULL UNIQUE,
+                barcode TEXT NOT NULL,
+                mode TEXT NOT NULL,
+                station_phase TEXT NOT NULL,
+                scanned_at REAL NOT NULL,
+                operator TEXT,
+                result TEXT,
+                message TEXT,
+                resolved_at REAL
+            )
+            """
+        )
+        # **Journals written before scans carried the operator get the column added**
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(scans)")}
+        if "operator" not in columns:
+            self._conn.execute("ALTER TABLE scans ADD COLUMN operator TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_scans_pending ON scans (seq) WHERE result IS NULL")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_scans_resolved_at ON scans (resolved_at)")
+
+    def append(self, barcode, mode, station_phase, operator=None):
+        """Durably records a scan and returns its entry dict (with ``seq`` and ``scan_key``)."""
+        entry = {"scan_key": uuid.uuid4().hex, "barcode": barcode, "mode": mode,
+                 "station_phase": station_phase, "scanned_at": time.time(), "operator": operator}
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO scans (scan_key, barcode, mode, station_phase, scanned_at, operator) VALUES (?, ?, ?, ?, ?, ?)",
+                (entry["scan_key"], barcode, mode, station_phase, entry["scanned_at"], operator),
+            )
+        entry["seq"] = cursor.lastrowid
+        return entry
+
+    def pending(self, limit):
+        """Returns up to ``limit`` unresolved entries, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, scan_key, barcode, mode, station_phase, scanned_at, operator FROM scans "
+                "WHERE result IS NULL ORDER BY seq LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def backlog(self):
+        """Returns how many entries are still waiting for MySQL."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM scans WHERE result IS NULL").fetchone()[0]
+
+    def resolve(self, outcomes):
+        """Stores ``(scan_key, result, message)`` for entries MySQL has answered, in one commit."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "UPDATE scans SET result = ?, message = ?, resolved_at = ? WHERE scan_key = ?",
+                    [(result, message, now, key) for key, result, message in outcomes],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def problems(self, limit=50):
+        """Returns the most recent resolved entries that were not applied, newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, scan_key, barcode, mode, station_phase, scanned_at, result, message, resolved_at "
+                "FROM scans WHERE result IS NOT NULL AND result != 'applied' ORDER BY seq DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def prune(self):
+        """Deletes resolved entries older than ``keep_seconds``; returns how many were removed."""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM scans WHERE resolved_at < ?", (time.time() - self.keep_seconds,))
+        return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_journal = None
+_journal_lock = threading.Lock()
+
+
+def get_scan_journal():
+    """Returns the process-wide scan journal, opening it on first use."""
+    global _journal
+    with _journal_lock:
+        if _journal is None:
+            _journal = ScanJournal()
+        return _journal
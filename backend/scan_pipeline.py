@@ -0,0 +1,127 @@
+import itertools
+import os
+import queue
+import threading
+import time
+import zlib
+from concurrent.futures import Future
+
+SCAN_WORKERS = int(os.getenv("SCAN_WORKERS", 2))
+
+
+class ScanRequest:
+    """One scan as captured by the <Return> handler, before any processing."""
+
+    def __init__(self, seq, code, mode, station_phase):
+        self.seq = seq
+        self.code = code
+        self.mode = mode
+        self.station_phase = station_phase
+        self.received_at = time.monotonic()
+
+
+class ScanPipeline:
+    """Processes scans on worker threads, keeping scans of one barcode in order.
+
+    ``submit`` only records the scan and returns, so the Tk handler never
+    waits on MySQL. Each barcode is hashed to one of ``workers`` lanes, and
+    each lane is a FIFO queue drained by its own thread, so two scans of
+    the same bundle are always processed in the order they were made while
+    different bundles proceed in parallel. Queues are unbounded: a burst is
+    absorbed, never dropped.
+
+    ``process(request, report)`` does the work and returns the result, or a
+    Future of it when the work is handed on (the lane moves to its next
+    scan without waiting); ``report(partial)`` may be called first to show
+    something early.
+    Callbacks are passed through ``dispatch`` (e.g. ``widget.after``):
+    ``on_result(request, result)``, ``on_partial(request, partial)`` and
+    ``on_depth(pending)`` whenever the number of unfinished scans changes.
+    """
+
+    def __init__(self, process, on_result, on_partial=None, on_depth=None, dispatch=None, workers=SCAN_WORKERS):
+        self.process = process
+        self.on_result = on_result
+        self.on_partial = on_partial
+        self.on_depth = on_depth
+        self.dispatch = dispatch
+
+        self._seq = itertools.count(1)
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._lanes = []
+        for lane in range(max(1, workers)):
+            lane_queue = queue.Queue()
+            threading.Thread(target=self._run, args=(lane_queue,), name=f"scan-worker-{lane}", daemon=True).start()
+            self._lanes.append(lane_queue)
+
+    def _call(self, callback, *args):
+        if callback is None:
+            return
+        try:
+            if self.dispatch is not None:
+                self.dispatch(0, callback, *args)
+            else:
+                callback(*args)
+        except Exception as e:
+            print(f"Scan callback failed: {e}")
+
+    def _lane_for(self, code):
+        # **A stable hash (not hash(), which is salted per process) keeps a barcode on one lane**
+        return self._lanes[zlib.crc32(code.encode()) % len(self._lanes)]
+
+    def pending(self):
+        with self._lock:
+            return self._pending
+
+    def submit(self, code, mode, station_phase):
+        """Queues a scan and returns its ScanRequest immediately."""
+        request = ScanRequest(next(self._seq), code, mode, station_phase)
+        with self._lock:
+            self._pending += 1
+            pending = self._pending
+        self._lane_for(code).put(request)
+        self._call(self.on_depth, pending)
+        return request
+
+    def _run(self, lane_queue):
+        handed_on = {}  # code -> Future of its last handed-on scan, for ordering
+        while True:
+            request = lane_queue.get()
+
+            # **Forget finished hand-offs so the map only holds scans still in flight**
+            for code in [code for code, future in handed_on.items() if future.done()]:
+                del handed_on[code]
+
+            # **A scan handed on earlier must finish before the next scan of the same code runs**
+            earlier = handed_on.pop(request.code, None)
+            if earlier is not None:
+                try:
+                    earlier.exception()
+                except Exception:
+                    pass
+
+            try:
+                result = self.process(request, lambda partial: self._call(self.on_partial, request, partial))
+            except Exception as e:
+                result = self._error(request, e)
+
+            if isinstance(result, Future):
+                handed_on[request.code] = result
+                result.add_done_callback(lambda future, request=request: self._finish(request, self._outcome(request, future)))
+            else:
+                self._finish(request, result)
+
+    def _error(self, request, error):
+        return {"result": "error", "message": f"Scan of '{request.code}' failed: {error}", "batch": None}
+
+    def _outcome(self, request, future):
+        error = future.exception()
+        return self._error(request, error) if error else future.result()
+
+    def _finish(self, request, result):
+        with self._lock:
+            self._pending -= 1
+            pending = self._pending
+        self._call(self.on_result, request, result)
+        self._call(self.on_depth, pending)
@@ -0,0 +1,103 @@
+import threading
+from types import MappingProxyType
+
+# **Batch statuses used by scan transitions**
+STATUS_PENDING = "Pending"
+STATUS_IN_PROGRESS = "In Progress"
+STATUS_COMPLETED = "Completed"
+STATUSES = (STATUS_PENDING, STATUS_IN_PROGRESS, STATUS_COMPLETED)
+
+
+class PhaseWorkflow:
+    """Production line order with every transition precomputed.
+
+    Built from ``(phase_id, phase_name)`` pairs in line order, as stored in
+    production_phases. Lookups (name <-> id, next/previous phase, the
+    result of an IN or OUT scan) are plain dict reads on tables computed
+    once here; the object is never changed after construction, so threads
+    can share it without locking and a refresh simply swaps in a new one.
+
+    IN at a phase starts the batch there (In Progress); OUT moves it to the
+    next phase as Pending, or marks it Completed at the terminal phase.
+    """
+
+    def __init__(self, phases):
+        phases = list(phases)
+        if not phases:
+            raise ValueError("The production line has no phases.")
+
+        self.phases = tuple(name for _, name in phases)
+        self.first = self.phases[0]
+        self.terminal = self.phases[-1]
+        self._ids = MappingProxyType({name: phase_id for phase_id, name in phases})
+        self._names = MappingProxyType({phase_id: name for phase_id, name in phases})
+
+        following = dict(zip(self.phases, self.phases[1:]))
+        preceding = dict(zip(self.phases[1:], self.phases))
+        self._next = MappingProxyType(following)
+        self._previous = MappingProxyType(preceding)
+
+        transitions = {}
+        for name in self.phases:
+            transitions[(name, "IN")] = (name, STATUS_IN_PROGRESS)
+            transitions[(name, "OUT")] = (following[name], STATUS_PENDING) if name in following else (name, STATUS_COMPLETED)
+        self._transitions = MappingProxyType(transitions)
+
+    def __contains__(self, phase_name):
+        return phase_name in self._ids
+
+    def __iter__(self):
+        return iter(self.phases)
+
+    def __len__(self):
+        return len(self.phases)
+
+    def phase_id(self, phase_name, default=None):
+        return self._ids.get(phase_name, default)
+
+    def phase_name(self, phase_id, default=None):
+        return self._names.get(phase_id, default)
+
+    def next_phase(self, phase_name):
+        """Returns the phase after ``phase_name``, or None at the terminal phase."""
+        return self._next.get(phase_name)
+
+    def previous_phase(self, phase_name):
+        """Returns the phase before ``phase_name``, or None at the first phase."""
+        return self._previous.get(phase_name)
+
+    def is_terminal(self, phase_name):
+        return phase_name == self.terminal
+
+    def transition(self, phase_name, mode):
+        """Returns the ``(phase_name, status)`` an IN/OUT scan at ``phase_name`` leads to, or None."""
+        return self._transitions.get((phase_name, mode))
+
+
+def _load_phases():
+    # **Imported here: models itself uses the workflow for transitions**
+    from backend.models import ProductionPhase
+    return [(row["phase_id"], row["phase_name"]) for row in ProductionPhase.get_phase_order()]
+
+
+_workflow = None
+_workflow_lock = threading.Lock()
+
+
+def get_workflow():
+    """Returns the shared PhaseWorkflow, loading it from production_phases on first use."""
+    workflow = _workflow
+    if workflow is None:
+        with _workflow_lock:
+            if _workflow is None:
+                return refresh_workflow()
+            workflow = _workflow
+    return workflow
+
+
+def refresh_workflow(loader=_load_phases):
+    """Reloads the phases from the database and swaps in a new PhaseWorkflow."""
+    global _workflow
+    workflow = PhaseWorkflow(loader())
+    _workflow = workflow
+    return workflow
@@ -0,0 +1,125 @@
+"""Bulk upload validation benchmark.
+
+Times the validation/normalization stage of process_bulk_barcodes on a
+synthetic sheet, comparing the old ``iterrows()`` loop with the columnar
+``normalize_bulk_rows``, and checks both produce the same rows and errors.
+With ``--workers N`` it also times the process-pool path with N shards.
+No database is needed: id resolution and barcode encoding are not timed.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_bulk_processing --rows 100000 --workers 4
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from backend.barcode_gen_print import REQUIRED_COLUMNS, normalize_bulk_rows
+
+
+def make_sheet(rows, seed=7):
+    rng = np.random.default_rng(seed)
+    models = np.array(["12345", "AB-1234", "7788990.0", "xy12", "Model_77", " 0012345 ", ""], dtype=object)
+    return pd.DataFrame({
+        "brand": rng.choice(np.array([" Nike", "ADIDAS", "puma ", "Reebok"], dtype=object), rows),
+        "model": rng.choice(models, rows),
+        "size": rng.choice(np.array(["S", "M", "L", "XL", 40, 42], dtype=object), rows),
+        "color": rng.choice(np.array(["Red", "blue ", "GREEN"], dtype=object), rows),
+        "quantity": rng.integers(0, 1100, rows),
+        "layers": rng.integers(0, 110, rows),
+        "serial": rng.integers(0, 1100, rows),
+    })
+
+
+def legacy_normalize(df):
+    """The pre-vectorization row loop, kept here as the reference implementation."""
+    valid, errors = [], []
+    df["original_index"] = df.index
+    df = df.dropna(subset=REQUIRED_COLUMNS).reset_index(drop=True)
+    df = df.drop_duplicates(subset=REQUIRED_COLUMNS, keep="first").reset_index(drop=True)
+
+    for position, row in df.iterrows():
+        try:
+            brand_name = str(row["brand"]).strip().lower()
+            size_value = str(row["size"]).strip().lower()
+            color_name = str(row["color"]).strip().lower()
+
+            model_name = str(row["model"]).strip()
+            if model_name == "":
+                errors.append((position, "Model name is missing."))
+                continue
+            if model_name.isdigit():
+                model_name = str(int(model_name))
+            elif model_name.replace(".", "").isdigit():
+                model_name = str(int(float(model_name)))
+            model_name = "".join(filter(str.isalnum, model_name))
+            if len(model_name) < 7:
+                model_name = model_name.ljust(7, "0")
+
+            try:
+                quantity = int(row["quantity"])
+                layers = int(row["layers"])
+                serial = int(row["serial"])
+            except ValueError:
+                errors.append((position, "Invalid numeric values in quantity, layers, or serial."))
+                continue
+
+            row_errors = []
+            if len(model_name) < 7 or not model_name.isalnum():
+                row_errors.append("Model name must be at least 7 alphanumeric characters.")
+            if not (1 <= quantity <= 999):
+                row_errors.append("Quantity must be between 1-999.")
+            if not (1 <= layers <= 99):
+                row_errors.append("Layers must be between 1-99.")
+            if not (1 <= serial <= 999):
+                row_errors.append("Serial must be between 1-999.")
+            if row_errors:
+                errors.append((position, ", ".join(row_errors)))
+                continue
+
+            valid.append((position, brand_name, model_name, size_value, color_name, quantity, layers, serial))
+        except Exception as e:
+            errors.append((position, f"Unexpected error: {e}"))
+
+    return valid, errors
+
+
+def as_tuples(valid):
+    return list(zip(*(valid[col].tolist() for col in ["position", "brand", "model", "size", "color", "quantity", "layers", "serial"])))
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=0, help="also time the process-pool path with this many workers")
+    args = parser.parse_args()
+
+    sheet = make_sheet(args.rows)
+
+    (legacy_valid, legacy_errors), legacy_seconds = timed(legacy_normalize, sheet.copy())
+    (_, valid, errors), columnar_seconds = timed(normalize_bulk_rows, sheet.copy())
+
+    columnar_valid = as_tuples(valid)
+    same = legacy_valid == columnar_valid and legacy_errors == errors
+
+    runs = [("legacy", legacy_seconds), ("columnar", columnar_seconds)]
+    if args.workers > 1:
+        (_, parallel_valid, parallel_errors), parallel_seconds = timed(normalize_bulk_rows, sheet.copy(), args.workers)
+        same = same and as_tuples(parallel_valid) == columnar_valid and parallel_errors == errors
+        runs.append((f"parallel/{args.workers}", parallel_seconds))
+
+    for label, seconds in runs:
+        print(f"{label:<11} {seconds:8.3f}s total  {seconds / args.rows * 1e6:8.2f} us/row  {legacy_seconds / seconds:6.1f}x")
+    print(f"rows: {len(columnar_valid)} valid, {len(errors)} rejected; identical output: {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Connection pool benchmark.
+
+Replays the query pattern of one IN/OUT scan (lookup, phase update, status
+update, refresh) against the configured MySQL server, first with a fresh
+pymysql connection per call (the old ``Database()`` behaviour) and then through
+the shared pool. Reports server-side connections opened per operation and the
+latency distribution for both.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_connection_pool --ops 200 --threads 4
+"""
+import argparse
+import statistics
+import threading
+import time
+
+import pymysql
+
+from backend.db_pool import DB_CONFIG, ConnectionPool
+
+SCAN_QUERIES = [
+    "SELECT b.batch_id, b.barcode FROM batches b WHERE b.barcode = %s",
+    "SELECT batch_id FROM batches WHERE batch_id = %s",
+    "SELECT batch_id FROM batches WHERE batch_id = %s",
+    "SELECT b.batch_id, b.barcode FROM batches b WHERE b.barcode = %s",
+]
+SCAN_PARAMS = [("BENCH",), (0,), (0,), ("BENCH",)]
+
+
+def server_connections():
+    conn = pymysql.connect(**DB_CONFIG)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SHOW GLOBAL STATUS LIKE 'Connections'")
+            return int(cursor.fetchone()[1])
+    finally:
+        conn.close()
+
+
+def legacy_scan():
+    for query, params in zip(SCAN_QUERIES, SCAN_PARAMS):
+        conn = pymysql.connect(**DB_CONFIG, cursorclass=pymysql.cursors.DictCursor)
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(query, params)
+                cursor.fetchall()
+            conn.commit()
+        finally:
+            conn.close()
+
+
+def pooled_scan(pool):
+    for query, params in zip(SCAN_QUERIES, SCAN_PARAMS):
+        with pool.connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(query, params)
+                cursor.fetchall()
+            conn.commit()
+
+
+def run(label, operation, ops, threads):
+    latencies = []
+    lock = threading.Lock()
+    per_thread = ops // threads
+
+    def worker():
+        local = []
+        for _ in range(per_thread):
+            start = time.perf_counter()
+            operation()
+            local.append((time.perf_counter() - start) * 1000)
+        with lock:
+            latencies.extend(local)
+
+    before = server_connections()
+    started = time.perf_counter()
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - started
+    # **Subtract the connection opened by server_connections() itself**
+    opened = server_connections() - before - 1
+
+    latencies.sort()
+    total = len(latencies)
+    print(f"{label:<8} ops={total:<6} conns/op={opened / total:6.2f}  "
+          f"p50={statistics.median(latencies):7.2f}ms  "
+          f"p95={latencies[int(total * 0.95) - 1]:7.2f}ms  "
+          f"throughput={total / elapsed:8.1f} ops/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ops", type=int, default=200, help="Number of simulated scans per run.")
+    parser.add_argument("--threads", type=int, default=4, help="Concurrent stations.")
+    parser.add_argument("--pool-max", type=int, default=4, help="Pool max_size for the pooled run.")
+    args = parser.parse_args()
+
+    run("legacy", legacy_scan, args.ops, args.threads)
+
+    pool = ConnectionPool(min_size=0, max_size=args.pool_max)
+    try:
+        run("pooled", lambda: pooled_scan(pool), args.ops, args.threads)
+        print(f"pool stats: {pool.stats}")
+    finally:
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
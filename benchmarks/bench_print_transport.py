@@ -0,0 +1,118 @@
+"""Label printing throughput benchmark.
+
+Pushes N labels through RawSocketTransport to a local TCP server standing in
+for a printer's port 9100, once per print path:
+
+    legacy     the old print_barcode_zebra: full layout document, one job per label
+    per-label  stored format + one ^XF record, one job per label
+    batched    stored format + ``--job-size`` ^XF records per job
+
+Every job opens its own connection, like a spool job, and a job counts as
+done when the stand-in has received all of its bytes. Reports labels/sec,
+bytes/label and job latency percentiles. ``--job-overhead-ms`` adds a fixed
+per-job delay on the stand-in to model spooler / printer job setup.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_print_transport --labels 2000 --job-size 500
+"""
+import argparse
+import queue
+import socket
+import statistics
+import threading
+import time
+
+from backend.barcode_gen_print import RawSocketTransport, build_print_jobs
+
+
+def legacy_label_zpl(label):
+    """The full per-label document the pre-batching print_barcode_zebra sent."""
+    text_info = f"Brand: {label['brand']} | Model: {label['model']}"
+    text_info2 = f"Color: {label['color']} | Qty: {label['quantity']} | Size: {label['size']}"
+    return f"""
+            ^XA
+            ^FO50,50^BY2,2.5,50
+            ^BCN,80,Y,N,N
+            ^FD{label['barcode']}^FS
+            ^FO50,210^A0N,35,35^FD{text_info}^FS  ;
+            ^FO50,300^A0N,35,35^FD{text_info2}^FS ;
+            ^XZ
+        """
+
+
+class PrinterStandIn:
+    """Accepts connections and reads each to EOF, reporting (bytes, finished_at) per job."""
+
+    def __init__(self, job_overhead=0.0):
+        self.job_overhead = job_overhead
+        self.jobs = queue.Queue()
+        self.server = socket.create_server(("127.0.0.1", 0))
+        self.port = self.server.getsockname()[1]
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _serve(self):
+        while True:
+            conn, _ = self.server.accept()
+            with conn:
+                received = 0
+                while True:
+                    data = conn.recv(65536)
+                    if not data:
+                        break
+                    received += len(data)
+            if self.job_overhead:
+                time.sleep(self.job_overhead)
+            self.jobs.put((received, time.perf_counter()))
+
+
+def make_labels(count):
+    return [
+        {"barcode": f"1A-{i % 97:02d}-3-4-C-A-{i % 999 + 1}", "brand": "nike", "model": f"ab{i % 50:05d}",
+         "size": "m", "color": "red", "quantity": i % 999 + 1}
+        for i in range(count)
+    ]
+
+
+def run_path(stand_in, jobs):
+    """Sends ``jobs`` (zpl, label_count) one connection each; returns (seconds, bytes, latencies)."""
+    latencies = []
+    total_bytes = 0
+    started = time.perf_counter()
+    for zpl, _ in jobs:
+        job_started = time.perf_counter()
+        transport = RawSocketTransport("127.0.0.1", stand_in.port)
+        transport.send(zpl)
+        transport.close()
+        received, finished = stand_in.jobs.get()
+        total_bytes += received
+        latencies.append(finished - job_started)
+    return time.perf_counter() - started, total_bytes, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--labels", type=int, default=2000)
+    parser.add_argument("--job-size", type=int, default=500)
+    parser.add_argument("--job-overhead-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    stand_in = PrinterStandIn(args.job_overhead_ms / 1000)
+    labels = make_labels(args.labels)
+
+    paths = [
+        ("legacy", [(legacy_label_zpl(label), 1) for label in labels]),
+        ("per-label", list(build_print_jobs(labels, 1))),
+        ("batched", list(build_print_jobs(labels, args.job_size))),
+    ]
+
+    print(f"{'path':<10} {'jobs':>6} {'labels/s':>10} {'bytes/label':>12} {'p50 job ms':>11} {'p95 job ms':>11}")
+    for name, jobs in paths:
+        seconds, total_bytes, latencies = run_path(stand_in, jobs)
+        p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0]
+        print(f"{name:<10} {len(jobs):>6} {args.labels / seconds:>10.0f} {total_bytes / args.labels:>12.1f} "
+              f"{statistics.median(latencies) * 1000:>11.2f} {p95 * 1000:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
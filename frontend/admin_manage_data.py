@@ -1,11 +1,16 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from ttkwidgets import CheckboxTreeview
-from backend.models import Batch, Brand, Size, Color, ProductionPhase
-from backend.barcode_gen_print import get_available_printers, print_barcode_zebra 
+from backend.models import Batch
+from backend.reference_cache import brand_cache, size_cache, color_cache
+from backend.workflow import STATUSES, get_workflow, refresh_workflow
+from backend.printer_registry import printer_registry
+from frontend.batch_frames import BatchTableMixin
 
 
-class AdminManageData(tk.Frame):
+class AdminManageData(BatchTableMixin, tk.Frame):
+    PAGE_SIZE = 200
+
     def __init__(self, parent, controller):
         super().__init__(parent)
         self.controller = controller
@@ -16,6 +21,9 @@ class AdminManageData(tk.Frame):
 
         self.create_filter_frame()
         self.create_table_frame()
+        self.create_pager_frame()
+        self.create_print_status_frame()
+        printer_registry.subscribe(self.update_printers, dispatch=self.controller.after)
         self.populate_dropdowns()
         self.filter_batches()
 
@@ -72,6 +80,9 @@ class AdminManageData(tk.Frame):
         self.status_dropdown = ttk.Combobox(self.filter_frame, textvariable=self.status_var, state="readonly")
         self.status_dropdown.grid(row=1, column=7, padx=5, pady=5, sticky="ew")
 
+        # **Text filters match from the start of the value, so they can use an index**
+        ttk.Label(self.filter_frame, text="Filters match the start of a value, e.g. model 123 finds 1230000.", foreground="gray").grid(row=2, column=0, columnspan=8, padx=5, sticky="w")
+
         # **Filter Buttons**
         filter_button = ttk.Button(self.filter_frame, text="Filter", command=self.filter_batches)
         filter_button.grid(row=0, column=8, padx=5, pady=5, sticky="ew")
@@ -79,15 +90,18 @@ class AdminManageData(tk.Frame):
         clear_button = ttk.Button(self.filter_frame, text="Clear Filters", command=self.clear_filters)
         clear_button.grid(row=1, column=8, padx=5, pady=5, sticky="ew")
 
-        printers = ["Select Printer"] + get_available_printers()
+        # **Printer queues arrive from the registry in the background; opening the list refreshes stale ones**
         self.printer_var = tk.StringVar(value="Select Printer")
-        self.printer_dropdown = ttk.Combobox(self.filter_frame, textvariable=self.printer_var, values=printers, state="readonly")
+        self.printer_dropdown = ttk.Combobox(self.filter_frame, textvariable=self.printer_var, values=["Select Printer"], state="readonly", postcommand=printer_registry.refresh)
         self.printer_dropdown.grid(row=0, column=9, padx=5, pady=5, sticky="ew")
         
         # **Print Button**
         self.print_button = ttk.Button(self.filter_frame, text="Print Selected", command=self.print_selected_barcodes)
         self.print_button.grid(row=1, column=9, padx=5, pady=5, sticky="ew")
 
+        self.export_button = ttk.Button(self.filter_frame, text="Export CSV", command=self.export_filtered_batches)
+        self.export_button.grid(row=1, column=10, padx=5, pady=5, sticky="ew")
+
         delete_button = ttk.Button(self.filter_frame, text="Delete Selected", command=self.delete_selected_row)
         delete_button.grid(row=0, column=10, padx=5, pady=5, sticky="ew")
 
@@ -135,14 +149,15 @@ class AdminManageData(tk.Frame):
         self.table_frame.grid_columnconfigure(0, weight=1)
 
     def populate_dropdowns(self):
-        self.brand_dropdown["values"] = list(Brand.get_brands().keys())
-        self.size_dropdown["values"] = list(Size.get_sizes().keys())
-        self.color_dropdown["values"] = list(Color.get_colors().keys())
-        self.phase_dropdown["values"] = list(ProductionPhase.get_phases().keys())
-        self.status_dropdown["values"] = ["Pending", "In Progress", "Completed"]
-
-    def filter_batches(self):
-        filters = {
+        self.brand_dropdown["values"] = brand_cache.names()
+        self.size_dropdown["values"] = size_cache.names()
+        self.color_dropdown["values"] = color_cache.names()
+        self.phase_dropdown["values"] = get_workflow().phases
+        self.status_dropdown["values"] = STATUSES
+
+    def get_filters(self):
+        """Returns the current filter inputs keyed like Batch.search_batches expects."""
+        return {
             "barcode": self.barcode_var.get().strip().lower(),
             "brand": self.brand_var.get().strip().lower(),
             "model": self.model_var.get().strip().lower(),
@@ -153,6 +168,15 @@ class AdminManageData(tk.Frame):
             "status": self.status_var.get().strip().lower()
         }
 
+    def filter_batches(self, page=0, recount=True):
+        """Loads one page of batches matching the filters; filtering and paging run in SQL.
+
+        Page turns pass ``recount=False`` to reuse the total while the filters are unchanged.
+        """
+        self.page = max(page, 0)
+        filters = self.get_filters()
+        known_total = self.total_rows if not recount and filters == self.counted_filters else None
+
         for widget in self.table_frame.winfo_children():
             widget.destroy()
 
@@ -166,25 +190,14 @@ class AdminManageData(tk.Frame):
         self.tree.column("#0", width=50, stretch=False)
 
         for col in self.tree["columns"]:
-            self.tree.heading(col, text=col)
+            self.tree.heading(col, text=col, command=lambda c=col: self.sort_by(c))
             self.tree.column(col, anchor="center", width=120, stretch=True)
 
         self.select_all_var = tk.BooleanVar()
         self.tree.heading("#0", text="☑", command=self.select_all) 
         
-        filter_mapping = {
-        "barcode": 0,
-        "brand": 1,
-        "model": 2,
-        "size": 3,
-        "color": 4,
-        "serial": 7,
-        "phase": 8,
-        "status": 9
-            }
-
-        
-        batches = Batch.get_batches()
+        batches, self.total_rows = Batch.search_batches(filters, sort=self.sort, limit=self.PAGE_SIZE, offset=self.page * self.PAGE_SIZE, total=known_total)
+        self.counted_filters = filters
         for batch in batches:
             batch_id = batch["batch_id"] 
 
@@ -194,15 +207,9 @@ class AdminManageData(tk.Frame):
                 batch["layers"], batch["serial"], batch["phase_name"], batch["status"]
             )
 
-            match = True
-            for key, idx in filter_mapping.items():
-                if filters[key] and filters[key] not in str(display_batch[idx]).lower():
-                    match = False
-                    break
+            self.tree.insert("", tk.END, values=display_batch, tags=("unchecked", str(batch_id)))
 
-            if match:
-                self.tree.insert("", tk.END, values=display_batch, tags=("unchecked", str(batch_id)))
-    
+        self.update_pager()
 
         self.tree.grid(row=0, column=0, sticky="nsew")
 
@@ -242,22 +249,19 @@ class AdminManageData(tk.Frame):
             messagebox.showerror("Error", "Please select a valid printer before printing!")
             return
 
-        try:
-            for item in selected_items:
-                values = self.tree.item(item, "values")
-                barcode = values[0]
-                brand = values[1]
-                model = values[2]
-                size = values[3]
-                color = values[4]
-                quantity = values[5]
-
-                print_barcode_zebra(barcode, brand, model, size, color, quantity, printer_name)
+        labels = []
+        for item in selected_items:
+            values = self.tree.item(item, "values")
+            labels.append({
+                "barcode": values[0],
+                "brand": values[1],
+                "model": values[2],
+                "size": values[3],
+                "color": values[4],
+                "quantity": values[5],
+            })
 
-            messagebox.showinfo("Success", f"Successfully printed {len(selected_items)} barcodes!")
-
-        except Exception as e:
-            messagebox.showerror("Printing Error", f"Failed to print due to: {str(e)}")
+        self.start_print_job(labels, printer_name)
 
     def on_cell_double_click(self, event):
         """Handles double-click event to allow inline editing of Status and Phase."""
@@ -282,7 +286,7 @@ class AdminManageData(tk.Frame):
             return
 
         # **Dropdown Values for Editing**
-        combo_values = ["Pending", "In Progress", "Completed"] if col_name == "Status" else ["Cutting", "Sewing", "Packaging"]
+        combo_values = STATUSES if col_name == "Status" else get_workflow().phases
         combo_widget = ttk.Combobox(self.tree, values=combo_values, state="readonly")
         combo_widget.set(selected_values[col_index])
 
@@ -308,9 +312,7 @@ class AdminManageData(tk.Frame):
                     Batch.update_batch_status(batch_id, new_value)
 
                 elif col_name == "Phase":
-                    phase_mapping = {"Cutting": 1, "Sewing": 2, "Packaging": 3}
-                    phase_id = phase_mapping.get(new_value, 1)
-                    Batch.update_batch_phase(batch_id, phase_id)
+                    Batch.update_batch_phase(batch_id, get_workflow().phase_id(new_value))
 
                 messagebox.showinfo("Success", f"{col_name} updated to {new_value} successfully!")
 
@@ -356,4 +358,7 @@ class AdminManageData(tk.Frame):
                 self.tree.change_state(item, "checked")
 
     def update_data(self):
-        self.filter_batches()
\ No newline at end of file
+        # **Opening the management page picks up phases added to production_phases since startup**
+        refresh_workflow()
+        self.populate_dropdowns()
+        self.filter_batches(self.page)
\ No newline at end of file
@@ -1,16 +1,30 @@
+import time
 import tkinter as tk
-from tkinter import ttk, messagebox
-from backend.barcode_scanning import process_scanned_barcode  
-from backend.models import Batch
+from tkinter import ttk
+from backend.barcode_scanning import process_scan, transition_batcher
+from backend.scan_pipeline import ScanPipeline
+from backend.workflow import get_workflow
 
 class BarcodeScanner(tk.Frame):    
+    SCAN_LOG_SIZE = 200  # rows kept in the rolling scan log
+    ERROR_HOLD_SECONDS = 3.0  # an error banner is not replaced by later successes for this long
+
+    # **Banner level and colors per scan result; anything not listed is an error**
+    RESULT_LEVELS = {"applied": "ok", "found": "info", "queued": "warn", "offline": "warn"}
+    BANNER_COLORS = {"ok": "green", "info": "gray", "warn": "orange", "error": "red"}
+
     def __init__(self, parent, controller, role):
         super().__init__(parent)
         self.controller = controller
         self.user_role = role
 
+        # **Optional callable(level) for a buzzer or sound file; the Tk bell is used otherwise**
+        self.cue_hook = None
+        self.error_hold_until = 0.0
+
         self.scanner_mode = tk.StringVar(value="VIEW")  # Default mode is VIEW
-        self.selected_phase = tk.StringVar(value=self.user_role if self.user_role != "Admin" else "Sewing")
+        self.workflow = get_workflow()
+        self.selected_phase = tk.StringVar(value=self.user_role if self.user_role in self.workflow else self.workflow.first)
 
         self.scanner_var = tk.StringVar()
         self.current_batch_id = None
@@ -18,6 +32,16 @@ class BarcodeScanner(tk.Frame):
 
         self.create_widgets()
 
+        # **Scans are processed on worker threads; results come back through after()**
+        self.scan_pipeline = ScanPipeline(
+            process_scan, self.on_scan_result, on_partial=self.on_scan_partial,
+            on_depth=self.update_queue_depth, dispatch=self.controller.after,
+        )
+
+        # **IN/OUT scans are journaled locally with the operator; the replayer reports its backlog and late conflicts**
+        transition_batcher.operator = getattr(self.controller, "username", None)
+        self.unsubscribe_journal = transition_batcher.subscribe(self.update_journal_status, dispatch=self.controller.after)
+
     def create_widgets(self):
         """Creates the UI elements."""
         frame = ttk.Frame(self, padding=10)
@@ -48,23 +72,36 @@ class BarcodeScanner(tk.Frame):
 
         ttk.Label(phase_frame, text="Select Phase:").grid(row=0, column=0, padx=5, pady=5, sticky="w")
 
-        phase_options = ["Cutting", "Sewing", "Packaging"]
-
-        for i, phase in enumerate(phase_options):
+        for i, phase in enumerate(self.workflow.phases):
             rb = ttk.Radiobutton(phase_frame, text=phase, variable=self.selected_phase, value=phase)
             rb.grid(row=0, column=i + 1, padx=5, pady=5, sticky="w")
 
             if self.user_role != "Admin" and phase != self.user_role:
                 rb.config(state="disabled") 
 
+        # **Status banner: the outcome of the latest scan, without blocking the next one**
+        self.banner = tk.Label(frame, text="Ready to scan", font=("Arial", 16, "bold"), background="gray", foreground="white", pady=8)
+        self.banner.grid(row=1, column=0, columnspan=2, padx=10, pady=5, sticky="ew")
+        self.banner.bind("<Button-1>", lambda event: self.acknowledge_error())
+
         # **Scanner Area**
-        ttk.Label(frame, text=f"Scan Barcode ({self.user_role} Mode):", font=("Arial", 12, "bold")).grid(row=1, column=0, padx=5, pady=5, sticky="w")
-        ttk.Label(frame, text="(Automatic input - scan to load batch details)", font=("Arial", 10)).grid(row=2, column=0, padx=5, pady=5, sticky="w")
+        ttk.Label(frame, text=f"Scan Barcode ({self.user_role} Mode):", font=("Arial", 12, "bold")).grid(row=2, column=0, padx=5, pady=5, sticky="w")
+        ttk.Label(frame, text="(Automatic input - scan to load batch details)", font=("Arial", 10)).grid(row=3, column=0, padx=5, pady=5, sticky="w")
 
         self.batch_info_frame = ttk.LabelFrame(frame, text="Batch Information", padding=10)
-        self.batch_info_frame.grid(row=3, column=0, padx=10, pady=10, sticky="nsew")
+        self.batch_info_frame.grid(row=4, column=0, padx=10, pady=10, sticky="nsew")
+
+        self.create_scan_log(frame)
+
+        self.queue_depth_label = ttk.Label(frame, text="Pending scans: 0", font=("Arial", 10))
+        self.queue_depth_label.grid(row=5, column=0, padx=5, pady=5, sticky="w")
+
+        self.journal_label = ttk.Label(frame, text="Offline scans: 0", font=("Arial", 10))
+        self.journal_label.grid(row=6, column=0, padx=5, pady=5, sticky="w")
 
         frame.columnconfigure(0, weight=1)
+        frame.columnconfigure(1, weight=2)
+        frame.rowconfigure(4, weight=1)
         self.batch_info_frame.columnconfigure(0, weight=1)
         self.batch_info_frame.columnconfigure(1, weight=1)
 
@@ -72,6 +109,28 @@ class BarcodeScanner(tk.Frame):
         self.hidden_scanner_entry = tk.Entry(self, textvariable=self.scanner_var, font=("Arial", 1), width=1)
         self.hidden_scanner_entry.place(x=-100, y=-100)
 
+    def create_scan_log(self, frame):
+        """Creates the rolling log of the last SCAN_LOG_SIZE scans, newest first."""
+        log_frame = ttk.LabelFrame(frame, text="Recent Scans", padding=10)
+        log_frame.grid(row=4, column=1, padx=10, pady=10, sticky="nsew")
+        log_frame.rowconfigure(0, weight=1)
+        log_frame.columnconfigure(0, weight=1)
+
+        columns = ("Time", "Barcode", "Scan", "Result", "Latency", "Details")
+        widths = (80, 200, 130, 90, 80, 320)
+        self.scan_log = ttk.Treeview(log_frame, columns=columns, show="headings", height=12)
+        for column, width in zip(columns, widths):
+            self.scan_log.heading(column, text=column)
+            self.scan_log.column(column, width=width, stretch=column == "Details")
+        for level, color in self.BANNER_COLORS.items():
+            self.scan_log.tag_configure(level, foreground="white" if level == "error" else color,
+                                        background=color if level == "error" else "")
+
+        scrollbar = ttk.Scrollbar(log_frame, orient="vertical", command=self.scan_log.yview)
+        self.scan_log.configure(yscrollcommand=scrollbar.set)
+        self.scan_log.grid(row=0, column=0, sticky="nsew")
+        scrollbar.grid(row=0, column=1, sticky="ns")
+
     def update_mode_color(self):
         """Updates the mode indicator color based on selection."""
         mode = self.scanner_mode.get()
@@ -101,18 +160,42 @@ class BarcodeScanner(tk.Frame):
             self.after(500, self.focus_scanner_entry)
 
     def on_barcode_scan(self, event=None):
-        """Processes scanned barcodes and updates batch information."""
+        """Hands the scanned code to the scan pipeline and clears the entry for the next scan."""
         if not self.scanning_enabled:
             return
 
         scanned_code = self.scanner_var.get().strip()
+        self.scanner_var.set("")
         if scanned_code:
-            batch = process_scanned_barcode(scanned_code)
-            self.update_batch_info(batch)
-            self.apply_scanner_mode()
-            self.scanner_var.set("")
+            # **Mode and phase are captured now, not when a worker gets to the scan**
+            self.scan_pipeline.submit(scanned_code, self.scanner_mode.get(), self.selected_phase.get())
         return "break"
 
+    def update_queue_depth(self, pending):
+        self.queue_depth_label.config(text=f"Pending scans: {pending}")
+
+    def update_journal_status(self, status):
+        """Shows how many journaled scans are still waiting for the database."""
+        backlog = status["backlog"]
+        if not status["online"]:
+            self.journal_label.config(text=f"Database offline - {backlog} scans saved locally", foreground="red")
+        elif backlog:
+            self.journal_label.config(text=f"Syncing {backlog} saved scans...", foreground="orange")
+        else:
+            self.journal_label.config(text="Offline scans: 0", foreground="")
+
+        # **Replayed scans that were not applied: already answered "queued", so report them here**
+        for entry in status["late"]:
+            latency = time.time() - entry["scanned_at"]
+            self.log_scan(entry["barcode"], f"{entry['mode']} @ {entry['station_phase']}", entry["result"], latency, entry["message"], "error")
+        if status["late"]:
+            self.show_banner("error", f"{len(status['late'])} saved scan(s) could not be applied - see Recent Scans")
+            self.play_cue("error")
+
+    def on_scan_partial(self, request, preview):
+        """Shows the locally decoded batch details while the database lookup runs."""
+        self.update_batch_info(preview)
+
     def update_batch_info(self, batch):
         """Updates batch details in the UI."""
         for widget in self.batch_info_frame.winfo_children():
@@ -129,6 +212,7 @@ class BarcodeScanner(tk.Frame):
                 batch["size_value"], batch["color_name"], batch["quantity"], 
                 batch["layers"], batch["serial"], batch["phase_name"], batch["status"]
             )
+            values = tuple("..." if value is None else value for value in values)
 
             self.current_phase = batch["phase_name"]
             self.current_status = batch["status"]
@@ -138,44 +222,49 @@ class BarcodeScanner(tk.Frame):
                 ttk.Label(self.batch_info_frame, text=f"{header}:", font=("Arial", 10, "bold"), anchor="w").grid(row=i, column=0, sticky="w", padx=10, pady=2)
                 ttk.Label(self.batch_info_frame, text=value, font=("Arial", 10), anchor="w").grid(row=i, column=1, sticky="w", padx=10, pady=2)
 
-    def apply_scanner_mode(self):
-        """Handles phase transitions based on scanner mode selection."""
-        mode = self.scanner_mode.get()
-        selected_phase = self.selected_phase.get()
-
-        if not self.current_batch_id:
+    def on_scan_result(self, request, result):
+        """Shows the outcome of one processed scan on the banner and in the scan log."""
+        self.update_batch_info(result["batch"])
+
+        level = self.RESULT_LEVELS.get(result["result"], "error")
+        scan = request.mode if request.mode == "VIEW" else f"{request.mode} @ {request.station_phase}"
+        message = result["message"] or f"Batch {request.code} found."
+        latency = time.monotonic() - request.received_at
+
+        self.log_scan(request.code, scan, result["result"], latency, message, level)
+        self.show_banner(level, message)
+        self.play_cue(level)
+
+    def log_scan(self, barcode, scan, result, latency, message, level):
+        """Adds a row to the top of the scan log, dropping rows past SCAN_LOG_SIZE."""
+        row = (time.strftime("%H:%M:%S"), barcode, scan, result, f"{latency * 1000:.0f} ms", message.replace("\n", " "))
+        self.scan_log.insert("", 0, values=row, tags=(level,))
+        overflow = self.scan_log.get_children()[self.SCAN_LOG_SIZE:]
+        if overflow:
+            self.scan_log.delete(*overflow)
+
+    def show_banner(self, level, text):
+        """Updates the status banner; a recent error stays up until it is clicked or times out."""
+        now = time.monotonic()
+        if level != "error" and now < self.error_hold_until:
             return
-
-        if mode == "IN":
-            Batch.update_batch_phase(self.current_batch_id, self.get_phase_id(selected_phase))
-            Batch.update_batch_status(self.current_batch_id, "In Progress")
-            messagebox.showinfo("IN Mode", f"Item {self.current_batch_barcode} started in {selected_phase}.")
-
-        elif mode == "OUT":
-            next_phase = self.get_next_phase(selected_phase)
-
-            if next_phase:
-                Batch.update_batch_phase(self.current_batch_id, self.get_phase_id(next_phase))
-                Batch.update_batch_status(self.current_batch_id, "Pending")
-                messagebox.showinfo("OUT Mode", f"Item {self.current_batch_barcode} moved to {next_phase}.")
-            else:
-                if selected_phase == "Packaging":
-                    Batch.update_batch_status(self.current_batch_id, "Completed")
-                    messagebox.showinfo("Completion", f"Item {self.current_batch_barcode} has completed production.")
-                else:
-                    messagebox.showerror("Error", f"Unexpected phase transition from {selected_phase}")
-
-        self.update_batch_info(process_scanned_barcode(self.current_batch_barcode))
-
-    def get_phase_id(self, phase_name):
-        """Returns the phase ID given a phase name."""
-        phase_mapping = {"Cutting": 1, "Sewing": 2, "Packaging": 3}
-        return phase_mapping.get(phase_name, None)
-
-    def get_next_phase(self, current_phase):
-        """Determines the next production phase, returning None if at the last phase."""
-        phase_sequence = ["Cutting", "Sewing", "Packaging"]
-        if current_phase in phase_sequence:
-            idx = phase_sequence.index(current_phase)
-            return phase_sequence[idx + 1] if idx + 1 < len(phase_sequence) else None
-        return None
\ No newline at end of file
+        if level == "error":
+            self.error_hold_until = now + self.ERROR_HOLD_SECONDS
+        self.banner.config(text=text.replace("\n", " "), background=self.BANNER_COLORS[level])
+
+    def acknowledge_error(self):
+        """Lets the next scan replace an error banner right away."""
+        self.error_hold_until = 0.0
+
+    def play_cue(self, level):
+        """Sounds the cue for a scan outcome through ``cue_hook``, or the Tk bell for warnings and errors."""
+        try:
+            if self.cue_hook is not None:
+                self.cue_hook(level)
+            elif level == "error":
+                self.bell()
+                self.after(150, self.bell)
+            elif level == "warn":
+                self.bell()
+        except Exception as e:
+            print(f"Scan cue failed: {e}")
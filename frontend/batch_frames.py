@@ -0,0 +1,140 @@
+import queue
+import threading
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+from backend.reports import export_batches_csv
+from backend.print_spooler import get_spooler, COMPLETED, CANCELLED
+
+
+class PrintJobMixin:
+    """Print spooler wiring shared by the frames that print labels.
+
+    The frame sets ``self.print_job`` and builds ``self.print_status_label`` and
+    ``self.cancel_print_button``; ``self.controller`` marshals callbacks onto Tk.
+    """
+
+    def start_print_job(self, labels, printer_name):
+        """Queues ``labels`` on the shared print spooler, offering to resume an unfinished run."""
+        spooler = get_spooler()
+        already = spooler.already_printed(labels, printer_name)
+        if already and not messagebox.askyesno("Resume Printing", f"{already} of {len(labels)} labels were printed by an earlier run that did not finish.\n\nPrint only the remaining labels?"):
+            spooler.forget(labels, printer_name)
+
+        try:
+            self.print_job = spooler.submit(labels, printer_name, on_progress=self.on_print_progress, on_done=self.on_print_done, dispatch=self.controller.after)
+        except queue.Full:
+            messagebox.showerror("Printing Error", "The print queue is full. Please wait for the current jobs to finish.")
+            return
+
+        self.cancel_print_button["state"] = tk.NORMAL
+        self.print_status_label.config(text=f"Queued {len(labels)} labels for {printer_name}...")
+
+    def on_print_progress(self, job):
+        self.print_status_label.config(text=f"Printing {job.printed} of {job.total} labels...")
+
+    def on_print_done(self, job):
+        """Reports how a print job ended; runs on the Tk thread."""
+        if job is self.print_job:
+            self.cancel_print_button["state"] = tk.DISABLED
+        self.print_status_label.config(text="")
+
+        if job.state == COMPLETED:
+            messagebox.showinfo("Success", f"Successfully printed {job.total} barcodes!")
+        elif job.state == CANCELLED:
+            messagebox.showinfo("Printing Cancelled", f"Printing stopped after {job.printed} of {job.total} labels. Print the same selection again to resume.")
+        else:
+            messagebox.showerror("Printing Error", f"Failed to print due to: {job.error}\n\n{job.printed} of {job.total} labels were printed. Print the same selection again to resume.")
+
+    def cancel_print(self):
+        if self.print_job and not self.print_job.done:
+            self.print_job.cancel()
+            self.print_status_label.config(text="Cancelling after the current labels...")
+
+
+class BatchTableMixin(PrintJobMixin):
+    """Pager, column sorting, CSV export and print status shared by the manage-data frames.
+
+    The frame provides ``PAGE_SIZE``, ``get_filters()``, ``filter_batches(page, recount)``,
+    ``self.export_button`` and the printer dropdown.
+    """
+
+    def create_pager_frame(self):
+        """Creates the Previous/Next controls below the table."""
+        self.page = 0
+        self.total_rows = 0
+        self.counted_filters = None
+        self.sort = None
+
+        pager_frame = ttk.Frame(self, padding=(10, 0, 10, 10))
+        pager_frame.grid(row=2, column=0, sticky="ew")
+        pager_frame.grid_columnconfigure(1, weight=1)
+
+        self.prev_button = ttk.Button(pager_frame, text="< Previous", command=lambda: self.filter_batches(self.page - 1, recount=False))
+        self.prev_button.grid(row=0, column=0, padx=5, sticky="w")
+
+        self.page_label = ttk.Label(pager_frame, text="", anchor="center")
+        self.page_label.grid(row=0, column=1, sticky="ew")
+
+        self.next_button = ttk.Button(pager_frame, text="Next >", command=lambda: self.filter_batches(self.page + 1, recount=False))
+        self.next_button.grid(row=0, column=2, padx=5, sticky="e")
+
+    def update_pager(self):
+        """Refreshes the page label and enables/disables the pager buttons."""
+        page_count = max((self.total_rows + self.PAGE_SIZE - 1) // self.PAGE_SIZE, 1)
+        self.page_label.config(text=f"Page {self.page + 1} of {page_count} ({self.total_rows} batches)")
+        self.prev_button["state"] = tk.NORMAL if self.page > 0 else tk.DISABLED
+        self.next_button["state"] = tk.NORMAL if self.page + 1 < page_count else tk.DISABLED
+
+    def sort_by(self, column):
+        """Sorts by the clicked column heading, toggling the direction on repeat clicks."""
+        key = column.lower()
+        direction = "desc" if self.sort == (key, "asc") else "asc"
+        self.sort = (key, direction)
+        self.filter_batches(recount=False)
+
+    def update_printers(self, printers):
+        """Fills the printer dropdown from the registry; keeps the selection if it still exists."""
+        self.printer_dropdown["values"] = ["Select Printer"] + printers
+        if self.printer_var.get() not in printers:
+            self.printer_var.set("Select Printer")
+
+    def create_print_status_frame(self):
+        """Shows the progress of the current print job, with a Cancel button."""
+        self.print_job = None
+
+        status_frame = ttk.Frame(self, padding=(10, 0, 10, 10))
+        status_frame.grid(row=3, column=0, sticky="ew")
+        status_frame.grid_columnconfigure(0, weight=1)
+
+        self.print_status_label = ttk.Label(status_frame, text="")
+        self.print_status_label.grid(row=0, column=0, sticky="w")
+
+        self.cancel_print_button = ttk.Button(status_frame, text="Cancel Print", command=self.cancel_print, state=tk.DISABLED)
+        self.cancel_print_button.grid(row=0, column=1, padx=5, sticky="e")
+
+    def export_filtered_batches(self):
+        """Exports every batch matching the current filters (not just this page) to CSV."""
+        file_path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV Files", "*.csv")], title="Export Batches", initialfile="batches.csv")
+        if not file_path:
+            return
+
+        # **The query and file write run on a worker thread so the UI stays responsive**
+        self.export_button["state"] = tk.DISABLED
+        threading.Thread(target=self.export_batches, args=(file_path, self.get_filters()), daemon=True).start()
+
+    def export_batches(self, file_path, filters):
+        """Writes the export in a separate thread and reports back on the Tk thread."""
+        try:
+            count = export_batches_csv(file_path, filters)
+        except Exception as e:
+            self.controller.after(0, self.on_export_failed, f"Failed to export batches: {e}")
+            return
+        self.controller.after(0, self.on_export_complete, count, file_path)
+
+    def on_export_complete(self, count, file_path):
+        self.export_button["state"] = tk.NORMAL
+        messagebox.showinfo("Export Complete", f"Exported {count} batches to:\n{file_path}")
+
+    def on_export_failed(self, message):
+        self.export_button["state"] = tk.NORMAL
+        messagebox.showerror("Export Error", message)
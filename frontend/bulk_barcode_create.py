@@ -1,29 +1,37 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import pandas as pd
-from backend.models import Batch, Brand, Model, Size, Color
-from backend.barcode_gen_print import print_barcode_zebra, get_available_printers, process_bulk_barcodes
+from backend.models import Batch
+from backend.reference_cache import brand_cache, model_cache, size_cache, color_cache
+from backend.printer_registry import printer_registry, NO_PRINTERS
+from frontend.batch_frames import PrintJobMixin
+from backend.bulk_ingest import process_bulk_file
 import threading
 
-class BulkBarcodeCreate(tk.Frame):
+class BulkBarcodeCreate(PrintJobMixin, tk.Frame):
     """Frame for handling bulk barcode uploads, processing, and printing."""
 
+    CHUNK_SIZE = 5000
+    SAVE_CHUNK_SIZE = 2000
+    PREVIEW_LIMIT = 1000
+    MAX_ERRORS_SHOWN = 50
+
     def __init__(self, parent, controller):
         super().__init__(parent)
         self.controller = controller
 
         # **State Variables**
-        self.df = None
         self.processed_data = []
         self.error_rows = []
         self.successful_barcodes = []
         self.duplicate_barcodes = set()
 
         self.printer_var = tk.StringVar()
+        self.print_job = None
 
         # **Create UI**
         self.create_widgets()
-        self.refresh_printers()
+        printer_registry.subscribe(self.update_printers, dispatch=self.controller.after)
 
     def create_widgets(self):
         """Creates all UI elements within the frame."""
@@ -43,9 +51,16 @@ class BulkBarcodeCreate(tk.Frame):
 
         ttk.Button(control_frame, text="Generate Template", command=self.generate_template).grid(row=0, column=3, padx=5, pady=5, sticky="ew")
 
+        self.cancel_print_button = ttk.Button(control_frame, text="Cancel Print", command=self.cancel_print, state=tk.DISABLED)
+        self.cancel_print_button.grid(row=1, column=2, padx=5, pady=5, sticky="ew")
+
+        ttk.Button(control_frame, text="Refresh Printers", command=self.refresh_printers).grid(row=1, column=3, padx=5, pady=5, sticky="ew")
+
         # **Progress Bar**
         self.progress_label = ttk.Label(self, text="", font=("Arial", 10))
         self.progress_label.pack(pady=5)
+        self.print_status_label = ttk.Label(self, text="", font=("Arial", 10))
+        self.print_status_label.pack()
         self.progress_bar = ttk.Progressbar(self, mode="indeterminate")
         self.progress_bar.pack(fill=tk.X, padx=10, pady=5)
 
@@ -54,42 +69,48 @@ class BulkBarcodeCreate(tk.Frame):
         self.preview_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
 
     def upload_excel(self):
-        """Handles Excel file upload asynchronously."""
-        file_path = filedialog.askopenfilename(filetypes=[("Excel Files", "*.xlsx;*.xls")])
+        """Starts streaming the selected Excel/CSV file through processing on a worker thread."""
+        file_path = filedialog.askopenfilename(filetypes=[("Excel Files", "*.xlsx;*.xls"), ("CSV Files", "*.csv")])
         if not file_path:
             return
 
-        try:
-            self.df = pd.read_excel(file_path)
-
-            if self.df.empty:
-                messagebox.showerror("Error", "The uploaded file is empty.")
-                return
+        # **Reading and processing both run off the Tk thread, chunk by chunk**
+        self.progress_label.config(text="Processing file... Please wait.")
+        self.progress_bar.start()
+        threading.Thread(target=self.process_file, args=(file_path,), daemon=True).start()
 
-            # **Run processing in a separate thread**
-            self.progress_label.config(text="Processing file... Please wait.")
-            self.progress_bar.start()
-            threading.Thread(target=self.process_file, daemon=True).start()
-
-        except Exception as e:
-            messagebox.showerror("Error", f"Error reading file: {e}")
-
-    def process_file(self):
+    def process_file(self, file_path):
         """Processes the uploaded file in a separate thread to prevent UI freezing."""
+        def report(rows_read, processed_count, error_count):
+            text = f"Processed {rows_read} rows ({processed_count} valid, {error_count} errors)..."
+            self.controller.after(0, lambda: self.progress_label.config(text=text))
+
         try:
-            self.processed_data, self.error_rows = process_bulk_barcodes(self.df)
+            processed_data, error_rows, rows_read = process_bulk_file(file_path, self.CHUNK_SIZE, progress=report)
 
             # **Update UI after processing completes**
-            self.controller.after(0, self.on_processing_complete)
+            self.controller.after(0, lambda: self.on_processing_complete(processed_data, error_rows, rows_read))
 
         except Exception as e:
-            self.controller.after(0, lambda: messagebox.showerror("Error", f"Processing Error: {e}"))
+            self.controller.after(0, self.on_processing_failed, f"Processing Error: {e}")
 
-    def on_processing_complete(self):
+    def on_processing_failed(self, message):
+        self.progress_bar.stop()
+        self.progress_label.config(text="")
+        messagebox.showerror("Error", message)
+
+    def on_processing_complete(self, processed_data, error_rows, rows_read):
         """Runs after the file processing is completed to update UI elements."""
         self.progress_bar.stop()
         self.progress_label.config(text="")
 
+        if not rows_read:
+            messagebox.showerror("Error", "The uploaded file is empty.")
+            return
+
+        self.processed_data = processed_data
+        self.error_rows = error_rows
+
         if not self.processed_data:
             messagebox.showerror("Error", "No valid barcode data found in the uploaded file.")
             return
@@ -114,10 +135,14 @@ class BulkBarcodeCreate(tk.Frame):
             tree.heading(col, text=col)
             tree.column(col, anchor="center", width=120)
 
-        for row_index, row_data in enumerate(self.processed_data):
+        # **Only the first rows are previewed; inserting 100k+ items would stall the Treeview**
+        for row_data in self.processed_data[:self.PREVIEW_LIMIT]:
             row_values = [row_data[key] for key in row_data if key != "image"]
             tree.insert("", tk.END, values=row_values)
 
+        if len(self.processed_data) > self.PREVIEW_LIMIT:
+            ttk.Label(self.preview_frame, text=f"Showing the first {self.PREVIEW_LIMIT} of {len(self.processed_data)} rows.").pack()
+
         tree.pack(fill=tk.BOTH, expand=True)
 
         scrollbar = ttk.Scrollbar(self.preview_frame, orient="vertical", command=tree.yview)
@@ -125,42 +150,72 @@ class BulkBarcodeCreate(tk.Frame):
         tree.configure(yscrollcommand=scrollbar.set)
 
         if self.error_rows:
-            messagebox.showwarning("Warnings", f"Some rows have errors:\n" + "\n".join(f"Row {i+2}: {msg}" for i, _, msg in self.error_rows))
+            shown = self.error_rows[:self.MAX_ERRORS_SHOWN]
+            details = "\n".join(f"Row {i+2}: {msg}" for i, _, msg in shown)
+            if len(self.error_rows) > len(shown):
+                details += f"\n... and {len(self.error_rows) - len(shown)} more"
+            messagebox.showwarning("Warnings", f"Some rows have errors:\n" + details)
 
     def save_to_database(self):
-        """Saves processed data to the database."""
+        """Saves processed data to the database on a worker thread, in chunks."""
         if not self.processed_data:
             messagebox.showerror("Error", "No valid data to save.")
             return
 
         self.duplicate_barcodes.clear()
-        success_count = 0
+        self.progress_label.config(text="Saving to database... Please wait.")
+        self.progress_bar.start()
+        threading.Thread(target=self.save_rows, args=(list(self.processed_data),), daemon=True).start()
 
-        for row in self.processed_data:
-            barcode = row["barcode"]
+    def save_rows(self, processed_data):
+        """Inserts ``processed_data`` in SAVE_CHUNK_SIZE slices, reporting progress after each."""
+        outcomes = {}
+        try:
+            for start in range(0, len(processed_data), self.SAVE_CHUNK_SIZE):
+                rows = [
+                    {
+                        "barcode": row["barcode"],
+                        "brand_id": brand_cache.get_id(row["brand"]),
+                        "model_id": model_cache.get_id(row["model"]),
+                        "size_id": size_cache.get_id(row["size"]),
+                        "color_id": color_cache.get_id(row["color"]),
+                        "quantity": int(row["quantity"]),
+                        "layers": int(row["layers"]),
+                        "serial": "{:03d}".format(int(row["serial"])),
+                        "current_phase": 1,
+                        "status": "Pending",
+                    }
+                    for row in processed_data[start:start + self.SAVE_CHUNK_SIZE]
+                ]
+                outcomes.update(Batch.create_batches(rows))
+
+                text = f"Saved {len(outcomes)} of {len(processed_data)} records..."
+                self.controller.after(0, lambda text=text: self.progress_label.config(text=text))
 
-            existing_batch = Batch.get_batch_by_barcode(barcode)
-            if existing_batch:
-                self.duplicate_barcodes.add(barcode)
-                continue
-
-            try:
-                Batch.create_batch(
-                    barcode,
-                    Brand.get_brands().get(row["brand"], None),
-                    Model.get_models().get(row["model"], None),
-                    Size.get_sizes().get(row["size"], None),
-                    Color.get_colors().get(row["color"], None),
-                    int(row["quantity"]),
-                    int(row["layers"]),
-                    "{:03d}".format(int(row["serial"])),
-                    1,
-                    "Pending",
-                )
+        except Exception as e:
+            self.controller.after(0, self.on_processing_failed, f"Database Error: {e}")
+            return
+
+        self.controller.after(0, lambda: self.on_save_complete(outcomes))
+
+    def on_save_complete(self, outcomes):
+        """Reports the outcome of save_rows on the Tk thread."""
+        self.progress_bar.stop()
+        self.progress_label.config(text="")
+
+        success_count = 0
+        failed_barcodes = []
+        for barcode, outcome in outcomes.items():
+            if outcome == "inserted":
                 self.successful_barcodes.append(barcode)
                 success_count += 1
-            except Exception as e:
-                messagebox.showerror("Database Error", f"Failed to save {barcode}: {e}")
+            elif outcome == "duplicate":
+                self.duplicate_barcodes.add(barcode)
+            else:
+                failed_barcodes.append(barcode)
+
+        if failed_barcodes:
+            messagebox.showerror("Database Error", f"Failed to save {len(failed_barcodes)} records:\n{', '.join(failed_barcodes)}")
 
         messagebox.showinfo("Success", f"Successfully saved {success_count} records.") if success_count else None
 
@@ -172,27 +227,24 @@ class BulkBarcodeCreate(tk.Frame):
     def print_all_barcodes(self):
         printer_name = self.printer_var.get().strip()
 
-        if not printer_name or printer_name == "No Zebra printers found":
+        if not printer_name or printer_name == NO_PRINTERS:
             messagebox.showerror("Error", "Please select a valid printer before printing!")
             return
 
         barcodes_to_print = set(self.successful_barcodes) | set(self.duplicate_barcodes)
 
-        try:
-            for row in self.processed_data:
-                if row["barcode"] in barcodes_to_print:
-                    print_barcode_zebra(row["barcode"], row["brand"], row["model"], row["size"], row["color"], row["quantity"], printer_name)
-
-            messagebox.showinfo("Success", f"Successfully printed {len(barcodes_to_print)} barcodes!")
-
-        except Exception as e:
-            messagebox.showerror("Printing Error", f"Failed to print due to: {str(e)}")
+        labels = [row for row in self.processed_data if row["barcode"] in barcodes_to_print]
+        self.start_print_job(labels, printer_name)
 
     def refresh_printers(self):
-        """Refreshes available printers in the dropdown."""
-        printers = get_available_printers()
-        self.printer_dropdown["values"] = printers if printers else ["No Zebra printers found"]
-        self.printer_var.set(printers[0] if printers else "No Zebra printers found")
+        """Asks the printer registry to rediscover queues; update_printers fills the dropdown."""
+        printer_registry.refresh(force=True)
+
+    def update_printers(self, printers):
+        """Refreshes available printers in the dropdown, keeping the current choice if still present."""
+        self.printer_dropdown["values"] = printers if printers else [NO_PRINTERS]
+        if self.printer_var.get() not in printers:
+            self.printer_var.set(printers[0] if printers else NO_PRINTERS)
 
     def update_print_button(self):
         """Enables/disables the print button based on available barcodes."""
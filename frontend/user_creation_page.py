@@ -9,7 +9,7 @@ class UserCreationPage(tk.Frame):
         super().__init__(parent)
         self.controller = controller
 
-        self.available_roles = ["Admin", "Cutting", "Sewing", "Packaging"]  
+        self.available_roles = Auth.allowed_roles()
         self.create_widgets()
         self.load_users()
 
@@ -34,7 +34,7 @@ class UserCreationPage(tk.Frame):
         ttk.Label(creation_frame, text="Role:").grid(row=2, column=0, padx=5, pady=5, sticky="w")
         self.role_var = tk.StringVar()
         self.role_dropdown = ttk.Combobox(creation_frame, textvariable=self.role_var, 
-                                          values=["Admin", "Cutting", "Sewing", "Packaging"], state="readonly")
+                                          values=self.available_roles, state="readonly")
         self.role_dropdown.grid(row=2, column=1, padx=5, pady=5, sticky="ew")
 
         ttk.Button(creation_frame, text="Create User", command=self.create_user).grid(row=3, column=0, columnspan=2, pady=10)
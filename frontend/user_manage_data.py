@@ -1,11 +1,16 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from ttkwidgets import CheckboxTreeview
-from backend.models import Batch, Brand, Size, Color, ProductionPhase
-from backend.barcode_gen_print import get_available_printers, print_barcode_zebra 
+from backend.models import Batch
+from backend.reference_cache import brand_cache, size_cache, color_cache
+from backend.workflow import STATUSES, get_workflow
+from backend.printer_registry import printer_registry
+from frontend.batch_frames import BatchTableMixin
 
 
-class UserManageData(tk.Frame):
+class UserManageData(BatchTableMixin, tk.Frame):
+    PAGE_SIZE = 200
+
     def __init__(self, parent, controller, role):
         super().__init__(parent)
         self.controller = controller
@@ -17,6 +22,9 @@ class UserManageData(tk.Frame):
 
         self.create_filter_frame()
         self.create_table_frame()
+        self.create_pager_frame()
+        self.create_print_status_frame()
+        printer_registry.subscribe(self.update_printers, dispatch=self.controller.after)
         self.populate_dropdowns()
         self.set_default_phase_filter()
         self.filter_batches()
@@ -74,6 +82,9 @@ class UserManageData(tk.Frame):
         self.status_dropdown = ttk.Combobox(self.filter_frame, textvariable=self.status_var, state="readonly")
         self.status_dropdown.grid(row=1, column=7, padx=5, pady=5, sticky="ew")
 
+        # **Text filters match from the start of the value, so they can use an index**
+        ttk.Label(self.filter_frame, text="Filters match the start of a value, e.g. model 123 finds 1230000.", foreground="gray").grid(row=2, column=0, columnspan=8, padx=5, sticky="w")
+
         # **Filter Buttons**
         filter_button = ttk.Button(self.filter_frame, text="Filter", command=self.filter_batches)
         filter_button.grid(row=0, column=8, padx=5, pady=5, sticky="ew")
@@ -81,15 +92,18 @@ class UserManageData(tk.Frame):
         clear_button = ttk.Button(self.filter_frame, text="Clear Filters", command=self.clear_filters)
         clear_button.grid(row=1, column=8, padx=5, pady=5, sticky="ew")
 
-        printers = ["Select Printer"] + get_available_printers()
+        # **Printer queues arrive from the registry in the background; opening the list refreshes stale ones**
         self.printer_var = tk.StringVar(value="Select Printer")
-        self.printer_dropdown = ttk.Combobox(self.filter_frame, textvariable=self.printer_var, values=printers, state="readonly")
+        self.printer_dropdown = ttk.Combobox(self.filter_frame, textvariable=self.printer_var, values=["Select Printer"], state="readonly", postcommand=printer_registry.refresh)
         self.printer_dropdown.grid(row=0, column=9, padx=5, pady=5, sticky="ew")
         
         # **Print Button**
         self.print_button = ttk.Button(self.filter_frame, text="Print Selected", command=self.print_selected_barcodes)
         self.print_button.grid(row=1, column=9, padx=5, pady=5, sticky="ew")
 
+        self.export_button = ttk.Button(self.filter_frame, text="Export CSV", command=self.export_filtered_batches)
+        self.export_button.grid(row=0, column=10, padx=5, pady=5, sticky="ew")
+
         
         # **Ensure the filter frame resizes properly**
         for i in range(11): 
@@ -134,14 +148,15 @@ class UserManageData(tk.Frame):
         self.table_frame.grid_columnconfigure(0, weight=1)
 
     def populate_dropdowns(self):
-        self.brand_dropdown["values"] = list(Brand.get_brands().keys())
-        self.size_dropdown["values"] = list(Size.get_sizes().keys())
-        self.color_dropdown["values"] = list(Color.get_colors().keys())
-        self.phase_dropdown["values"] = list(ProductionPhase.get_phases().keys())
-        self.status_dropdown["values"] = ["Pending", "In Progress", "Completed"]
-
-    def filter_batches(self):
-        filters = {
+        self.brand_dropdown["values"] = brand_cache.names()
+        self.size_dropdown["values"] = size_cache.names()
+        self.color_dropdown["values"] = color_cache.names()
+        self.phase_dropdown["values"] = get_workflow().phases
+        self.status_dropdown["values"] = STATUSES
+
+    def get_filters(self):
+        """Returns the current filter inputs keyed like Batch.search_batches expects."""
+        return {
             "barcode": self.barcode_var.get().strip().lower(),
             "brand": self.brand_var.get().strip().lower(),
             "model": self.model_var.get().strip().lower(),
@@ -152,6 +167,15 @@ class UserManageData(tk.Frame):
             "status": self.status_var.get().strip().lower()
         }
 
+    def filter_batches(self, page=0, recount=True):
+        """Loads one page of batches matching the filters; filtering and paging run in SQL.
+
+        Page turns pass ``recount=False`` to reuse the total while the filters are unchanged.
+        """
+        self.page = max(page, 0)
+        filters = self.get_filters()
+        known_total = self.total_rows if not recount and filters == self.counted_filters else None
+
         for widget in self.table_frame.winfo_children():
             widget.destroy()
 
@@ -164,25 +188,14 @@ class UserManageData(tk.Frame):
         self.tree.column("#0", width=50, stretch=False)
 
         for col in self.tree["columns"]:
-            self.tree.heading(col, text=col)
+            self.tree.heading(col, text=col, command=lambda c=col: self.sort_by(c))
             self.tree.column(col, anchor="center", width=120, stretch=True)
 
         self.select_all_var = tk.BooleanVar()
         self.tree.heading("#0", text="☑", command=self.select_all) 
         
-        filter_mapping = {
-        "barcode": 0,
-        "brand": 1,
-        "model": 2,
-        "size": 3,
-        "color": 4,
-        "serial": 7,
-        "phase": 8,
-        "status": 9
-            }
-
-        
-        batches = Batch.get_batches()
+        batches, self.total_rows = Batch.search_batches(filters, sort=self.sort, limit=self.PAGE_SIZE, offset=self.page * self.PAGE_SIZE, total=known_total)
+        self.counted_filters = filters
         for batch in batches:
             batch_id = batch["batch_id"] 
 
@@ -192,15 +205,9 @@ class UserManageData(tk.Frame):
                 batch["layers"], batch["serial"], batch["phase_name"], batch["status"]
             )
 
-            match = True
-            for key, idx in filter_mapping.items():
-                if filters[key] and filters[key] not in str(display_batch[idx]).lower():
-                    match = False
-                    break
+            self.tree.insert("", tk.END, values=display_batch, tags=("unchecked", str(batch_id)))
 
-            if match:
-                self.tree.insert("", tk.END, values=display_batch, tags=("unchecked", str(batch_id)))
-    
+        self.update_pager()
 
         self.tree.grid(row=0, column=0, sticky="nsew")
 
@@ -240,23 +247,20 @@ class UserManageData(tk.Frame):
             messagebox.showerror("Error", "Please select a valid printer before printing!")
             return
 
-        try:
-            for item in selected_items:
-                values = self.tree.item(item, "values")
-                barcode = values[0]
-                brand = values[1]
-                model = values[2]
-                size = values[3]
-                color = values[4]
-                quantity = values[5]
-
-                print_barcode_zebra(barcode, brand, model, size, color, quantity, printer_name)
+        labels = []
+        for item in selected_items:
+            values = self.tree.item(item, "values")
+            labels.append({
+                "barcode": values[0],
+                "brand": values[1],
+                "model": values[2],
+                "size": values[3],
+                "color": values[4],
+                "quantity": values[5],
+            })
 
-            messagebox.showinfo("Success", f"Successfully printed {len(selected_items)} barcodes!")
+        self.start_print_job(labels, printer_name)
 
-        except Exception as e:
-            messagebox.showerror("Printing Error", f"Failed to print due to: {str(e)}")
-    
     def select_all(self):
         """Toggles selection of all checkboxes in the treeview."""
         all_items = self.tree.get_children()
@@ -270,15 +274,11 @@ class UserManageData(tk.Frame):
                 self.tree.change_state(item, "checked")
 
     def update_data(self):
-        self.filter_batches()
+        self.populate_dropdowns()
+        self.filter_batches(self.page)
             
     def set_default_phase_filter(self):
         """Sets the default phase filter based on the user role."""
-        role_to_phase = {
-            "Cutting": "Cutting",
-            "Sewing": "Sewing",
-            "Packaging": "Packaging",
-            "Admin": ""
-        }
-        default_phase = role_to_phase.get(self.user_role, "")
+        # **Station roles are named after their phase; Admin sees every phase**
+        default_phase = self.user_role if self.user_role in get_workflow() else ""
         self.phase_var.set(default_phase)
\ No newline at end of file
@@ -1,3 +1,5 @@
+import multiprocessing
+import sys
 import tkinter as tk
 from tkinter import ttk, messagebox
 from ttkthemes import ThemedTk
@@ -7,15 +9,18 @@ from frontend.admin_manage_data import AdminManageData
 from frontend.barcode_scanner import BarcodeScanner 
 from frontend.bulk_barcode_create import BulkBarcodeCreate
 from frontend.user_creation_page import UserCreationPage
+from backend.workflow import get_workflow
+from backend.migrations import pending_migrations
 
 class MainWindow(tk.Tk):
-    def __init__(self, role):
+    def __init__(self, role, username=None):
         super().__init__()
         self.title("Production Management System")
         w, h = int(self.winfo_screenwidth() * 0.9), int(self.winfo_screenheight() * 0.9)
         self.geometry(f"{w}x{h}+{(self.winfo_screenwidth() - w) // 2}+{(self.winfo_screenheight() - h) // 2}")
         self.resizable(True, True)
         self.role = role 
+        self.username = username
         
         self.set_global_font("Arial", 12)
         
@@ -52,7 +57,7 @@ class MainWindow(tk.Tk):
         
         if self.role == "Admin":
             allowed_frames = [AdminManageData, UserManageData, BarcodeScanner, BulkBarcodeCreate, UserCreationPage]
-        elif self.role in ["Cutting", "Sewing", "Packaging"]:
+        elif self.role in get_workflow():
             allowed_frames = [UserManageData, BarcodeScanner, BulkBarcodeCreate]
 
         for F in allowed_frames:
@@ -66,7 +71,7 @@ class MainWindow(tk.Tk):
 
         navigate_menu = tk.Menu(menu_bar, tearoff=0)
 
-        if self.role in ["Cutting", "Sewing", "Packaging"]:
+        if self.role in get_workflow():
             navigate_menu.add_command(label="Barcode Manage", command=lambda: self.show_frame("UserManageData")) 
             navigate_menu.add_command(label="Barcode Scanner", command=lambda: self.show_frame("BarcodeScanner"))
             navigate_menu.add_command(label="Barcode Create", command=lambda: self.show_frame("BulkBarcodeCreate"))
@@ -107,44 +112,65 @@ def login():
     if user:
         messagebox.showinfo("Success", f"Welcome, {user['username']}!")
         root.destroy()
-        open_dashboard(user['role'])
+        open_dashboard(user['role'], user['username'])
     else:
         messagebox.showerror("Login Failed", "Invalid Username or Password.")
 
-def open_dashboard(role):
-    app = MainWindow(role)
+def open_dashboard(role, username=None):
+    app = MainWindow(role, username)
     app.mainloop()
 
-# **Setup Themed Window**
-root = ThemedTk(theme="arc")
-root.title("Barcode Management System - Login")
-w, h = int(root.winfo_screenwidth() * 0.35), int(root.winfo_screenheight() * 0.4)
-root.geometry(f"{w}x{h}+{(root.winfo_screenwidth() - w) // 2}+{(root.winfo_screenheight() - h) // 2}")
-root.resizable(False, False)
+if __name__ == "__main__":
+    # **Bulk validation workers re-import this module on spawn; only the parent builds the UI**
+    multiprocessing.freeze_support()
+
+    # **Setup Themed Window**
+    root = ThemedTk(theme="arc")
+    root.title("Barcode Management System - Login")
+    w, h = int(root.winfo_screenwidth() * 0.35), int(root.winfo_screenheight() * 0.4)
+    root.geometry(f"{w}x{h}+{(root.winfo_screenwidth() - w) // 2}+{(root.winfo_screenheight() - h) // 2}")
+    root.resizable(False, False)
+
+    # **Refuse to start against a schema older than this code; migrating is an admin step**
+    try:
+        pending = pending_migrations()
+        problem = None
+        if pending:
+            problem = "The database schema is out of date. Pending migrations:\n" + "\n".join(
+                f"{version:03d} {description}" for version, description in pending)
+    except Exception as e:
+        problem = f"The database schema version could not be read:\n{e}"
+    if problem:
+        messagebox.showerror(
+            "Database Error",
+            f"{problem}\n\nAsk an administrator to run 'python -m backend.migrations migrate', then start again.",
+        )
+        root.destroy()
+        sys.exit(1)
 
-# **Main Frame**
-frame = ttk.Frame(root, padding=30)
-frame.pack(expand=True, fill=tk.BOTH)
+    # **Main Frame**
+    frame = ttk.Frame(root, padding=30)
+    frame.pack(expand=True, fill=tk.BOTH)
 
-# **Title Label**
-ttk.Label(frame, text="Login", font=("Arial", 18, "bold")).pack(pady=(10, 20))
+    # **Title Label**
+    ttk.Label(frame, text="Login", font=("Arial", 18, "bold")).pack(pady=(10, 20))
 
-# **Username & Password Fields**
-username_var = tk.StringVar()
-password_var = tk.StringVar()
+    # **Username & Password Fields**
+    username_var = tk.StringVar()
+    password_var = tk.StringVar()
 
-ttk.Label(frame, text="Username:", font=("Arial", 12)).pack(anchor="w", pady=(0, 5))
-username_entry = ttk.Entry(frame, textvariable=username_var, font=("Arial", 12))
-username_entry.pack(fill=tk.X, pady=(0, 10))
+    ttk.Label(frame, text="Username:", font=("Arial", 12)).pack(anchor="w", pady=(0, 5))
+    username_entry = ttk.Entry(frame, textvariable=username_var, font=("Arial", 12))
+    username_entry.pack(fill=tk.X, pady=(0, 10))
 
-ttk.Label(frame, text="Password:", font=("Arial", 12)).pack(anchor="w", pady=(0, 5))
-password_entry = ttk.Entry(frame, textvariable=password_var, font=("Arial", 12), show="*")
-password_entry.pack(fill=tk.X, pady=(0, 10))
-password_entry.configure(show="•")
+    ttk.Label(frame, text="Password:", font=("Arial", 12)).pack(anchor="w", pady=(0, 5))
+    password_entry = ttk.Entry(frame, textvariable=password_var, font=("Arial", 12), show="*")
+    password_entry.pack(fill=tk.X, pady=(0, 10))
+    password_entry.configure(show="•")
 
 
-# **Login Button**
-login_button = ttk.Button(frame, text="Login", command=login)
-login_button.pack(pady=20, fill=tk.X)
+    # **Login Button**
+    login_button = ttk.Button(frame, text="Login", command=login)
+    login_button.pack(pady=20, fill=tk.X)
 
-root.mainloop()
\ No newline at end of file
+    root.mainloop()
\ No newline at end of file
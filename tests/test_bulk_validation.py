@@ -0,0 +1,178 @@
+"""The columnar bulk pipeline against the row-by-row process_bulk_barcodes it replaced."""
+import random
+
+import pandas as pd
+import pytest
+
+from backend import barcode_gen_print
+from backend.barcode_gen_print import REQUIRED_COLUMNS, generate_barcode_string, process_bulk_barcodes
+
+UNRESOLVED = {"ghost", "phantom"}  # lookup names whose get-or-create fails (id None)
+
+
+def lookup_id(name):
+    return None if name in UNRESOLVED else sum(map(ord, name)) % 500 + 1
+
+
+def scalar_process_bulk_barcodes(df):
+    """The original iterrows() implementation, with id lookups going through ``lookup_id``."""
+    error_rows = []
+    processed_data = []
+
+    for col in REQUIRED_COLUMNS:
+        if col not in df.columns:
+            raise ValueError(f"Missing required column: {col}")
+
+    df["original_index"] = df.index
+    df = df.dropna(subset=REQUIRED_COLUMNS).reset_index(drop=True)
+    df = df.drop_duplicates(subset=REQUIRED_COLUMNS, keep="first").reset_index(drop=True)
+
+    for _, row in df.iterrows():
+        try:
+            row_number = int(row["original_index"])
+            brand_name = str(row["brand"]).strip().lower()
+            size_value = str(row["size"]).strip().lower()
+            color_name = str(row["color"]).strip().lower()
+
+            model_name = str(row["model"]).strip()
+            if pd.isna(model_name) or model_name == "":
+                error_rows.append((row_number, row, "Model name is missing."))
+                continue
+
+            model_name = str(model_name)
+            if model_name.isdigit():
+                model_name = str(int(model_name))
+            elif model_name.replace(".", "").isdigit():
+                model_name = str(int(float(model_name)))
+
+            model_name = "".join(filter(str.isalnum, model_name))
+            if len(model_name) < 7:
+                model_name = model_name.ljust(7, "0")
+
+            try:
+                quantity = int(row["quantity"])
+                layers = int(row["layers"])
+                serial = int(row["serial"])
+            except ValueError:
+                error_rows.append((row_number, row, "Invalid numeric values in quantity, layers, or serial."))
+                continue
+
+            row_errors = []
+            if len(model_name) < 7 or not model_name.isalnum():
+                row_errors.append("Model name must be at least 7 alphanumeric characters.")
+            if not (1 <= quantity <= 999):
+                row_errors.append("Quantity must be between 1-999.")
+            if not (1 <= layers <= 99):
+                row_errors.append("Layers must be between 1-99.")
+            if not (1 <= serial <= 999):
+                row_errors.append("Serial must be between 1-999.")
+
+            if row_errors:
+                error_rows.append((row_number, row, ", ".join(row_errors)))
+                continue
+
+            brand_id, size_id, color_id = lookup_id(brand_name), lookup_id(size_value), lookup_id(color_name)
+            barcode_string = generate_barcode_string(brand_id, model_name, size_id, color_id, quantity, layers, serial)
+
+            processed_data.append({
+                "barcode": barcode_string,
+                "brand": brand_name,
+                "model": model_name,
+                "size": size_value,
+                "color": color_name,
+                "quantity": quantity,
+                "layers": layers,
+                "serial": serial,
+            })
+
+        except Exception as e:
+            error_rows.append((row_number, row, f"Unexpected error: {e}"))
+
+    return processed_data, error_rows
+
+
+@pytest.fixture(autouse=True)
+def resolve_ids(monkeypatch):
+    for name in ("brand_cache", "model_cache", "size_cache", "color_cache"):
+        cache = getattr(barcode_gen_print, name)
+        monkeypatch.setattr(cache, "ensure_many", lambda names: {n: lookup_id(n) for n in names})
+
+
+def random_sheet(rng):
+    names = [" Nike", "ADIDAS ", "puma", "ghost", "Phantom", "red", "XL", 42]
+    models = [1234567, "12345", "12.0", "ab-c12", "", "  ", "MODEL99X", 3.5, "1.2.3", None]
+    numbers = [1, 5, 99, 999, 0, 1000, -3, "7", "x", "5.0", 2.5, float("nan"), float("inf"), None]
+    rows = rng.randint(1, 40)
+    pick = lambda pool: [rng.choice(pool) for _ in range(rows)]
+    sheet = pd.DataFrame({
+        "brand": pick(names), "model": pick(models), "size": pick(names), "color": pick(names),
+        "quantity": pick(numbers), "layers": pick(numbers), "serial": pick(numbers),
+    })
+    if rng.random() < 0.3:
+        sheet = pd.concat([sheet, sheet.sample(frac=0.5, random_state=rng.randint(0, 1000))])
+    return sheet
+
+
+def assert_same(actual, expected):
+    processed, errors = actual
+    expected_processed, expected_errors = expected
+    assert processed == expected_processed
+    assert [(n, m) for n, _, m in errors] == [(n, m) for n, _, m in expected_errors]
+    for (_, row, _), (_, expected_row, _) in zip(errors, expected_errors):
+        assert row.name == expected_row.name
+        assert list(map(str, row)) == list(map(str, expected_row))
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_columnar_pipeline_matches_the_row_by_row_path(seed):
+    sheet = random_sheet(random.Random(seed))
+    assert_same(process_bulk_barcodes(sheet.copy()), scalar_process_bulk_barcodes(sheet.copy()))
+
+
+def test_unresolved_ids_are_reported_at_their_row():
+    sheet = pd.DataFrame({
+        "brand": ["nike", "ghost", "nike", "nike"], "model": ["1234567"] * 4, "size": ["xl"] * 4, "color": ["red"] * 4,
+        "quantity": [1, 2, 0, 4], "layers": [1, 1, 1, 1], "serial": [1, 2, 3, 4],
+    })
+    processed, errors = process_bulk_barcodes(sheet.copy())
+    assert [n for n, _, _ in errors] == [1, 2]
+    assert errors[0][2] == "Unexpected error: One or more required values are None!"
+    assert len(processed) == 2
+    assert [p["serial"] for p in processed] == [1, 4]
+
+
+def test_streamed_upload_validates_in_shards_of_parallel_shard_rows(tmp_path, monkeypatch):
+    from concurrent.futures import Future
+    from backend import bulk_ingest
+
+    shards = []
+
+    class InlinePool:
+        def __init__(self, max_workers):
+            pass
+
+        def submit(self, fn, frame):
+            shards.append(len(frame))
+            future = Future()
+            future.set_result(fn(frame))
+            return future
+
+        def shutdown(self, cancel_futures=False):
+            pass
+
+    rng = random.Random(7)
+    sheet = pd.concat([random_sheet(rng) for _ in range(60)], ignore_index=True)
+    path = tmp_path / "upload.csv"
+    sheet.to_csv(path, index=False)
+
+    serial = bulk_ingest.process_bulk_file(str(path), chunk_size=100, parallel=False)
+
+    monkeypatch.setattr(bulk_ingest, "ProcessPoolExecutor", InlinePool)
+    monkeypatch.setattr(bulk_ingest, "PARALLEL_MIN_ROWS", 300)
+    monkeypatch.setattr(bulk_ingest, "PARALLEL_SHARD_ROWS", 250)
+    sharded = bulk_ingest.process_bulk_file(str(path), chunk_size=100, parallel=True, max_workers=2)
+
+    assert shards and all(rows >= 250 for rows in shards[:-1])
+    assert sharded[0] == serial[0]
+    assert [(n, m) for n, _, m in sharded[1]] == [(n, m) for n, _, m in serial[1]]
+    assert sharded[2] == serial[2]
@@ -0,0 +1,221 @@
+"""Scan transitions, idempotency keys and journal replay against an in-memory SQLite stand-in for MySQL.
+
+Batch.transition_many only issues portable SQL (IN lists, row-value guards,
+CASE updates), so its unit of work runs unchanged on SQLite; the schema
+below mirrors the columns it reads and writes.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+import pymysql
+import pytest
+
+import backend.models as models
+from backend.models import Batch
+from backend.scan_audit import ScanAuditWriter
+from backend.scan_journal import ScanJournal
+from backend.workflow import refresh_workflow
+
+SCHEMA = """
+CREATE TABLE brands (brand_id INTEGER PRIMARY KEY, brand_name TEXT);
+CREATE TABLE models (model_id INTEGER PRIMARY KEY, model_name TEXT);
+CREATE TABLE sizes (size_id INTEGER PRIMARY KEY, size_value TEXT);
+CREATE TABLE colors (color_id INTEGER PRIMARY KEY, color_name TEXT);
+CREATE TABLE production_phases (phase_id INTEGER PRIMARY KEY, phase_name TEXT);
+INSERT INTO production_phases VALUES (1, 'Cutting'), (2, 'Sewing'), (3, 'Packaging');
+CREATE TABLE batches (
+    batch_id INTEGER PRIMARY KEY, barcode TEXT UNIQUE, brand_id INTEGER, model_id INTEGER, size_id INTEGER,
+    color_id INTEGER, quantity INTEGER, layers INTEGER, serial TEXT, current_phase INTEGER, status TEXT,
+    updated_at REAL DEFAULT 0
+);
+CREATE TABLE scan_keys (scan_key TEXT PRIMARY KEY, batch_id INTEGER, result TEXT, recorded_at REAL DEFAULT 0);
+"""
+
+
+class SQLiteDatabase:
+    """The slice of backend.models.Database a unit of work uses, over one SQLite connection."""
+
+    def __init__(self, conn, before_execute=None):
+        self.conn = conn
+        self.before_execute = before_execute
+
+    def fetch_all(self, query, params=()):
+        return self.conn.execute(query.replace("%s", "?"), list(params)).fetchall()
+
+    def fetch_one(self, query, params=()):
+        return self.conn.execute(query.replace("%s", "?"), list(params)).fetchone()
+
+    def execute(self, query, params=()):
+        if self.before_execute is not None:
+            self.before_execute(query)
+        return self.conn.execute(query.replace("%s", "?"), list(params)).rowcount
+
+
+@pytest.fixture
+def db(monkeypatch):
+    conn = sqlite3.connect(":memory:", check_same_thread=False)
+    conn.row_factory = lambda cursor, row: {column[0]: value for column, value in zip(cursor.description, row)}
+    conn.executescript(SCHEMA)
+    for n in range(1, 6):
+        conn.execute(
+            "INSERT INTO batches (barcode, quantity, layers, serial, current_phase, status) VALUES (?, 1, 1, '001', 1, 'Pending')",
+            (f"B{n}",),
+        )
+
+    stand_in = SQLiteDatabase(conn)
+    monkeypatch.setattr(models, "run_in_transaction", lambda work, retry_policy=None: work(stand_in))
+    refresh_workflow(lambda: [(1, "Cutting"), (2, "Sewing"), (3, "Packaging")])
+    return stand_in
+
+
+@pytest.fixture
+def barcode_scanning(monkeypatch):
+    import backend.barcode_scanning as barcode_scanning
+
+    monkeypatch.setattr(barcode_scanning.batch_cache, "put", lambda batch: None)
+    return barcode_scanning
+
+
+def state(db, barcode):
+    row = db.fetch_one("SELECT current_phase, status FROM batches WHERE barcode = %s", (barcode,))
+    return row["current_phase"], row["status"]
+
+
+def test_transition_many_replays_scans_in_order(db):
+    results = Batch.transition_many([
+        ("B1", "IN", "Cutting"),
+        ("B1", "OUT", "Cutting"),
+        ("B2", "OUT", "Sewing"),
+        ("ZZ", "IN", "Cutting"),
+        ("B3", "SIDEWAYS", "Cutting"),
+    ])
+
+    assert [r["result"] for r in results] == ["applied", "applied", "illegal", "not_found", "error"]
+    assert (results[1]["from_phase"], results[1]["from_status"]) == (1, "In Progress")
+    assert state(db, "B1") == (2, "Pending")
+    assert state(db, "B2") == (1, "Pending")
+
+
+def test_transition_many_update_is_guarded_by_the_state_it_read(db):
+    def finish_b5(query):
+        if query.strip().startswith("UPDATE batches"):
+            db.conn.execute("UPDATE batches SET status = 'Completed' WHERE barcode = 'B5'")
+
+    db.before_execute = finish_b5
+    results = Batch.transition_many([("B5", "IN", "Cutting"), ("B4", "IN", "Cutting")])
+
+    assert [r["result"] for r in results] == ["conflict", "applied"]
+    assert results[0]["batch"]["status"] == "Completed"
+    assert state(db, "B5") == (1, "Completed")
+    assert state(db, "B4") == (1, "In Progress")
+
+
+def test_scan_keys_make_replays_idempotent(db):
+    scans = [("B1", "IN", "Cutting"), ("B1", "OUT", "Cutting")]
+    first = Batch.transition_many(scans, keys=["k1", "k2"])
+    again = Batch.transition_many(scans, keys=["k1", "k2"])
+
+    assert [r["result"] for r in first] == ["applied", "applied"]
+    assert [r["result"] for r in again] == ["applied", "applied"]
+    assert all(r.get("duplicate") for r in again)
+    assert state(db, "B1") == (2, "Pending")
+    assert db.fetch_one("SELECT COUNT(*) AS n FROM scan_keys")["n"] == 2
+
+
+def test_journal_keeps_entries_pending_until_resolved(tmp_path):
+    journal = ScanJournal(os.path.join(tmp_path, "journal.sqlite3"))
+    first = journal.append("B1", "IN", "Cutting", operator="alice")
+    second = journal.append("B2", "OUT", "Sewing")
+
+    assert [e["scan_key"] for e in journal.pending(10)] == [first["scan_key"], second["scan_key"]]
+    journal.resolve([(first["scan_key"], "applied", "ok"), (second["scan_key"], "illegal", "wrong phase")])
+
+    assert journal.backlog() == 0
+    assert [p["barcode"] for p in journal.problems()] == ["B2"]
+    journal.close()
+
+
+def test_batcher_replays_the_journal_once_mysql_is_back(db, tmp_path, barcode_scanning):
+    down = threading.Event()
+
+    def apply(scans, keys=None):
+        if down.is_set():
+            raise pymysql.err.OperationalError(2003, "Can't connect to MySQL server")
+        return Batch.transition_many(scans, keys)
+
+    journal = ScanJournal(os.path.join(tmp_path, "journal.sqlite3"))
+    batcher = barcode_scanning.TransitionBatcher(apply, journal=journal, window=0.01, retry_interval=0.05,
+                                                 max_retry_interval=0.05, audit=ScanAuditWriter(insert=lambda events: None))
+
+    assert batcher.submit("B1", "IN", "Cutting").result(timeout=5)["result"] == "applied"
+
+    down.set()
+    queued = [batcher.submit(code, "IN", "Cutting").result(timeout=5)["result"] for code in ("B2", "B3")]
+    assert queued == ["queued", "queued"]
+    assert journal.backlog() == 2
+    assert state(db, "B2") == (1, "Pending")
+
+    down.clear()
+    deadline = time.monotonic() + 5
+    while journal.backlog() and time.monotonic() < deadline:
+        time.sleep(0.02)
+
+    assert journal.backlog() == 0
+    assert state(db, "B2") == (1, "In Progress")
+    assert state(db, "B3") == (1, "In Progress")
+    assert db.fetch_one("SELECT COUNT(*) AS n FROM scan_keys")["n"] == 3
+
+
+def test_batcher_resolves_entries_mysql_rejects_instead_of_going_offline(db, tmp_path, barcode_scanning):
+    broken = threading.Event()
+    calls = []
+
+    def apply(scans, keys=None):
+        calls.append(len(scans))
+        if broken.is_set():
+            raise pymysql.err.ProgrammingError(1146, "Table 'barcode_management.scan_keys' doesn't exist")
+        return Batch.transition_many(scans, keys)
+
+    journal = ScanJournal(os.path.join(tmp_path, "journal.sqlite3"))
+    batcher = barcode_scanning.TransitionBatcher(apply, journal=journal, window=0.01, retry_interval=0.05,
+                                                 max_retry_interval=0.05, audit=ScanAuditWriter(insert=lambda events: None))
+
+    broken.set()
+    assert batcher.submit("B1", "IN", "Cutting").result(timeout=5)["result"] == "error"
+    assert journal.backlog() == 0
+    assert len(calls) == 1
+
+    broken.clear()
+    assert batcher.submit("B2", "IN", "Cutting").result(timeout=5)["result"] == "applied"
+    assert state(db, "B2") == (1, "In Progress")
+    assert [p["result"] for p in journal.problems()] == ["error"]
+
+
+def test_view_scan_falls_back_to_the_decoded_barcode_when_mysql_is_down(barcode_scanning, monkeypatch):
+    from backend import reference_cache
+    from backend.barcode_gen_print import generate_barcode_string
+    from backend.scan_pipeline import ScanRequest
+
+    def unreachable(*args):
+        raise pymysql.err.OperationalError(2003, "Can't connect to MySQL server")
+
+    for cache in reference_cache.ALL_CACHES:
+        monkeypatch.setattr(cache, "loader", unreachable)
+        monkeypatch.setattr(cache, "_loaded_at", None)
+        monkeypatch.setattr(cache, "_retry_at", None)
+    monkeypatch.setattr(barcode_scanning.batch_cache, "loader", unreachable)
+    code = generate_barcode_string(3, "1230000", 4, 5, 20, 2, 7)
+
+    # **Cold caches: the preview carries the encoded ids**
+    result = barcode_scanning.process_scan(ScanRequest(1, code, "VIEW", "Cutting"))
+    assert result["result"] == "offline"
+    assert (result["batch"]["brand_name"], result["batch"]["size_value"], result["batch"]["color_name"]) == (3, 4, 5)
+
+    # **Caches loaded earlier but past their TTL: the old names are served**
+    brands = reference_cache.brand_cache
+    monkeypatch.setattr(brands, "_id_to_name", {3: "Acme"})
+    monkeypatch.setattr(brands, "_loaded_at", time.monotonic() - brands.ttl - 1)
+    monkeypatch.setattr(brands, "_loaded_version", brands.version)
+    assert brands.get_name(3) == "Acme"